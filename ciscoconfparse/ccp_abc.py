@@ -1,10 +1,12 @@
 from operator import methodcaller, attrgetter
 from abc import ABCMeta, abstractmethod
+from weakref import WeakKeyDictionary
 from copy import deepcopy
 import re
 import os
 
 from ccp_util import IPv4Obj
+from ccp_regex import compile_regex, register_regex
 
 """ ccp_abc.py - Parse, Query, Build, and Modify IOS-style configurations
      Copyright (C) 2014-2015 David Michael Pennington
@@ -28,6 +30,41 @@ from ccp_util import IPv4Obj
 
 ### TODO: Implement a findall function which matches a regex and returns a list
 
+_RE_NO_PREFIX = register_regex(r'\s*no\s+')
+
+
+class _AnyToken(object):
+    ## The type of ANY
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'ANY'
+
+    def __reduce__(self):
+        ## Unpickle as the same object, so ``is ANY`` still works
+        return 'ANY'
+
+## Matches any one word in a token pattern; see BaseCfgLine.match_tokens()
+ANY = _AnyToken()
+
+
+class _UserAttribute(object):
+    ## An attribute which callers may set on line objects (e.g. ifindex); 
+    ##    lines have no __dict__, so values are kept here, by identity, 
+    ##    until the line is garbage-collected
+
+    def __init__(self, default=None):
+        self.default = default
+        self.values = WeakKeyDictionary()
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return self.values.get(obj, self.default)
+
+    def __set__(self, obj, value):
+        self.values[obj] = value
+
 
 ##
 ##-------------  Config Line ABC
@@ -37,22 +74,42 @@ from ccp_util import IPv4Obj
 class BaseCfgLine(object):
     __metaclass__ = ABCMeta
 
-    def __init__(self, text="", comment_delimiter="!"):
+    ## Slots keep millions of parsed lines small, and lines have no 
+    ##    __dict__.  Factory subclasses add no slots, so a line's __class__ 
+    ##    can be swapped in place; their attributes are properties or 
+    ##    class-level defaults (e.g. ifindex is a _UserAttribute)
+    __slots__ = ('_text', '_linenum', '_chunk', 'parent', 'child_indent', 
+        'is_comment', 'children', 'oldest_ancestor', 'indent', 'confobj', 
+        '_depth', '_subtree_len', '_tokens', '_parsed', '_comment_delimiter',
+        '__weakref__')
+
+    feature   = ''             # Major feature description
+    feature_param1 = ''        # Parameter1 of the feature
+    feature_param2 = ''        # Parameter2 of the feature (if req'd)
+    uncfgtext = _UserAttribute('')   # Set by add_uncfgtext()
+
+    ## ConfigLineFactory only calls is_object_for() on lines which start with
+    ##    one of these (case and whitespace-insensitive); None means any line
+    factory_prefixes = None
+
+    def __init__(self, text="", comment_delimiter="!", confobj=None):
         """Accept an IOS line number and initialize family relationship
         attributes"""
-        self.comment_delimiter = comment_delimiter
-        self.text = text
-        self.linenum = -1
+        self.confobj = confobj     # Reference to the list object which owns it
+        self._comment_delimiter = comment_delimiter  # Used without confobj
+        self._text = text
+        self._chunk = None         # Set once the owning list is edited
+        self._linenum = -1
         self.parent = self
         self.child_indent = 0
         self.is_comment = None
         self.children = list()
         self.oldest_ancestor = False
         self.indent = 0            # Whitespace indentation on the object
-        self.confobj = None        # Reference to the list object which owns it
-        self.feature   = ''        # Major feature description
-        self.feature_param1 = ''   # Parameter1 of the feature
-        self.feature_param2 = ''   # Parameter2 of the feature (if req'd)
+        self._depth = 0            # Number of ancestors
+        self._subtree_len = 0      # Lines after this one to its last child
+        self._tokens = None        # Built by the tokens property
+        self._parsed = None        # Model classes' parse of the text
 
         self.set_comment_bool()
 
@@ -66,36 +123,92 @@ class BaseCfgLine(object):
     def __str__(self):
         return self.__repr__()
 
-    def __hash__(self):
-        ##   I inlined the hash() argument below for speed... whenever I change
-        ##   self.__eq__() I *must* change this
-        return hash(str(self.linenum)+self.text)
+    ## There is no __eq__() or __hash__(); a line object is only equal to 
+    ##    itself, so sets and dicts of lines use python's identity hash and 
+    ##    never build strings.  Use same_line() to compare linenum and text.
+    ##    Sort lines with key=attrgetter('linenum'); __lt__() and __gt__() 
+    ##    are only kept for old callers of sorted()
 
     def __gt__(self, val):
         if (self.linenum>val.linenum):
             return True
         return False
 
-    def __eq__(self, val):
-        try:
-            ##   try / except is much faster than isinstance();
-            ##   I added hash_arg() inline below for speed... whenever I change
-            ##   self.__hash__() I *must* change this
-            return (str(self.linenum)+self.text)==(str(val.linenum)+val.text)
-        except:
-            return False
-
     def __lt__(self, val):
         # Ref: http://stackoverflow.com/a/7152796/667301
         if (self.linenum<val.linenum):
             return True
         return False
 
+    @property
+    def linenum(self):
+        """The index of this line in the list which owns it"""
+        chunk = self._chunk
+        if chunk is None:
+            return self._linenum
+        ## The list has been edited; the position comes from its index
+        return chunk.owner._position(self)
+
+    @linenum.setter
+    def linenum(self, val):
+        self._linenum = val
+
+    @property
+    def text(self):
+        """The text of this configuration line"""
+        return self._text
+
+    @text.setter
+    def text(self, val):
+        ## Tell the list which owns this object, so the next commit() can
+        ##    relink (and reclassify) just this line's family
+        self._text = val
+        self._tokens = None
+        self._parsed = None
+        text_changed = getattr(self.confobj, '_line_text_changed', None)
+        if not (text_changed is None):
+            text_changed(self)
+
+    @property
+    def tokens(self):
+        """A tuple of the whitespace-delimited words in this line's text; it
+        is built when it is first used, and again after ``text`` changes"""
+        tokens = self._tokens
+        if tokens is None:
+            tokens = self._tokens = tuple(self._text.split())
+        return tokens
+
+    def _re_match_field(self, regex, group=1, result_type=str, default=''):
+        ## Like re_match_typed(), but the groups of regex are matched once, 
+        ##    and kept in _parsed until text changes; a class uses one regex
+        groups = self._parsed
+        if groups is None:
+            mm = compile_regex(regex).search(self._text)
+            if mm is None:
+                groups = ()
+            else:
+                groups = mm.groups()
+            self._parsed = groups
+        if (group <= len(groups)) and not (groups[group - 1] is None):
+            return result_type(groups[group - 1])
+        return result_type(default)
+
+    @property
+    def comment_delimiter(self):
+        """The comment delimiter of the list which owns this object"""
+        if self.confobj is None:
+            return self._comment_delimiter
+        return self.confobj.comment_delimiter
+
+    @comment_delimiter.setter
+    def comment_delimiter(self, val):
+        self._comment_delimiter = val
+
     def set_comment_bool(self):
         delimiters = set(self.comment_delimiter)
         retval = None
         ## Use this instead of a regex... nontrivial speed enhancement
-        tmp = self.text.lstrip()
+        tmp = self._text.lstrip()
         for delimit_char in delimiters:
             if len(tmp)>0 and \
                 (delimit_char==tmp[len(delimit_char)-1]):
@@ -125,6 +238,16 @@ class BaseCfgLine(object):
         else:
             return self.children[-1].linenum
 
+    def same_line(self, val):
+        """Return True if ``val`` is a line object with the same linenum 
+        and text as this one.  This is what ``==`` compared before line 
+        objects were only equal to themselves"""
+        try:
+            ## try / except is much faster than isinstance()
+            return (self.linenum==val.linenum) and (self.text==val.text)
+        except AttributeError:
+            return False
+
     @property
     def verbose(self):
         if self.has_children:
@@ -134,21 +257,34 @@ class BaseCfgLine(object):
 
     @property
     def all_parents(self):
-        retval = set([])
+        ## Parents always come before their children, so walking up the
+        ##    parent links gives the ancestors in reverse config order
+        retval = list()
         me = self
-        while (me.parent!=me):
-            retval.add(me.parent)
+        while not (me.parent is me):
             me = me.parent
-        return sorted(retval)
+            retval.append(me)
+        retval.reverse()
+        return retval
 
     @property
     def all_children(self):
+        if not self.children:
+            return list()
+        ## The config list keeps each line's descendants in the slice after
+        ##    it, unless the family links changed since the last relink
+        descendants = getattr(self.confobj, '_descendants', None)
+        if not (descendants is None):
+            retval = descendants(self)
+            if not (retval is None):
+                return retval
+
         retval = set([])
         if self.has_children:
             for child in self.children:
                 retval.add(child)
                 retval.update(child.all_children)
-        return sorted(retval)
+        return sorted(retval, key=attrgetter('linenum'))
 
     @property
     def classname(self):
@@ -163,7 +299,7 @@ class BaseCfgLine(object):
     @property
     def is_config_line(self):
         """Return a boolean for whether this is a config statement; returns False if this object is a blank line, or a comment"""
-        if len(self.text.strip())>0 and not self.is_comment:
+        if len(self._text.strip())>0 and not self.is_comment:
             return True
         return False
 
@@ -178,6 +314,7 @@ class BaseCfgLine(object):
         ## In a perfect world, I would check parentobj's type
         ##     with isinstance(), but I'm not ready to take the perf hit
         self.parent = parentobj
+        self._links_edited()
         return True
 
     def add_child(self, childobj):
@@ -189,32 +326,34 @@ class BaseCfgLine(object):
         if not (childobj in self.children):
             self.children.append(childobj)
             self.child_indent = childobj.indent
+            self._links_edited()
             return True
         else:
             return False
 
+    def _links_edited(self):
+        ## Family links set by hand may not follow the config order
+        links_edited = getattr(self.confobj, '_links_edited', None)
+        if not (links_edited is None):
+            links_edited()
+
     def add_uncfgtext(self, unconftext):
         """unconftext is defined during special method calls.  Do not assume it
         is automatically populated."""
         ## remove any preceeding "no "
-        conftext = re.sub("\s*no\s+", "", unconftext)
+        conftext = _RE_NO_PREFIX.sub("", unconftext)
         myindent = self.parent.child_indent
         self.uncfgtext = myindent * " " + "no " + conftext
 
     def delete(self, recurse=True):
         """Delete this object.  By default, if a parent object is deleted, the child objects are also deleted; this happens because ``recurse`` defaults True.
-        """
-        if recurse:
-            for child in self.children:
-                child.delete()
 
-        ## Consistency check to refuse deletion of the wrong object...
-        ##    only delete if the line numbers are consistent
-        text = self.text
-        linenum = self.linenum
-        if self.confobj._list[self.linenum].text==text:
-            del self.confobj._list[self.linenum]
-            self._list_reassign_linenums()
+        Returns:
+            - list.  The objects which were deleted, in configuration order
+        """
+        ## The list refuses to delete an object which isn't where its 
+        ##    linenum says it is
+        return self.confobj._delete_lines([self], recurse=recurse)
 
     def delete_children_matching(self, linespec):
         """Delete any child :class:`~models_cisco.IOSCfgLine` objects which 
@@ -224,7 +363,7 @@ class BaseCfgLine(object):
             - linespec (str): A string or python regular expression, which should be matched.  
 
         Returns:
-            - list.  A list of :class:`~models_cisco.IOSCfgLine` objects which were deleted.
+            - list.  The text of the child :class:`~models_cisco.IOSCfgLine` objects which were deleted.
 
         This example illustrates how you can use 
         :func:`~ccp_abc.delete_children_matching` to delete any description 
@@ -263,8 +402,8 @@ class BaseCfgLine(object):
         """
         cobjs = filter(methodcaller('re_search', linespec), self.children)
         retval = map(attrgetter('text'), cobjs)
-        # Delete the children
-        map(methodcaller('delete'), cobjs)
+        # Delete the children (and their children) together
+        self.confobj._delete_lines(cobjs, recurse=True)
         return retval
 
     def has_child_with(self, linespec):
@@ -445,10 +584,10 @@ class BaseCfgLine(object):
         # When replacing objects, check whether they should be deleted, or 
         #   whether they are a comment
 
-        if ignore_rgx and re.search(ignore_rgx, self.text):
+        if ignore_rgx and compile_regex(ignore_rgx).search(self.text):
             return self.text
 
-        retval = re.sub(regex, replacergx, self.text)
+        retval = compile_regex(regex).sub(replacergx, self.text)
         # Delete empty lines
         if retval.strip()=='':
             self.delete()
@@ -494,7 +633,7 @@ class BaseCfgLine(object):
            The netmask is 255.255.255.252
            >>>
         """
-        mm = re.search(regex, self.text)
+        mm = compile_regex(regex).search(self._text)
         if not (mm is None):
             return mm.group(group)
         return default
@@ -513,11 +652,43 @@ class BaseCfgLine(object):
 
         """
         ## TODO: use re.escape(regex) on all regex, instead of bare regex
-        mm = re.search(regex, self.text)
+        mm = compile_regex(regex).search(self._text)
         if not (mm is None):
-            return self.text
+            return self._text
         return default
 
+    def match_tokens(self, pattern, exactmatch=False):
+        """Return True if the words in the text of this object start with
+        ``pattern``, a tuple of words where :data:`~ccp_abc.ANY` matches any 
+        one word.  No regular expression is used.
+
+        Args:
+            - pattern (tuple): The words to match, in order
+        Kwargs:
+            - exactmatch (bool): Defaults to False.  When set True, the line must not have any words after ``pattern``
+
+        Returns:
+            - bool.  Whether the line matches ``pattern``
+
+        .. code-block:: python
+
+           >>> obj = IOSCfgLine(' ip address 1.1.1.1 255.255.255.252')
+           >>> obj.match_tokens(('ip', 'address', ANY, ANY))
+           True
+           >>> obj.match_tokens(('ip', 'address', ANY), exactmatch=True)
+           False
+           >>>
+        """
+        tokens = self.tokens
+        if len(tokens) < len(pattern):
+            return False
+        elif exactmatch and len(tokens) > len(pattern):
+            return False
+        for idx, token in enumerate(pattern):
+            if not (token is ANY) and (token != tokens[idx]):
+                return False
+        return True
+
     def re_search_children(self, regex):
         """Use ``regex`` to search the text contained in the children of 
         this :class:`~models_cisco.IOSCfgLine`.
@@ -581,7 +752,7 @@ class BaseCfgLine(object):
            >>>
 
         """
-        mm = re.search(regex, self.text)
+        mm = compile_regex(regex).search(self._text)
         if not (mm is None):
             if not (mm.group(group) is None):
                 return result_type(mm.group(group))
@@ -640,8 +811,9 @@ class BaseCfgLine(object):
             ##   this while I build the API
             raise NotImplementedError
 
+        search = compile_regex(regex).search
         for cobj in self.children:
-            mm = re.search(regex, cobj.text)
+            mm = search(cobj.text)
             if not (mm is None):
                 return result_type(mm.group(group))
         return result_type(default)
@@ -672,7 +844,7 @@ class BaseCfgLine(object):
         retval.append(self)
         if self.children:
             retval.extend(self.all_children)
-        return sorted(retval)
+        return retval
 
     @property
     def geneology(self):
@@ -680,7 +852,7 @@ class BaseCfgLine(object):
         a list of all ancestors in the direct line as well as this obj.  
         Cousins or aunts / uncles are *not* returned.  Note: children of this 
         object are *not* returned."""
-        retval = sorted(self.all_parents)
+        retval = self.all_parents
         retval.append(self)
         return retval
 
@@ -690,7 +862,7 @@ class BaseCfgLine(object):
         a list of all ancestors in the direct line as well as this obj.  
         Cousins or aunts / uncles are *not* returned.  Note: children of this 
         object are *not* returned."""
-        retval = map(lambda x: x.text, sorted(self.all_parents))
+        retval = [obj.text for obj in self.all_parents]
         retval.append(self.text)
         return retval
 
@@ -700,7 +872,7 @@ class BaseCfgLine(object):
 
     @property
     def is_child(self):
-        return not bool(self.parent==self)
+        return not (self.parent is self)
 
     @property
     def siblings(self):
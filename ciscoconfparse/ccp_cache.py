@@ -0,0 +1,292 @@
+from hashlib import sha1
+import tempfile
+import sys
+import os
+
+if sys.version_info[0] < 3:
+    import cPickle as pickle
+else:
+    import pickle
+
+from version import __version__
+
+""" ccp_cache.py - Parse, Query, Build, and Modify IOS-style configurations
+     Copyright (C) 2015 David Michael Pennington
+
+     This program is free software: you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation, either version 3 of the License, or
+     (at your option) any later version.
+
+     This program is distributed in the hope that it will be useful,
+     but WITHOUT ANY WARRANTY; without even the implied warranty of
+     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+     GNU General Public License for more details.
+
+     You should have received a copy of the GNU General Public License
+     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+     If you need to contact the author, you can do so by emailing:
+     mike [~at~] pennington [/dot\] net
+"""
+
+
+class ParseCache(object):
+    """An on-disk cache of parsed configurations, used by
+    :class:`~ciscoconfparse.CiscoConfParse` when it is called with
+    ``cache_dir``.
+
+    Each entry is one file in ``cache_dir``, named by a sha1 of the
+    configuration text, the parse options and the ciscoconfparse version;
+    an unchanged config parsed with the same options always finds the same
+    entry, and upgrading ciscoconfparse never reads an old entry.  When the
+    files in ``cache_dir`` hold more than ``max_bytes``, the least-recently
+    used entries are removed.  The cache keeps a running total of the bytes
+    it stores, and only scans ``cache_dir`` when that total passes
+    ``max_bytes``.
+
+    Kwargs:
+        - cache_dir (str): The directory which holds the cache; it is created if it does not exist
+        - max_bytes (int): The maximum size of all cache entries, in bytes
+
+    Attributes:
+        - hits (int): The number of entries loaded from the cache
+        - misses (int): The number of entries which were not in the cache
+    """
+
+    SUFFIX = '.ccp'
+
+    def __init__(self, cache_dir, max_bytes=64*1024*1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        ## Bytes in cache_dir, or None until evict() has scanned it
+        self._total = None
+        if not os.path.isdir(cache_dir):
+            try:
+                os.makedirs(cache_dir)
+            except OSError:
+                ## Another process could have created it first
+                if not os.path.isdir(cache_dir):
+                    raise
+
+    def __repr__(self):
+        return "<ParseCache '{0}' hits: {1} misses: {2}>".format(
+            self.cache_dir, self.hits, self.misses)
+
+    def key(self, lines, **kwargs):
+        """Return the cache key for a list of config lines, and the keyword
+        arguments which were used to parse them"""
+        digest = sha1()
+        for name in sorted(kwargs.keys()):
+            digest.update(_encode("{0}={1!r}\n".format(name, kwargs[name])))
+        digest.update(_encode("version={0}\n".format(__version__)))
+        digest.update(_encode("lines={0}\n".format(len(lines))))
+        ## Prefix each line with its length; a line may hold any character, 
+        ##    so ['a\nb', 'c'] and ['a', 'b\nc'] must not hash the same
+        for line in lines:
+            line = _encode(line)
+            digest.update(_encode("{0}:".format(len(line))))
+            digest.update(line)
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key + self.SUFFIX)
+
+    def load(self, key):
+        """Return the data stored under ``key``, or None"""
+        path = self.path(key)
+        try:
+            fh = open(path, 'rb')
+            try:
+                version, data = pickle.load(fh)
+            finally:
+                fh.close()
+        except (IOError, OSError):
+            self.misses += 1
+            return None
+        except Exception:
+            ## A truncated or otherwise unreadable entry
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        if version!=__version__:
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        self._touch(path)
+        self.hits += 1
+        return data
+
+    def store(self, key, data):
+        """Store ``data`` (which must be picklable) under ``key``"""
+        path = self.path(key)
+        fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+        try:
+            fh = os.fdopen(fd, 'wb')
+            try:
+                pickle.dump((__version__, data), fh, 2)
+                size = fh.tell()
+            finally:
+                fh.close()
+            replaced = self._size(path)
+            ## Readers never see a partial entry
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            self._remove(tmp_path)
+            return False
+
+        ## Only scan cache_dir when the running total is unknown or too big
+        if self._total is not None:
+            self._total += size - replaced
+        if (self._total is None) or (self._total > self.max_bytes):
+            self.evict()
+        return True
+
+    def evict(self):
+        """Remove the least-recently used entries until the cache holds no
+        more than ``max_bytes``"""
+        entries = list()
+        total = 0
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(self.SUFFIX):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+            total += stat.st_size
+
+        entries.sort()
+        for mtime, path, size in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+        self._total = total
+
+    def clear(self):
+        """Remove every entry"""
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith(self.SUFFIX):
+                self._remove(os.path.join(self.cache_dir, filename))
+        self._total = 0
+
+    def _touch(self, path):
+        ## An entry's mtime is its last use
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def _size(self, path):
+        try:
+            return os.stat(path).st_size
+        except OSError:
+            return 0
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class QueryCache(object):
+    """An in-memory cache of query results, used by the ``find_*()`` methods
+    of :class:`~ciscoconfparse.CiscoConfParse`.
+
+    Each key holds the method, its arguments and the generation of the 
+    configuration (see :attr:`~ciscoconfparse.CiscoConfParse.generation`);
+    every change to the configuration starts a new generation, so an entry 
+    is never found after the config changes, and it ages out.  When the 
+    cache holds ``max_size`` entries, the least-recently used quarter of 
+    them is evicted.
+
+    Kwargs:
+        - max_size (int): The maximum number of cached results
+
+    Attributes:
+        - hits (int): The number of queries answered from the cache
+        - misses (int): The number of queries which searched the config
+        - evictions (int): The number of results which were evicted
+    """
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._results = dict()
+        ## Last use of each key
+        self._clock = 0
+        self._used = dict()
+
+    def __repr__(self):
+        return "<QueryCache hits: {0} misses: {1} size: {2}>".format(
+            self.hits, self.misses, len(self))
+
+    def __len__(self):
+        return len(self._results)
+
+    def get(self, key):
+        """Return the result stored under ``key``, or None"""
+        result = self._results.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._clock += 1
+            self._used[key] = self._clock
+        return result
+
+    def store(self, key, result):
+        """Store ``result`` (which must not be None) under ``key``"""
+        if self.max_size < 1:
+            return
+        if len(self._results) >= self.max_size:
+            self.evict()
+        self._clock += 1
+        self._used[key] = self._clock
+        self._results[key] = result
+
+    def evict(self):
+        """Evict the least-recently used quarter of the entries"""
+        keep = self.max_size - self.max_size // 4
+        drop = len(self._results) - min(keep, self.max_size - 1)
+        if drop <= 0:
+            return
+        for key in sorted(self._used.keys(), key=self._used.get)[:drop]:
+            del self._results[key]
+            del self._used[key]
+        self.evictions += drop
+
+    def clear(self):
+        """Remove every entry and reset the counters"""
+        self._results.clear()
+        self._used.clear()
+        self._clock = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """Return a dict of the cache counters and sizes"""
+        return dict([
+            ('hits', self.hits),
+            ('misses', self.misses),
+            ('evictions', self.evictions),
+            ('size', len(self._results)),
+            ('max_size', self.max_size),
+            ])
+
+
+def _encode(text):
+    if isinstance(text, bytes):
+        return text
+    return text.encode('utf-8')
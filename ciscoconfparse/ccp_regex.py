@@ -0,0 +1,404 @@
+from sre_constants import LITERAL, IN, CATEGORY, CATEGORY_SPACE
+from sre_constants import AT, AT_BEGINNING, AT_BEGINNING_STRING
+from sre_constants import AT_END, AT_END_STRING
+from sre_constants import SUBPATTERN, BRANCH, MAX_REPEAT, MIN_REPEAT
+from sre_constants import ASSERT, ASSERT_NOT
+import sre_parse
+import re
+
+""" ccp_regex.py - Parse, Query, Build, and Modify IOS-style configurations
+     Copyright (C) 2015 David Michael Pennington
+
+     This program is free software: you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation, either version 3 of the License, or
+     (at your option) any later version.
+
+     This program is distributed in the hope that it will be useful,
+     but WITHOUT ANY WARRANTY; without even the implied warranty of
+     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+     GNU General Public License for more details.
+
+     You should have received a copy of the GNU General Public License
+     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+     If you need to contact the author, you can do so by emailing:
+     mike [~at~] pennington [/dot\] net
+"""
+
+_PATTERN_TYPE = type(re.compile(''))
+
+
+class RegexCache(object):
+    """A registry of compiled regular expressions, shared by every
+    linespec and ``re_*()`` call in ciscoconfparse.
+
+    Python's own :mod:`re` cache is small and is emptied whenever it fills,
+    so a script which queries a config with a few hundred distinct patterns
+    recompiles all of them over and over.  :class:`RegexCache` keeps up to
+    ``max_size`` compiled patterns, and evicts them according to ``policy``
+    when it is full:
+
+        - ``'lru'``: Evict the least-recently used quarter of the entries
+        - ``'fifo'``: Evict the oldest quarter of the entries
+        - ``'clear'``: Evict all entries, as :mod:`re` does
+
+    Patterns added with :func:`~ccp_regex.RegexCache.register` are pinned;
+    they are never evicted and do not count against ``max_size``.  The
+    regular expressions used by the models are registered when they are
+    imported.
+
+    Kwargs:
+        - max_size (int): The maximum number of unpinned compiled patterns
+        - policy (str): One of ``'lru'``, ``'fifo'`` or ``'clear'``
+
+    Attributes:
+        - hits (int): The number of lookups which found a compiled pattern
+        - misses (int): The number of lookups which compiled a pattern
+        - evictions (int): The number of compiled patterns which were evicted
+
+    .. code-block:: python
+
+       >>> from ciscoconfparse.ccp_regex import REGEX_CACHE
+       >>> REGEX_CACHE.max_size = 10000
+       >>> REGEX_CACHE.compile(r'^interface\s+(\S+)').search('interface Vlan10').group(1)
+       'Vlan10'
+       >>>
+    """
+
+    POLICIES = ('lru', 'fifo', 'clear')
+
+    def __init__(self, max_size=2048, policy='lru'):
+        if not (policy in self.POLICIES):
+            raise ValueError("[FATAL] policy='{0}' is not one of {1}".format(
+                policy, ', '.join(self.POLICIES)))
+        self.max_size = max_size
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._pinned = dict()
+        self._regexes = dict()
+        ## Last use (lru) or insertion (fifo) of each unpinned key
+        self._clock = 0
+        self._used = dict()
+
+    def __repr__(self):
+        return "<RegexCache {0} hits: {1} misses: {2} size: {3}>".format(
+            self.policy, self.hits, self.misses, len(self))
+
+    def __len__(self):
+        return len(self._pinned) + len(self._regexes)
+
+    def __contains__(self, pattern):
+        key = (pattern, 0, type(pattern))
+        return (key in self._pinned) or (key in self._regexes)
+
+    def compile(self, pattern, flags=0):
+        """Return ``pattern`` compiled with ``flags``; ``pattern`` may be a
+        string or an already-compiled regular expression"""
+        key = (pattern, flags, type(pattern))
+        regex = self._pinned.get(key)
+        if regex is not None:
+            self.hits += 1
+            return regex
+
+        regex = self._regexes.get(key)
+        if regex is not None:
+            self.hits += 1
+            if self.policy=='lru':
+                self._clock += 1
+                self._used[key] = self._clock
+            return regex
+
+        if isinstance(pattern, _PATTERN_TYPE):
+            ## Nothing to cache; re.compile() checks the flags
+            return re.compile(pattern, flags)
+
+        self.misses += 1
+        regex = re.compile(pattern, flags)
+        if len(self._regexes) >= self.max_size:
+            self.evict()
+        self._clock += 1
+        self._used[key] = self._clock
+        self._regexes[key] = regex
+        return regex
+
+    def register(self, pattern, flags=0):
+        """Compile and pin ``pattern``, and return the compiled pattern.  If
+        ``pattern`` is already compiled, later lookups of its text find it"""
+        if isinstance(pattern, _PATTERN_TYPE):
+            key = (pattern.pattern, pattern.flags, type(pattern.pattern))
+            regex = pattern
+            ## Passing the compiled pattern itself is a hit, too
+            self._pinned[(pattern, 0, _PATTERN_TYPE)] = pattern
+        else:
+            key = (pattern, flags, type(pattern))
+            regex = self._pinned.get(key) or re.compile(pattern, flags)
+        self._regexes.pop(key, None)
+        self._used.pop(key, None)
+        self._pinned[key] = regex
+        return regex
+
+    def evict(self):
+        """Evict unpinned entries according to ``policy``"""
+        if self.policy=='clear' or self.max_size < 4:
+            keys = list(self._regexes.keys())
+        else:
+            ## Evicting a quarter at a time keeps the sort off the hot path
+            keep = self.max_size - self.max_size // 4
+            drop = len(self._regexes) - keep
+            if drop <= 0:
+                return
+            keys = sorted(self._used.keys(), key=self._used.get)[:drop]
+        for key in keys:
+            del self._regexes[key]
+            del self._used[key]
+        self.evictions += len(keys)
+
+    def clear(self):
+        """Remove every unpinned entry and reset the counters"""
+        self._regexes.clear()
+        self._used.clear()
+        self._clock = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """Return a dict of the cache counters and sizes"""
+        return dict([
+            ('hits', self.hits),
+            ('misses', self.misses),
+            ('evictions', self.evictions),
+            ('size', len(self._regexes)),
+            ('pinned', len(self._pinned)),
+            ('max_size', self.max_size),
+            ('policy', self.policy),
+            ])
+
+
+def literal_prefixes(regex):
+    """Return the literal text which any line matched by ``regex`` (a 
+    compiled regular expression) must start with, as a list of 
+    ``(literal, exact)`` tuples, or None if ``regex`` is not anchored on a 
+    literal.
+
+    Leading whitespace in ``regex`` is skipped, so ``literal`` is the start 
+    of the first whitespace-delimited word of the line.  ``exact`` is True 
+    if ``literal`` must be that whole word.  Alternations give one tuple per 
+    alternative.
+
+    .. code-block:: python
+
+       >>> literal_prefixes(re.compile(r'^(ip|ipv6)\s+route'))
+       [('ip', True), ('ipv6', True)]
+       >>> literal_prefixes(re.compile(r'^\s+ip add'))
+       [('ip', True)]
+       >>> literal_prefixes(re.compile(r'^interfaces?'))
+       [('interface', False)]
+       >>> literal_prefixes(re.compile(r'interface')) is None
+       True
+       >>>
+    """
+    key = (regex.pattern, regex.flags, type(regex.pattern))
+    try:
+        return _PREFIXES[key]
+    except KeyError:
+        pass
+
+    retval = None
+    if not (regex.flags & (re.IGNORECASE | re.MULTILINE)):
+        try:
+            retval = _anchored_prefixes(
+                list(sre_parse.parse(regex.pattern, regex.flags)))
+        except Exception:
+            ## Anything unexpected just means no prefix
+            retval = None
+
+    if len(_PREFIXES) >= 4096:
+        _PREFIXES.clear()
+    _PREFIXES[key] = retval
+    return retval
+
+_PREFIXES = dict()
+
+
+def multiline_regex(regex):
+    """Return ``regex`` (a compiled regular expression) recompiled with 
+    ``re.MULTILINE``, or None if it cannot be used to search many lines 
+    joined with newlines.
+
+    Searching the joined text with the returned regex finds a match which 
+    starts on every line that ``regex`` matches by itself; it may also find 
+    matches which run into the next line, so each hit must be checked 
+    against the line.  Lookarounds, ``\\A``, ``\\Z`` and atomic groups see 
+    the newline instead of the end of the line, so those regexes get None.
+
+    .. code-block:: python
+
+       >>> multiline_regex(re.compile(r'^interface\s+Serial')).flags & re.M
+       8
+       >>> multiline_regex(re.compile(r'shutdown(?!\s)')) is None
+       True
+       >>>
+    """
+    key = (regex.pattern, regex.flags, type(regex.pattern))
+    try:
+        return _MULTILINE[key]
+    except KeyError:
+        pass
+
+    retval = None
+    try:
+        if _line_local(sre_parse.parse(regex.pattern, regex.flags)):
+            ## _MULTILINE caches it; REGEX_CACHE only counts linespecs
+            retval = re.compile(regex.pattern, regex.flags | re.MULTILINE)
+    except Exception:
+        retval = None
+
+    if len(_MULTILINE) >= 4096:
+        _MULTILINE.clear()
+    _MULTILINE[key] = retval
+    return retval
+
+_MULTILINE = dict()
+
+## Opcodes which look past the text they match; the names differ in case 
+##    between python versions, and the last two are new in python3.11
+_LOOKAROUND_OPS = ('ASSERT', 'ASSERT_NOT', 'ATOMIC_GROUP', 'POSSESSIVE_REPEAT')
+
+
+def _line_local(items):
+    ## True if nothing in the parsed items depends on the text outside 
+    ##    the match, other than ^ and $
+    for op, av in items:
+        if op==ASSERT or op==ASSERT_NOT or \
+            str(op).upper() in _LOOKAROUND_OPS:
+            return False
+        elif op==AT and (av==AT_BEGINNING_STRING or av==AT_END_STRING):
+            return False
+        for sub in _nested_items(av):
+            if not _line_local(sub):
+                return False
+    return True
+
+
+def _nested_items(av):
+    ## Yield the parsed subpatterns inside the argument of an opcode
+    if isinstance(av, sre_parse.SubPattern):
+        yield av
+    elif isinstance(av, (list, tuple)):
+        for item in av:
+            for sub in _nested_items(item):
+                yield sub
+
+
+def combine_regexes(regexes, chunk_size=32):
+    """Group the compiled ``regexes`` into alternations of up to 
+    ``chunk_size`` patterns, so a text which matches none of them is 
+    rejected with one search per group instead of one per pattern.  Returns 
+    a list of ``(combined, indexes)`` tuples; ``combined`` matches any text 
+    which one of ``regexes[ii] for ii in indexes`` matches (it may match 
+    more), or it is None if those regexes have to be searched one by one.
+
+    Patterns with flags or backreferences cannot be combined without 
+    changing their meaning, so each of them gets a group of its own.
+    """
+    retval = list()
+    chunk = list()
+    for idx, regex in enumerate(regexes):
+        if (regex.flags & ~re.UNICODE) or _BACKREF_RE.search(regex.pattern):
+            retval.append((None, [idx]))
+        else:
+            chunk.append(idx)
+        if len(chunk)==chunk_size or (chunk and idx==len(regexes) - 1):
+            retval.append(_combine_chunk(regexes, chunk))
+            chunk = list()
+    return retval
+
+_BACKREF_RE = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+
+
+def _combine_chunk(regexes, chunk):
+    if len(chunk)==1:
+        return (None, chunk)
+    try:
+        pattern = '|'.join(['(?:' + regexes[idx].pattern + ')' 
+            for idx in chunk])
+        return (REGEX_CACHE.compile(pattern), chunk)
+    except (re.error, AssertionError, OverflowError, TypeError):
+        ## Too many groups, duplicate group names, or str mixed with bytes
+        return (None, chunk)
+
+
+def _anchored_prefixes(items):
+    ## items must start with ^ (or an alternation which does)
+    if not items:
+        return None
+    op, av = items[0]
+    if op==AT and (av==AT_BEGINNING or av==AT_BEGINNING_STRING):
+        return _literal_prefixes(items[1:], '')
+    elif op==SUBPATTERN and not _subpattern_flags(av):
+        return _anchored_prefixes(list(av[-1]) + items[1:])
+    elif op==BRANCH:
+        return _union_prefixes(_anchored_prefixes, av[1], items[1:])
+    return None
+
+
+def _literal_prefixes(items, prefix):
+    ## Walk the items after ^, collecting literal text in prefix
+    for idx, (op, av) in enumerate(items):
+        space = _space_count(op, av)
+        if op==LITERAL and (space is None) and av < 128:
+            prefix += chr(av)
+        elif not (space is None):
+            if prefix:
+                return [(prefix, space > 0)]
+            ## Leading whitespace; the line's first word is after it
+        elif op==SUBPATTERN and not _subpattern_flags(av):
+            return _literal_prefixes(list(av[-1]) + items[idx + 1:], prefix)
+        elif op==BRANCH:
+            return _union_prefixes(lambda alt: _literal_prefixes(alt, prefix),
+                av[1], items[idx + 1:])
+        elif op==AT and (av==AT_END or av==AT_END_STRING):
+            return prefix and [(prefix, True)] or None
+        else:
+            break
+    return prefix and [(prefix, False)] or None
+
+
+def _union_prefixes(func, alternatives, rest):
+    retval = list()
+    for alt in alternatives:
+        prefixes = func(list(alt) + list(rest))
+        if prefixes is None:
+            ## One unanchored alternative could match any line
+            return None
+        retval.extend(prefixes)
+    return retval
+
+
+def _space_count(op, av):
+    ## The minimum number of whitespace characters matched by (op, av), or 
+    ##     None if it could match anything else
+    if op==LITERAL:
+        return (av < 128 and chr(av).isspace()) and 1 or None
+    elif op==IN:
+        return (list(av)==[(CATEGORY, CATEGORY_SPACE)]) and 1 or None
+    elif op==MAX_REPEAT or op==MIN_REPEAT:
+        body = list(av[2])
+        if len(body)==1 and not (_space_count(*body[0]) is None):
+            return av[0]
+    return None
+
+
+def _subpattern_flags(av):
+    ## Scoped flags, such as (?i:...), make the literal text unreliable
+    return len(av)==4 and (av[1] or av[2])
+
+
+## The registry shared by ciscoconfparse, ccp_abc and the models
+REGEX_CACHE = RegexCache()
+compile_regex = REGEX_CACHE.compile
+register_regex = REGEX_CACHE.register
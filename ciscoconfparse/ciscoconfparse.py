@@ -1,13 +1,26 @@
 from collections import MutableSequence, Iterator
 from operator import methodcaller, attrgetter
+from functools import wraps
+from itertools import chain, islice
+from heapq import heappush, heappop
 from colorama import Fore, Back, Style
+from bisect import bisect_right
 from difflib import SequenceMatcher
+from array import array
+import multiprocessing
+import traceback
 import logging
 import time
 import sys
 import re
 import os
 
+try:
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+except ImportError:
+    ## Python2 without the 'futures' backport uses multiprocessing.Pool
+    ProcessPoolExecutor = None
+
 from models_cisco import IOSHostnameLine, IOSRouteLine, IOSIntfLine
 from models_cisco import IOSAccessLine, IOSIntfGlobal
 from models_cisco import IOSAaaLoginAuthenticationLine
@@ -31,6 +44,12 @@ from models_asa import ASAAclLine
 
 from models_junos import JunosCfgLine
 
+from ccp_abc import BaseCfgLine, ANY
+from ccp_cache import ParseCache, QueryCache
+from ccp_regex import RegexCache, REGEX_CACHE
+from ccp_regex import compile_regex, register_regex, literal_prefixes
+from ccp_regex import combine_regexes, multiline_regex
+
 from version import __version__ as __ccpversion__
 """ ciscoconfparse.py - Parse, Query, Build, and Modify IOS-style configurations
      Copyright (C) 2007-2015 David Michael Pennington
@@ -71,6 +90,58 @@ _LOG_CHANNEL_STDOUT = logging.StreamHandler(sys.stdout)
 _LOG_CHANNEL_STDOUT.setFormatter(_ccp_log_format)
 _log.addHandler(_LOG_CHANNEL_STDOUT)
 
+_BANNER_STR = set([
+    'login',
+    'motd',
+    'incoming',
+    'exec',
+    'telnet',
+    'lcd',
+])
+_BANNER_RE = re.compile('|'.join(
+    [r'^(set\s+)*banner\s+{0}'.format(ii) for ii in _BANNER_STR]))
+_BANNER_STR_RE = re.compile(
+    r'^(?:(?P<btype>(?:set\s+)*banner\s\w+\s+)(?P<bchar>\S)(?:\S)?)$')
+_RE_DOUBLE_NO = register_regex(r'(\s+)no\s+no\s+(\S+.+?)$')
+_RE_WHITESPACE = register_regex(r'\s+')
+
+
+def _memoize_query(func):
+    ## Keep the results of a CiscoConfParse query method in its query_cache,
+    ##    keyed by the arguments and the generation of the config
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        cache = self.query_cache
+        if cache is None:
+            return func(self, *args, **kwargs)
+        try:
+            key = (name, _query_key(args), _query_key(kwargs), 
+                self.ConfigObjs._generation)
+            hash(key)
+        except TypeError:
+            ## An argument which cannot be a dict key
+            return func(self, *args, **kwargs)
+        result = cache.get(key)
+        if result is None:
+            result = func(self, *args, **kwargs)
+            cache.store(key, result)
+        ## Callers may change the list they get
+        if isinstance(result, dict):
+            return dict([(ii, list(val)) for ii, val in result.items()])
+        return list(result)
+    return wrapper
+
+
+def _query_key(val):
+    ## Make lists and dicts of linespecs usable in a dict key
+    if isinstance(val, (list, tuple)):
+        return tuple([_query_key(ii) for ii in val])
+    elif isinstance(val, dict):
+        return tuple(sorted([(ii, _query_key(val[ii])) for ii in val.keys()]))
+    return val
+
 
 class CiscoConfParse(object):
     """Parses Cisco IOS configurations and answers queries about the configs"""
@@ -82,23 +153,30 @@ class CiscoConfParse(object):
                  factory=False,
                  linesplit_rgx=r"\r*\n+",
                  ignore_blank_lines=True,
-                 syntax='ios'):
+                 syntax='ios',
+                 columnar=False,
+                 cache_dir=None,
+                 query_cache_size=0):
         """Initialize CiscoConfParse.
 
            Kwargs:
                - config (list or str): A list of configuration statements, or a configuration file path to be parsed
                - comment (str): A comment delimiter.  This should only be changed when parsing non-Cisco IOS configurations, which do not use a !  as the comment delimiter.  ``comment`` defaults to '!'.  This value can hold multiple characters in case the config uses multiple characters for comment delimiters; however, the comment delimiters are always assumed to be one character wide
                - debug (bool): ``debug`` defaults to False, and should be kept that way unless you're working on a very tricky config parsing problem.  Debug output is not particularly friendly
-               - factory (bool): ``factory`` defaults to False; if set ``True``, it enables a beta-quality configuration line classifier.
+               - factory (bool): ``factory`` defaults to False; if set ``True``, it enables a beta-quality configuration line classifier.  If set to ``'lazy'``, each line is only classified when one of its model-specific attributes is first used; the results are the same as ``factory=True``, but errors from a model class' parser are raised on that first use.
                - linesplit_rgx (str): ``linesplit_rgx`` is used when parsing configuration files to find where new configuration lines are.  It is best to leave this as the default, unless you're working on a system that uses unusual line terminations (for instance something besides Unix, OSX, or Windows)
                - ignore_blank_lines (bool): ``ignore_blank_lines`` defaults to True; when this is set True, ciscoconfparse ignores blank configuration lines.  You might want to set ``ignore_blank_lines`` to False if you intentionally use blank lines in your configuration (ref: Github Issue #2), or you are parsing configurations which naturally have blank lines (such as Cisco Nexus configurations).
-               - syntax (str): ``syntax`` defaults to 'ios'; You can choose from the following values: ios, asa
+               - syntax (str): ``syntax`` defaults to 'ios'; You can choose from the following values: ios, asa, junos
+               - columnar (bool): ``columnar`` defaults to False; if set ``True``, the parse is stored as parallel arrays and line objects are only built when they are used.  This saves time and memory when most queries only search the configuration text.
+               - cache_dir (str): ``cache_dir`` defaults to None; if set to a directory (or a :class:`~ccp_cache.ParseCache`), parsed configurations are cached there, and parsing an unchanged configuration with the same options again rebuilds the objects from the cache.  The cache is not used with ``columnar=True``.
+               - query_cache_size (int): ``query_cache_size`` defaults to 0, which searches the configuration on every ``find_*()`` call; if set to a positive number, the results of up to this many ``find_*()`` calls are kept in ``query_cache``, and asking the same question again before the configuration changes returns a copy of the kept result.  Changes made by assigning to a line's ``parent`` or ``children`` are not seen until :func:`~ciscoconfparse.CiscoConfParse.commit` is called.
 
            Attributes:
                - comment_delimiter (str): A string containing the comment-delimiter
                - ConfigObjs (:class:`~ciscoconfparse.IOSConfigList`) : A custom list, which contains all parsed :class:`~models_cisco.IOSCfgLine` instances.
                - all_parents (list) : A list of all parent :class:`~models_cisco.IOSCfgLine` instances.
                - last_index (int) : An integer with the last index in ``ConfigObjs``
+               - query_cache (:class:`~ccp_cache.QueryCache`) : The results of recent ``find_*()`` calls, or None if ``query_cache_size`` is 0
            Returns:
                - An instance of a :class:`~ciscoconfparse.CiscoConfParse` object
 
@@ -131,117 +209,52 @@ class CiscoConfParse(object):
         self.factory = factory
         self.ConfigObjs = None
         self.syntax = syntax
+        self.columnar = columnar
         self.debug = debug
+        self.query_cache = None
+        if query_cache_size:
+            self.query_cache = QueryCache(query_cache_size)
+
+        if not (syntax in _CONFIG_SYNTAXES):
+            raise ValueError("FATAL: '{}' is an unknown syntax".format(
+                syntax))
 
         if isinstance(config, list) or isinstance(config, Iterator):
-            if syntax == 'ios':
-                # we already have a list object, simply call the parser
-                if self.debug:
-                    _log.debug("parsing from a python list with ios syntax")
-                self.ConfigObjs = IOSConfigList(
-                    data=config,
-                    comment_delimiter=comment,
-                    debug=debug,
-                    factory=factory,
-                    ignore_blank_lines=ignore_blank_lines,
-                    syntax='ios',
-                    CiscoConfParse=self)
-            elif syntax == 'asa':
-                # we already have a list object, simply call the parser
-                if self.debug:
-                    _log.debug("parsing from a python list with asa syntax")
-                self.ConfigObjs = ASAConfigList(
-                    data=config,
-                    comment_delimiter=comment,
-                    debug=debug,
-                    factory=factory,
-                    ignore_blank_lines=ignore_blank_lines,
-                    syntax='asa',
-                    CiscoConfParse=self)
-            elif syntax == 'junos':
-                ## FIXME I am shamelessly abusing the IOSConfigList for now...
-                # we already have a list object, simply call the parser
-                config = self.convert_braces_to_ios(config)
-                if self.debug:
-                    _log.debug("parsing from a python list with junos syntax")
-                self.ConfigObjs = IOSConfigList(
-                    data=config,
-                    comment_delimiter=comment,
-                    debug=debug,
-                    factory=factory,
-                    ignore_blank_lines=ignore_blank_lines,
-                    syntax='junos',
-                    CiscoConfParse=self)
-            else:
-                raise ValueError("FATAL: '{}' is an unknown syntax".format(
+            # we already have a list object, simply call the parser
+            if self.debug:
+                _log.debug("parsing from a python list with {0} syntax".format(
                     syntax))
 
         ## Accept either a string or unicode...
         elif getattr(config, 'encode', False):
             # Try opening as a file
             try:
-                if syntax == 'ios':
-                    # string - assume a filename... open file, split and parse
-                    if self.debug:
-                        _log.debug("parsing from '{0}' with ios syntax".format(
-                            config))
-                    f = open(config, mode="rU")
-                    text = f.read()
-                    rgx = re.compile(linesplit_rgx)
-                    self.ConfigObjs = IOSConfigList(
-                        rgx.split(text),
-                        comment_delimiter=comment,
-                        debug=debug,
-                        factory=factory,
-                        ignore_blank_lines=ignore_blank_lines,
-                        syntax='ios',
-                        CiscoConfParse=self)
-                elif syntax == 'asa':
-                    # string - assume a filename... open file, split and parse
-                    if self.debug:
-                        _log.debug("parsing from '{0}' with asa syntax".format(
-                            config))
-                    f = open(config, mode="rU")
-                    text = f.read()
-                    rgx = re.compile(linesplit_rgx)
-                    self.ConfigObjs = ASAConfigList(
-                        rgx.split(text),
-                        comment_delimiter=comment,
-                        debug=debug,
-                        factory=factory,
-                        ignore_blank_lines=ignore_blank_lines,
-                        syntax='asa',
-                        CiscoConfParse=self)
-
-                elif syntax == 'junos':
-                    # string - assume a filename... open file, split and parse
-                    if self.debug:
-                        _log.debug("parsing from '{0}' with junos syntax".
-                                   format(config))
-                    f = open(config, mode="rU")
-                    text = f.read()
-                    rgx = re.compile(linesplit_rgx)
-
-                    config = self.convert_braces_to_ios(rgx.split(text))
-                    ## FIXME I am shamelessly abusing the IOSConfigList for now...
-                    self.ConfigObjs = IOSConfigList(
-                        config,
-                        comment_delimiter=comment,
-                        debug=debug,
-                        factory=factory,
-                        ignore_blank_lines=ignore_blank_lines,
-                        syntax='junos',
-                        CiscoConfParse=self)
-                else:
-                    raise ValueError("FATAL: '{}' is an unknown syntax".format(
-                        syntax))
-
+                # string - assume a filename... open file, split and parse
+                if self.debug:
+                    _log.debug("parsing from '{0}' with {1} syntax".format(
+                        config, syntax))
+                f = open(config, mode="rU")
+                text = f.read()
+                rgx = re.compile(linesplit_rgx)
+                config = rgx.split(text)
             except IOError:
                 print("[FATAL] CiscoConfParse could not open '%s'" % config)
                 raise RuntimeError
         else:
             raise RuntimeError("[FATAL] CiscoConfParse() received" +
                                " an invalid argument\n")
+
+        ## Junos configs use an IOSConfigList of JunosCfgLine objects
+        self.ConfigObjs = _CONFIG_SYNTAXES[syntax].config_list(
+            data=config,
+            comment_delimiter=comment,
+            debug=debug,
+            factory=factory,
+            ignore_blank_lines=ignore_blank_lines,
+            syntax=syntax,
+            columnar=columnar,
+            cache_dir=cache_dir,
+            CiscoConfParse=self)
         self.ConfigObjs.CiscoConfParse = self
 
     def __repr__(self):
@@ -249,23 +262,123 @@ class CiscoConfParse(object):
             len(self.ConfigObjs), self.syntax, self.comment_delimiter,
             self.factory)
 
+    @classmethod
+    def iterparse(cls,
+                  config,
+                  comment="!",
+                  debug=False,
+                  factory=False,
+                  linesplit_rgx=r"\r*\n+",
+                  ignore_blank_lines=True,
+                  syntax='ios',
+                  chunk_size=65536):
+        """Read a configuration in chunks and yield a 
+        :class:`~ciscoconfparse.CiscoConfParse` instance for each top-level 
+        family as soon as it is complete, so memory use is bounded by the 
+        largest family instead of the whole configuration.
+
+           Args:
+               - config (str or file): A configuration file path, or an open file object (anything with a ``read()`` method)
+
+           Kwargs:
+               - chunk_size (int): The number of characters to read from ``config`` at a time
+               - All other keyword arguments are the same as :class:`~ciscoconfparse.CiscoConfParse`
+
+           Returns:
+               - A generator of :class:`~ciscoconfparse.CiscoConfParse` instances
+
+        A family starts at an unindented config line and runs until the next 
+        unindented config line; comments and blank lines stay with the family 
+        above them, and IOS banners are kept whole.  A Junos family starts at 
+        each top-level statement, even in the middle of a line (see 
+        :class:`~ciscoconfparse._JunosTokenizer`).  Line numbers start over 
+        at zero in each family, and a family is never only blank lines.
+
+        .. code-block:: python
+           :emphasize-lines: 1
+
+           >>> for section in CiscoConfParse.iterparse('/tftpboot/bucksnort.conf'):
+           ...     for obj in section.find_objects(r'^interface'):
+           ...         print(obj.text)
+           ...
+           interface Serial1/0
+           interface GigabitEthernet4/1
+           >>>
+
+        """
+        if syntax == 'junos':
+            section_end = _junos_section_end(comment)
+        elif syntax in set(['ios', 'asa']):
+            section_end = _ios_section_end(comment, banners=(syntax == 'ios'))
+        else:
+            raise ValueError("FATAL: '{}' is an unknown syntax".format(
+                syntax))
+
+        if getattr(config, 'read', False):
+            fh, close_fh = config, False
+        elif getattr(config, 'encode', False):
+            try:
+                fh, close_fh = open(config, mode="rU"), True
+            except IOError:
+                print("[FATAL] CiscoConfParse could not open '%s'" % config)
+                raise RuntimeError
+        else:
+            raise RuntimeError("[FATAL] CiscoConfParse.iterparse() received" +
+                               " an invalid argument\n")
+
+        try:
+            section = list()
+            filled = False      # True if section has a non-blank line
+            for line in _iter_text_lines(fh, linesplit_rgx, chunk_size):
+                start = 0
+                for offset in section_end(line):
+                    head = line[start:offset]
+                    if head.strip():
+                        section.append(head)
+                        filled = True
+                    if filled:
+                        yield cls(section, comment=comment, debug=debug,
+                            factory=factory,
+                            ignore_blank_lines=ignore_blank_lines,
+                            syntax=syntax)
+                        section, filled = list(), False
+                    start = offset
+                section.append(line[start:])
+                filled = filled or bool(line[start:].strip())
+
+            if filled:
+                yield cls(section, comment=comment, debug=debug,
+                    factory=factory, ignore_blank_lines=ignore_blank_lines,
+                    syntax=syntax)
+        finally:
+            if close_fh:
+                fh.close()
+
     @property
     def ioscfg(self):
         """A list containing all text configuration statements"""
         ## I keep this here to emulate the legacy ciscoconfparse behavior
-        return list(map(attrgetter('text'), self.ConfigObjs))
+        return list(self.ConfigObjs.iter_text())
 
     @property
     def objs(self):
         """An alias to the ``ConfigObjs`` attribute"""
         return self.ConfigObjs
 
+    @property
+    def generation(self):
+        """The number of times the configuration has changed; every insert, 
+        delete, text change and commit starts a new generation.  The 
+        ``find_*()`` results in ``query_cache`` belong to one generation"""
+        return self.ConfigObjs._generation
+
     def atomic(self):
         """Call :func:`~ciscoconfparse.CiscoConfParse.atomic` to manually fix 
         up ``ConfigObjs`` relationships 
-        after modifying a parsed configuration.  This method is slow; try to 
-        batch calls to :func:`~ciscoconfparse.CiscoConfParse.atomic()` if 
-        possible.
+        after modifying a parsed configuration.  Only the families of lines 
+        which were inserted, deleted or had their text changed are relinked, 
+        and existing line objects are kept; with ``factory=True``, lines 
+        whose text changed are classified again.
 
         .. warning::
 
@@ -280,12 +393,11 @@ class CiscoConfParse(object):
            :func:`~ciscoconfparse.CiscoConfParse.atomic` on config 
            modifications could lead to unexpected search results.
         """
-        self.ConfigObjs._bootstrap_from_text()
+        self.ConfigObjs._relink()
 
     def commit(self):
         """Alias for calling the :func:`~ciscoconfparse.CiscoConfParse.atomic` 
-        method.  This method is slow; try to batch calls to 
-        :func:`~ciscoconfparse.CiscoConfParse.commit()` if possible.
+        method.
 
         .. warning::
 
@@ -302,58 +414,61 @@ class CiscoConfParse(object):
         """
         self.atomic()
 
+    def batch(self):
+        """Return a context manager which batches changes to this 
+        configuration.  Inside the ``with`` block, inserts and deletes are 
+        queued instead of renumbering every line on each change; when the 
+        block exits they are applied, and ``ConfigObjs`` is renumbered and 
+        relinked once.  Searches inside the block see the configuration as 
+        it was before the block.  Batches can be nested; changes are applied 
+        when the outermost block exits (even if it raises an exception).
+
+        This example adds a line to each interface; its cost grows linearly 
+        with the size of the configuration, instead of quadratically.
+
+        .. code-block:: python
+           :emphasize-lines: 11
+
+           >>> config = [
+           ...     '!',
+           ...     'interface Serial1/0',
+           ...     ' ip address 1.1.1.1 255.255.255.252',
+           ...     '!',
+           ...     'interface Serial1/1',
+           ...     ' ip address 1.1.1.5 255.255.255.252',
+           ...     '!',
+           ...     ]
+           >>> parse = CiscoConfParse(config)
+           >>> with parse.batch():
+           ...     for obj in parse.find_objects(r'^interface'):
+           ...         obj.append_to_family(' shutdown')
+           ...
+           >>> parse.find_children(r'^interface\sSerial1/1')
+           ['interface Serial1/1', ' ip address 1.1.1.5 255.255.255.252', ' shutdown']
+           >>>
+        """
+        return self.ConfigObjs
+
     def convert_braces_to_ios(self, input_list, stop_width=4):
-        ## Note to self, I made this regex fairly junos-specific...
-        assert '{' not in set(self.comment_delimiter)
-        assert '}' not in set(self.comment_delimiter)
+        """Convert a brace-delimited Junos configuration into IOS-style 
+        text, indented ``stop_width`` spaces for each open brace.  Comments 
+        start with ``!``.  See :func:`~ciscoconfparse._junos_lines`.
 
-        JUNOS_RE_STR = r"""^
-        (?:\s*
-           (?:(?P<line>[^\{{\}}{0}].*?)(?P<braces_eol>[\{{\}}])*(?P<sc>\;)*\s*)
-          |(?P<braces_alone>[\{{\}}\;])
-          |(?:\s*[{0}](?P<comment>.+))
-        )
-        $
-        """.format(re.escape(self.comment_delimiter))
-        #LINE_RE = re.compile(r'^\s*([^\{\}].*)*\s*([\{\}\;])(\s\#.+)*$')
-        LINE_RE = re.compile(JUNOS_RE_STR, re.VERBOSE)
-
-        def line_level(input):
-            level_offset = 0
-            mm = LINE_RE.search(input)
-            if not (mm is None):
-                results = mm.groupdict()
-                line = results.get('line', '')
-                term_char = (results['braces_eol'] or
-                             results['braces_alone'] or '').strip()
-                comment = results['comment']
-                if term_char == '{':
-                    level_offset = 1
-                elif term_char == '}':
-                    level_offset = -1
-
-                ## Return values
-                if not (comment is None):
-                    return '!' + comment, level_offset
-                else:
-                    return line, level_offset
+        Args:
+            - input_list (list): A list of Junos configuration lines
 
-            elif input.strip() == '':
-                ## pass blank lines back
-                return input, 0
-            else:
-                raise ValueError("Could not parse: '{0}'".format(input))
-
-        lines = list()
-        offset = 0
-        STOP_WIDTH = stop_width
-        for tmp in input_list:
-            line, line_offset = line_level(tmp.strip())
-            if line:
-                lines.append(" " * STOP_WIDTH * offset + line)
-            offset += line_offset
-        return lines
+        Kwargs:
+            - stop_width (int): The indent of each brace level
+
+        Returns:
+            - list.  A list of IOS-style configuration lines
+        """
+        assert '{' not in set(self.comment_delimiter)
+        assert '}' not in set(self.comment_delimiter)
+        return [line for line, indent in _junos_lines(input_list, 
+            self.comment_delimiter, stop_width=stop_width)]
 
+    @_memoize_query
     def find_interface_objects(self, intfspec, exactmatch=True):
         """Find all :class:`~models_cisco.IOSCfgLine` objects whose text 
         is an abbreviation for ``intfspec`` and return the 
@@ -391,7 +506,7 @@ class CiscoConfParse(object):
            >>>
 
         """
-        if not (self.factory is True):
+        if not self.factory:
             raise ValueError(
                 "FATAL: find_interface_objects() must be called with 'factory=True'"
             )
@@ -411,6 +526,7 @@ class CiscoConfParse(object):
 
         return retval
 
+    @_memoize_query
     def find_objects_dna(self, dnaspec, exactmatch=False):
         """Find all :class:`~models_cisco.IOSCfgLine` objects whose text 
         matches ``dnaspec`` and return the :class:`~models_cisco.IOSCfgLine` 
@@ -452,13 +568,14 @@ class CiscoConfParse(object):
             )
         if not exactmatch:
             # Return objects whose text attribute matches linespec
-            linespec_re = re.compile(dnaspec)
+            linespec_re = compile_regex(dnaspec)
         elif exactmatch:
             # Return objects whose text attribute matches linespec exactly
-            linespec_re = re.compile("^{0}$".format(dnaspec))
+            linespec_re = compile_regex("^{0}$".format(dnaspec))
         return list(
             filter(lambda obj: linespec_re.search(obj.dna), self.ConfigObjs))
 
+    @_memoize_query
     def find_objects(self, linespec, exactmatch=False, ignore_ws=False):
         """Find all :class:`~models_cisco.IOSCfgLine` objects whose text 
         matches ``linespec`` and return the :class:`~models_cisco.IOSCfgLine` 
@@ -510,6 +627,166 @@ class CiscoConfParse(object):
             linespec = self._build_space_tolerant_regex(linespec)
         return self._find_line_OBJ(linespec, exactmatch)
 
+    @_memoize_query
+    def find_objects_multi(self, linespecs, exactmatch=False, ignore_ws=False):
+        """Find the :class:`~models_cisco.IOSCfgLine` objects which match 
+        each of several linespecs, with one pass over the configuration.  
+        The result is the same as calling 
+        :func:`~ciscoconfparse.CiscoConfParse.find_objects` once per 
+        linespec, but the patterns are combined into a few alternations, so 
+        most lines are rejected with one regex search instead of one search 
+        per linespec.
+
+        Args:
+            - linespecs (dict): A dict which maps a name to a linespec.  A linespec is a string or python regular expression, or a dict of :func:`~ciscoconfparse.CiscoConfParse.find_objects` keyword arguments (``linespec``, ``exactmatch`` and ``ignore_ws``) for that linespec
+        Kwargs:
+            - exactmatch (bool): Defaults to False.  The ``exactmatch`` of linespecs which do not set their own
+            - ignore_ws (bool): Defaults to False.  The ``ignore_ws`` of linespecs which do not set their own
+
+        Returns:
+            - dict.  A dict which maps each name in ``linespecs`` to a list of matching :class:`~models_cisco.IOSCfgLine` objects
+
+        .. code-block:: python
+           :emphasize-lines: 11,12,13,14
+
+           >>> config = [
+           ...     '!',
+           ...     'interface Serial1/0',
+           ...     ' ip address 1.1.1.1 255.255.255.252',
+           ...     '!',
+           ...     'interface Serial1/1',
+           ...     ' ip address 1.1.1.5 255.255.255.252',
+           ...     '!',
+           ...     ]
+           >>> parse = CiscoConfParse(config)
+           >>> found = parse.find_objects_multi({
+           ...     'intfs': r'^interface',
+           ...     'addr': {'linespec': r'ip address 1.1.1.5', 'ignore_ws': True},
+           ...     })
+           >>> found['intfs']
+           [<IOSCfgLine # 1 'interface Serial1/0'>, <IOSCfgLine # 4 'interface Serial1/1'>]
+           >>> found['addr']
+           [<IOSCfgLine # 5 ' ip address 1.1.1.5 255.255.255.252' (parent is # 4)>]
+           >>>
+        """
+        names = list(linespecs.keys())
+        regexes = list()
+        for name in names:
+            spec = linespecs[name]
+            if isinstance(spec, dict):
+                linespec = spec['linespec']
+                spec_exactmatch = spec.get('exactmatch', exactmatch)
+                spec_ignore_ws = spec.get('ignore_ws', ignore_ws)
+            else:
+                linespec = spec
+                spec_exactmatch, spec_ignore_ws = exactmatch, ignore_ws
+            regexes.append(self._build_linespec_regex(linespec,
+                spec_exactmatch, spec_ignore_ws))
+        return dict(zip(names, self.ConfigObjs._search_text_multi(regexes)))
+
+    def iter_objects(self, linespec, exactmatch=False, ignore_ws=False):
+        """Iterate over the :class:`~models_cisco.IOSCfgLine` objects whose 
+        text matches ``linespec``, in configuration order.  This is the 
+        generator version of 
+        :func:`~ciscoconfparse.CiscoConfParse.find_objects`; lines after the 
+        last one you use are never searched.  Do not add or 
+        delete lines while iterating.
+
+        Args:
+            - linespec (str): A string or python regular expression, which should be matched
+        Kwargs:
+            - exactmatch (bool): Defaults to False.  When set True, this option requires ``linespec`` match the whole configuration line, instead of a portion of the configuration line.
+            - ignore_ws (bool): boolean that controls whether whitespace is ignored.  Default is False.
+
+        Returns:
+            - generator.  The matching :class:`~models_cisco.IOSCfgLine` objects
+
+        .. code-block:: python
+           :emphasize-lines: 11
+
+           >>> config = [
+           ...     '!',
+           ...     'interface Serial1/0',
+           ...     ' ip address 1.1.1.1 255.255.255.252',
+           ...     '!',
+           ...     'interface Serial1/1',
+           ...     ' ip address 1.1.1.5 255.255.255.252',
+           ...     '!',
+           ...     ]
+           >>> parse = CiscoConfParse(config)
+           >>> for obj in parse.iter_objects(r'^interface'):
+           ...     print(obj.text)
+           ...     break
+           interface Serial1/0
+           >>>
+        """
+        return self.ConfigObjs._iter_search_text(
+            self._build_linespec_regex(linespec, exactmatch, ignore_ws))
+
+    def first_object(self, linespec, exactmatch=False, ignore_ws=False,
+        default=None):
+        """Return the first :class:`~models_cisco.IOSCfgLine` object whose 
+        text matches ``linespec``, or ``default`` if no line matches; the 
+        search stops at the first match.  See 
+        :func:`~ciscoconfparse.CiscoConfParse.iter_objects` for the other 
+        arguments."""
+        for obj in self.iter_objects(linespec, exactmatch, ignore_ws):
+            return obj
+        return default
+
+    def count_objects(self, linespec, exactmatch=False, ignore_ws=False):
+        """Return the number of lines whose text matches ``linespec``, 
+        without building a list (or, with ``columnar=True``, any line 
+        objects).  See :func:`~ciscoconfparse.CiscoConfParse.iter_objects` 
+        for the arguments."""
+        return self.ConfigObjs._count_text(
+            self._build_linespec_regex(linespec, exactmatch, ignore_ws))
+
+    def exists(self, linespec, exactmatch=False, ignore_ws=False):
+        """Return True if any line matches ``linespec``; the search stops at
+        the first match.  See 
+        :func:`~ciscoconfparse.CiscoConfParse.iter_objects` for the 
+        arguments."""
+        return not (self.first_object(linespec, exactmatch, ignore_ws) is None)
+
+    @_memoize_query
+    def find_objects_tokens(self, tokens, exactmatch=False):
+        """Find the :class:`~models_cisco.IOSCfgLine` objects whose words 
+        (see :attr:`~ccp_abc.BaseCfgLine.tokens`) start with ``tokens``, 
+        without compiling or running a regular expression.  
+        :data:`~ccp_abc.ANY` matches any one word.  Leading whitespace is 
+        not a word, so children match like any other line.
+
+        Args:
+            - tokens (tuple): The words to match, in order
+        Kwargs:
+            - exactmatch (bool): Defaults to False.  When set True, matching lines must not have any words after ``tokens``
+
+        Returns:
+            - list.  A list of matching :class:`~models_cisco.IOSCfgLine` objects
+
+        .. code-block:: python
+           :emphasize-lines: 11,13
+
+           >>> config = [
+           ...     '!',
+           ...     'interface Serial1/0',
+           ...     ' ip address 1.1.1.1 255.255.255.252',
+           ...     '!',
+           ...     'interface Serial1/1',
+           ...     ' ip address 1.1.1.5 255.255.255.252 secondary',
+           ...     '!',
+           ...     ]
+           >>> parse = CiscoConfParse(config)
+           >>> parse.find_objects_tokens(('ip', 'address', ANY, ANY), exactmatch=True)
+           [<IOSCfgLine # 2 ' ip address 1.1.1.1 255.255.255.252' (parent is # 1)>]
+           >>> [obj.tokens[1] for obj in parse.find_objects_tokens(('interface', ANY))]
+           ['Serial1/0', 'Serial1/1']
+           >>>
+        """
+        return self.ConfigObjs._search_tokens(tuple(tokens), exactmatch)
+
+    @_memoize_query
     def find_lines(self, linespec, exactmatch=False, ignore_ws=False):
         """This method is the equivalent of a simple configuration grep
         (Case-sensitive).
@@ -529,12 +806,13 @@ class CiscoConfParse(object):
 
         if (exactmatch is False):
             # Return the lines in self.ioscfg, which match linespec
-            return list(filter(re.compile(linespec).search, self.ioscfg))
+            return list(filter(compile_regex(linespec).search, self.ioscfg))
         else:
             # Return the lines in self.ioscfg, which match (exactly) linespec
             return list(
-                filter(re.compile("^%s$" % linespec).search, self.ioscfg))
+                filter(compile_regex("^%s$" % linespec).search, self.ioscfg))
 
+    @_memoize_query
     def find_children(self, linespec, exactmatch=False, ignore_ws=False):
         """Returns the parents matching the linespec, and their immediate
         children.  This method is different than :meth:`find_all_children`,
@@ -590,22 +868,43 @@ class CiscoConfParse(object):
            ['archive', ' log config', ' path ftp://ns.foo.com//tftpboot/Foo-archive']
            >>>
         """
-        if ignore_ws:
-            linespec = self._build_space_tolerant_regex(linespec)
-
-        if (exactmatch is False):
-            parentobjs = self._find_line_OBJ(linespec)
-        else:
-            parentobjs = self._find_line_OBJ("^%s$" % linespec)
-
-        allobjs = set([])
-        for parent in parentobjs:
-            if (parent.has_children is True):
-                allobjs.update(set(parent.children))
-            allobjs.add(parent)
+        return [obj.text for obj in 
+            self.iter_children(linespec, exactmatch, ignore_ws)]
+
+    def iter_children(self, linespec, exactmatch=False, ignore_ws=False):
+        """Iterate over the :class:`~models_cisco.IOSCfgLine` objects which
+        match ``linespec``, and their children (not grandchildren), in 
+        configuration order; each line is only returned once.  This is the 
+        generator version of 
+        :func:`~ciscoconfparse.CiscoConfParse.find_children`, which returns
+        the text of the same objects.  Do not add or delete lines while
+        iterating.
 
-        return list(map(attrgetter('text'), sorted(allobjs)))
+        Args:
+            - linespec (str): A string or python regular expression, which should be matched
+        Kwargs:
+            - exactmatch (bool): Defaults to False.  When set True, this option requires ``linespec`` match the whole configuration line, instead of a portion of the configuration line.
+            - ignore_ws (bool): boolean that controls whether whitespace is ignored.  Default is False.
 
+        Returns:
+            - generator.  The matching :class:`~models_cisco.IOSCfgLine` objects and their children
+        """
+        ## Children of earlier matches are held in a heap until the search
+        ##    passes them, so matches can be nested inside other matches
+        pending = list()
+        for parent in self.iter_objects(linespec, exactmatch, ignore_ws):
+            linenum = parent.linenum
+            while pending and (pending[0][0] <= linenum):
+                child_linenum, child = heappop(pending)
+                if child_linenum < linenum:
+                    yield child
+            yield parent
+            for child in parent.children:
+                heappush(pending, (child.linenum, child))
+        while pending:
+            yield heappop(pending)[1]
+
+    @_memoize_query
     def find_all_children(self, linespec, exactmatch=False, ignore_ws=False):
         """Returns the parents matching the linespec, and all their children.  
         This method is different than :meth:`find_children`, because
@@ -672,12 +971,24 @@ class CiscoConfParse(object):
         else:
             parentobjs = self._find_line_OBJ("^%s$" % linespec)
 
-        allobjs = set([])
+        ## Families come back in config order; only a match nested in an
+        ##    earlier match's family needs the dedup and sort below
+        retval = list()
+        seen = set([])
+        nested = False
         for parent in parentobjs:
-            allobjs.add(parent)
-            allobjs.update(set(parent.all_children))
-        return list(map(attrgetter('text'), sorted(allobjs)))
-
+            if id(parent) in seen:
+                continue
+            elif retval and (parent.linenum < retval[-1].linenum):
+                nested = True
+            family = [parent] + parent.all_children
+            seen.update([id(obj) for obj in family])
+            retval.extend(family)
+        if nested:
+            retval = sorted(set(retval), key=attrgetter('linenum'))
+        return list(map(attrgetter('text'), retval))
+
+    @_memoize_query
     def find_blocks(self, linespec, exactmatch=False, ignore_ws=False):
         """Find all siblings matching the linespec, then find all parents of
         those siblings. Return a list of config lines sorted by line number,
@@ -790,8 +1101,10 @@ class CiscoConfParse(object):
                 pobjs.add(pobj)
         tmp.update(pobjs)
 
-        return list(map(attrgetter('text'), sorted(tmp)))
+        return list(map(attrgetter('text'), 
+            sorted(tmp, key=attrgetter('linenum'))))
 
+    @_memoize_query
     def find_objects_w_child(self, parentspec, childspec, ignore_ws=False):
         """Return a list of parent :class:`~models_cisco.IOSCfgLine` objects, 
         which matched the ``parentspec`` and whose children match ``childspec``.
@@ -871,10 +1184,10 @@ class CiscoConfParse(object):
             parentspec = self._build_space_tolerant_regex(parentspec)
             childspec = self._build_space_tolerant_regex(childspec)
 
-        return list(
-            filter(lambda x: x.re_search_children(childspec),
-                   self.find_objects(parentspec)))
+        return self._find_objects_by_children(parentspec, [childspec], 
+            lambda matched: matched[0])
 
+    @_memoize_query
     def find_objects_w_all_children(self,
                                     parentspec,
                                     childspec,
@@ -954,43 +1267,27 @@ class CiscoConfParse(object):
         """
 
         assert bool(getattr(childspec, 'append'))  # Childspec must be a list
-        retval = list()
         if ignore_ws:
             parentspec = self._build_space_tolerant_regex(parentspec)
             childspec = map(self._build_space_tolerant_regex, childspec)
 
-        for parentobj in self.find_objects(parentspec):
-            results = set([])
-            for child_cfg in childspec:
-                results.add(bool(parentobj.re_search_children(child_cfg)))
-            if False in results:
-                continue
-            else:
-                retval.append(parentobj)
-
-        return retval
+        return self._find_objects_by_children(parentspec, list(childspec), 
+            all)
 
+    @_memoize_query
     def find_objects_w_missing_children(self,
                                         parentspec,
                                         childspec,
                                         ignore_ws=False):
         assert bool(getattr(childspec, 'append'))  # Childspec must be a list
-        retval = list()
         if ignore_ws:
             parentspec = self._build_space_tolerant_regex(parentspec)
             childspec = map(self._build_space_tolerant_regex, childspec)
 
-        for parentobj in self.find_objects(parentspec):
-            results = set([])
-            for child_cfg in childspec:
-                results.add(bool(parentobj.re_search_children(child_cfg)))
-            if False in results:
-                retval.append(parentobj)
-            else:
-                continue
-
-        return retval
+        return self._find_objects_by_children(parentspec, list(childspec), 
+            lambda matched: not all(matched))
 
+    @_memoize_query
     def find_parents_w_child(self, parentspec, childspec, ignore_ws=False):
         """Parse through all children matching childspec, and return a list of
         parents that matched the parentspec.  Only the parent lines will be
@@ -1066,6 +1363,7 @@ class CiscoConfParse(object):
             parentspec, childspec, ignore_ws=ignore_ws)
         return list(map(attrgetter('text'), tmp))
 
+    @_memoize_query
     def find_objects_wo_child(self, parentspec, childspec, ignore_ws=False):
         """Return a list of parent :class:`~models_cisco.IOSCfgLine` objects, which matched the ``parentspec`` and whose children did not match ``childspec``.  Only the parent :class:`~models_cisco.IOSCfgLine` objects will be returned.  For simplicity, this method only finds oldest_ancestors without immediate children that match.
 
@@ -1139,11 +1437,10 @@ class CiscoConfParse(object):
             parentspec = self._build_space_tolerant_regex(parentspec)
             childspec = self._build_space_tolerant_regex(childspec)
 
-        return [
-            obj for obj in self.find_objects(parentspec)
-            if not obj.re_search_children(childspec)
-        ]
+        return self._find_objects_by_children(parentspec, [childspec], 
+            lambda matched: not matched[0])
 
+    @_memoize_query
     def find_parents_wo_child(self, parentspec, childspec, ignore_ws=False):
         """Parse through all parents matching parentspec, and return a list of parents that did NOT have children match the childspec.  For simplicity, this method only finds oldest_ancestors without immediate children that match.
 
@@ -1218,6 +1515,7 @@ class CiscoConfParse(object):
             parentspec, childspec, ignore_ws=ignore_ws)
         return list(map(attrgetter('text'), tmp))
 
+    @_memoize_query
     def find_children_w_parents(self, parentspec, childspec, ignore_ws=False):
         """Parse through the children of all parents matching parentspec, 
         and return a list of children that matched the childspec.
@@ -1310,16 +1608,10 @@ class CiscoConfParse(object):
             parentspec = self._build_space_tolerant_regex(parentspec)
             childspec = self._build_space_tolerant_regex(childspec)
 
-        retval = set([])
-        childobjs = self._find_line_OBJ(childspec)
-        for child in childobjs:
-            parents = child.all_parents
-            for parent in parents:
-                if re.search(parentspec, parent.text):
-                    retval.add(child)
-
-        return list(map(attrgetter('text'), sorted(retval)))
+        return list(map(attrgetter('text'), 
+            self._find_objects_by_parents(parentspec, childspec)))
 
+    @_memoize_query
     def find_objects_w_parents(self, parentspec, childspec, ignore_ws=False):
         """Parse through the children of all parents matching parentspec, 
         and return a list of child objects, which matched the childspec.
@@ -1402,16 +1694,9 @@ class CiscoConfParse(object):
             parentspec = self._build_space_tolerant_regex(parentspec)
             childspec = self._build_space_tolerant_regex(childspec)
 
-        retval = set([])
-        childobjs = self._find_line_OBJ(childspec)
-        for child in childobjs:
-            parents = child.all_parents
-            for parent in parents:
-                if re.search(parentspec, parent.text):
-                    retval.add(child)
-
-        return sorted(retval)
+        return self._find_objects_by_parents(parentspec, childspec)
 
+    @_memoize_query
     def find_lineage(self, linespec, exactmatch=False):
         """Iterate through to the oldest ancestor of this object, and return
         a list of all ancestors / children in the direct line.  Cousins or
@@ -1441,7 +1726,8 @@ class CiscoConfParse(object):
             self.ConfigObjs.insert_before(obj, insertstr, atomic=local_atomic)
 
         ## Return the matching lines
-        return list(map(attrgetter('text'), sorted(objs)))
+        return list(map(attrgetter('text'), 
+            sorted(objs, key=attrgetter('linenum'))))
 
     def insert_after(self,
                      linespec,
@@ -1461,7 +1747,8 @@ class CiscoConfParse(object):
             self.ConfigObjs.insert_after(obj, insertstr, atomic=local_atomic)
 
         ## Return the matching lines
-        return list(map(attrgetter('text'), sorted(objs)))
+        return list(map(attrgetter('text'), 
+            sorted(objs, key=attrgetter('linenum'))))
 
     def insert_after_child(self,
                            parentspec,
@@ -1477,15 +1764,18 @@ class CiscoConfParse(object):
         after those child objects."""
         retval = list()
         modified = False
+        childspec_re = compile_regex(childspec)
+        if excludespec:
+            excludespec_re = compile_regex(excludespec)
         for pobj in self._find_line_OBJ(parentspec, exactmatch=exactmatch):
-            if excludespec and re.search(excludespec, pobj.text):
+            if excludespec and excludespec_re.search(pobj.text):
                 # Exclude replacements on pobj lines which match excludespec
                 continue
             for cobj in pobj.children:
-                if excludespec and re.search(excludespec, cobj.text):
+                if excludespec and excludespec_re.search(cobj.text):
                     # Exclude replacements on pobj lines which match excludespec
                     continue
-                elif re.search(childspec, cobj.text):
+                elif childspec_re.search(cobj.text):
                     modified = True
                     retval.append(
                         self.ConfigObjs.insert_after(
@@ -1496,19 +1786,21 @@ class CiscoConfParse(object):
 
     def delete_lines(self, linespec, exactmatch=False, ignore_ws=False):
         """Find all :class:`~models_cisco.IOSCfgLine` objects whose text 
-        matches linespec, and delete the object"""
+        matches linespec, and delete the object.  Children of the deleted 
+        objects are kept.
+
+        Returns:
+            - list.  The :class:`~models_cisco.IOSCfgLine` objects which were deleted
+        """
         objs = self.find_objects(linespec, exactmatch, ignore_ws)
-        #atomic = False
-        for idx, obj in enumerate(objs):
-            #if idx==last_idx:
-            #    atomic = True
-            del self.ConfigObjs[obj.linenum]
+        retval = self.ConfigObjs._delete_lines(objs)
+        self.ConfigObjs._relink()
+        return retval
 
     def prepend_line(self, linespec):
         """Unconditionally insert an :class:`~models_cisco.IOSCfgLine` object
         for ``linespec`` (a text line) at the top of the configuration"""
-        self.ConfigObjs.insert(0, linespec)
-        return self.ConfigObjs[0]
+        return self.ConfigObjs.insert(0, linespec)
 
     def append_line(self, linespec):
         """Unconditionally insert ``linespec`` (a text line) at the end of the 
@@ -1521,8 +1813,7 @@ class CiscoConfParse(object):
             - The parsed :class:`~models_cisco.IOSCfgLine` instance
 
         """
-        self.ConfigObjs.append(linespec)
-        return self.ConfigObjs[-1]
+        return self.ConfigObjs.append(linespec)
 
     def replace_lines(self,
                       linespec,
@@ -1616,7 +1907,7 @@ class CiscoConfParse(object):
         retval = list()
         ## Since we are replacing text, we *must* operate on ConfigObjs
         if excludespec:
-            excludespec_re = re.compile(excludespec)
+            excludespec_re = compile_regex(excludespec)
 
         for obj in self._find_line_OBJ(linespec, exactmatch=exactmatch):
             if excludespec and excludespec_re.search(obj.text):
@@ -1625,8 +1916,7 @@ class CiscoConfParse(object):
             retval.append(obj.re_sub(linespec, replacestr))
 
         if self.factory and atomic:
-            #self.ConfigObjs._reassign_linenums()
-            self.ConfigObjs._bootstrap_from_text()
+            self.ConfigObjs._relink()
 
         return retval
 
@@ -1685,9 +1975,9 @@ class CiscoConfParse(object):
         """
         retval = list()
         ## Since we are replacing text, we *must* operate on ConfigObjs
-        childspec_re = re.compile(childspec)
+        childspec_re = compile_regex(childspec)
         if excludespec:
-            excludespec_re = re.compile(excludespec)
+            excludespec_re = compile_regex(excludespec)
         for pobj in self._find_line_OBJ(parentspec, exactmatch=exactmatch):
             if excludespec and excludespec_re.search(pobj.text):
                 # Exclude replacements on pobj lines which match excludespec
@@ -1702,8 +1992,7 @@ class CiscoConfParse(object):
                     pass
 
         if self.factory and atomic:
-            #self.ConfigObjs._reassign_linenums()
-            self.ConfigObjs._bootstrap_from_text()
+            self.ConfigObjs._relink()
         return retval
 
     def replace_all_children(self,
@@ -1716,9 +2005,9 @@ class CiscoConfParse(object):
         """Replace lines matching `childspec` within all children (recursive) of lines whilch match `parentspec`"""
         retval = list()
         ## Since we are replacing text, we *must* operate on ConfigObjs
-        childspec_re = re.compile(childspec)
+        childspec_re = compile_regex(childspec)
         if excludespec:
-            excludespec_re = re.compile(excludespec)
+            excludespec_re = compile_regex(excludespec)
         for pobj in self._find_line_OBJ(parentspec, exactmatch=exactmatch):
             if excludespec and excludespec_re.search(pobj.text):
                 # Exclude replacements on pobj lines which match excludespec
@@ -1733,8 +2022,7 @@ class CiscoConfParse(object):
                     pass
 
         if self.factory and atomic:
-            #self.ConfigObjs._reassign_linenums()
-            self.ConfigObjs._bootstrap_from_text()
+            self.ConfigObjs._relink()
 
         return retval
 
@@ -1835,7 +2123,7 @@ class CiscoConfParse(object):
             if (accept_lineobj is False):
                 # If a violation is found...
                 violate_objs.append(lineobj)
-                result = re.search(uncfgspec, lineobj.text)
+                result = compile_regex(uncfgspec).search(lineobj.text)
                 # add uncfgtext to the violator's lineobject
                 lineobj.add_uncfgtext(result.group(0))
         ## Make the list of unconfig objects, recurse through parents
@@ -1870,20 +2158,19 @@ class CiscoConfParse(object):
         a_lines = list()
         a_linenums = list()
 
-        ## Mark all a objects as not done
-        for aobj in a_nonparent_objs:
-            aobj.done = False
+        ## The id() of each a object which is done
+        done = set()
 
         for bobj in b_nonparent_objs:
             for aobj in a_nonparent_objs:
                 if aobj.text == bobj.text:
-                    aobj.done = True
+                    done.add(id(aobj))
                     a_parse.append_line(aobj.text)
 
         # Add any missing a_parent_objs + their children...
         for aobj in a_nonparent_objs:
-            if aobj.done is False:
-                aobj.done = True
+            if not (id(aobj) in done):
+                done.add(id(aobj))
                 a_parse.append_line(aobj.text)
 
         a_parse.commit()
@@ -1912,42 +2199,42 @@ class CiscoConfParse(object):
         a_lines = list()
         a_linenums = list()
 
-        ## Mark all a objects as not done
+        ## The id() of each a object which is done
+        done = set()
+        a_children = dict()
         for aobj in a_parent_objs:
-            aobj.done = False
-            for child in aobj.all_children:
-                child.done = False
+            a_children[id(aobj)] = aobj.all_children
 
         ## Walk the b objects by parent, then child and reorder a objects
         for bobj in b_parent_objs:
 
             for aobj in a_parent_objs:
                 if aobj.text == bobj.text:
-                    aobj.done = True
+                    done.add(id(aobj))
                     a_parse.append_line(aobj.text)
 
                     # Append *matching* children to this aobj in the same order
                     for bchild in bobj.all_children:
-                        for achild in aobj.all_children:
-                            if achild.done:
+                        for achild in a_children[id(aobj)]:
+                            if id(achild) in done:
                                 continue
                             elif achild.geneology_text == bchild.geneology_text:
-                                achild.done = True
+                                done.add(id(achild))
                                 a_parse.append_line(achild.text)
 
                     # Append *missing* children to this aobj...
-                    for achild in aobj.all_children:
-                        if achild.done is False:
-                            achild.done = True
+                    for achild in a_children[id(aobj)]:
+                        if not (id(achild) in done):
+                            done.add(id(achild))
                             a_parse.append_line(achild.text)
 
         # Add any missing a_parent_objs + their children...
         for aobj in a_parent_objs:
-            if aobj.done is False:
-                aobj.done = True
+            if not (id(aobj) in done):
+                done.add(id(aobj))
                 a_parse.append_line(aobj.text)
-                for achild in aobj.all_children:
-                    achild.done = True
+                for achild in a_children[id(aobj)]:
+                    done.add(id(achild))
                     a_parse.append_line(achild.text)
 
         a_parse.commit()
@@ -2033,7 +2320,10 @@ class CiscoConfParse(object):
         b_heirarchy.append(obj)
 
         retval = list()
-        ## Assign config_this and unconfig_this attributes by "diff level"
+        ## Lines have no __dict__, so track the lines to configure and 
+        ##    unconfigure here instead of as attributes on each line
+        config_this, unconfig_this = set(), set()
+        ## Assign config_this and unconfig_this by "diff level"
         for adiff_level, bdiff_level in zip(a_heirarchy, b_heirarchy):
             for attr in ['parents', 'nonparents']:
                 if attr == 'parents':
@@ -2048,25 +2338,24 @@ class CiscoConfParse(object):
                         a_lines = list()
                         a_linenums = list()
                         for obj in adiff_level.parents:
+                            children = obj.all_children
                             a_lines.append(obj.text)
                             a_linenums.append(obj.linenum)
                             a_lines.extend(
-                                map(lambda x: getattr(x, 'text'),
-                                    obj.all_children))
+                                map(lambda x: getattr(x, 'text'), children))
                             a_linenums.extend(
-                                map(lambda x: getattr(x, 'linenum'),
-                                    obj.all_children))
+                                map(lambda x: getattr(x, 'linenum'), 
+                                    children))
                     b_lines = list()
                     b_linenums = list()
                     for obj in bdiff_level.parents:
+                        children = obj.all_children
                         b_lines.append(obj.text)
                         b_linenums.append(obj.linenum)
                         b_lines.extend(
-                            map(lambda x: getattr(x, 'text'),
-                                obj.all_children))
+                            map(lambda x: getattr(x, 'text'), children))
                         b_linenums.extend(
-                            map(lambda x: getattr(x, 'linenum'),
-                                obj.all_children))
+                            map(lambda x: getattr(x, 'linenum'), children))
                 else:
                     if ignore_order:
                         a_nonparents = getattr(adiff_level, attr)
@@ -2164,21 +2453,20 @@ class CiscoConfParse(object):
                                 if aobj:
                                     # Only configure parent if it's not already
                                     #    slated for removal
-                                    if not getattr(aobj.parent,
-                                                   'unconfig_this', False):
-                                        aobj.parent.config_this = True
-                                    aobj.unconfig_this = True
+                                    if not (aobj.parent in unconfig_this):
+                                        config_this.add(aobj.parent)
+                                    unconfig_this.add(aobj)
                                     if debug:
                                         _log.debug("    unconfigure aobj")
                                 if bobj:
-                                    bobj.config_this = True
-                                    bobj.parent.config_this = True
+                                    config_this.add(bobj)
+                                    config_this.add(bobj.parent)
                                     if debug:
                                         _log.debug("    configure bobj")
                             elif aparent_text == bparent_text:
                                 # Both a & b parents match, so these lines are equal
-                                aobj.unconfig_this = False
-                                bobj.config_this = False
+                                unconfig_this.discard(aobj)
+                                config_this.discard(bobj)
                                 if debug:
                                     _log.debug(
                                         "    tagged 'equal', aparent_text==bparent_text"
@@ -2192,15 +2480,14 @@ class CiscoConfParse(object):
                             if aobj:
                                 # Only configure parent if it's not already
                                 #    slated for removal
-                                if not getattr(aobj.parent, 'unconfig_this',
-                                               False):
-                                    aobj.parent.config_this = True
-                                aobj.unconfig_this = True
+                                if not (aobj.parent in unconfig_this):
+                                    config_this.add(aobj.parent)
+                                unconfig_this.add(aobj)
                                 if debug:
                                     _log.debug("    unconfigure aobj")
                             if bobj:
-                                bobj.config_this = True
-                                bobj.parent.config_this = True
+                                config_this.add(bobj)
+                                config_this.add(bobj.parent)
                                 if debug:
                                     _log.debug("    configure bobj")
                         elif (tag == 'insert'):
@@ -2210,16 +2497,15 @@ class CiscoConfParse(object):
                             if aobj:
                                 # Only configure parent if it's not already
                                 #    slated for removal
-                                if not getattr(aobj.parent, 'unconfig_this',
-                                               False):
-                                    aobj.parent.config_this = True
-                                aobj.unconfig_this = True
+                                if not (aobj.parent in unconfig_this):
+                                    config_this.add(aobj.parent)
+                                unconfig_this.add(aobj)
                                 if debug:
                                     _log.debug("    unconfigure aobj")
                             # tag: insert certainly applies to b objects...
                             if bobj:
-                                bobj.config_this = True
-                                bobj.parent.config_this = True
+                                config_this.add(bobj)
+                                config_this.add(bobj.parent)
                                 if debug:
                                     _log.debug("    configure bobj")
                         elif (tag == 'delete'):
@@ -2230,10 +2516,9 @@ class CiscoConfParse(object):
                                 # Only configure parent if it's not already
                                 #    slated for removal
                                 for pobj in aobj.all_parents:
-                                    if not getattr(pobj, 'unconfig_this',
-                                                   False):
-                                        pobj.config_this = True
-                                aobj.unconfig_this = True
+                                    if not (pobj in unconfig_this):
+                                        config_this.add(pobj)
+                                unconfig_this.add(aobj)
                                 if debug:
                                     _log.debug("    unconfigure aobj")
                         else:
@@ -2245,10 +2530,10 @@ class CiscoConfParse(object):
 
                 ## Unconfigure A objects, at *each level*, as required
                 for obj in a.ConfigObjs:
-                    if remove_lines and getattr(obj, 'unconfig_this', False):
+                    if remove_lines and (obj in unconfig_this):
                         ## FIXME: This should only be applied to IOS and ASA configs
                         if uncfgspec:
-                            mm = re.search(uncfgspec, obj.text)
+                            mm = compile_regex(uncfgspec).search(obj.text)
                             if not (mm is None):
                                 obj.add_uncfgtext(mm.group(0))
                                 retval.append(obj.uncfgtext)
@@ -2258,33 +2543,19 @@ class CiscoConfParse(object):
                         else:
                             retval.append(" " * obj.indent + "no " +
                                           obj.text.lstrip())
-                    elif remove_lines and getattr(obj, 'config_this', False):
+                    elif remove_lines and (obj in config_this):
                         retval.append(obj.text)
 
-                    # Clean up the attributes we used temporarily in this method
-                    for attr in ['config_this', 'unconfig_this']:
-                        try:
-                            delattr(obj.text, attr)
-                        except:
-                            pass
-
         ###
         ### Write b object diffs here
         ###
         for obj in b.ConfigObjs:
-            if getattr(obj, 'config_this', False):
+            if obj in config_this:
                 retval.append(obj.text)
 
-            # Clean up the attributes we used temporarily in this method
-            try:
-                delattr(obj.text, 'config_this')
-            except:
-                pass
-
         ## Strip out 'double negatives' (i.e. 'no no ')
         for idx in range(0, len(retval)):
-            retval[idx] = re.sub(r'(\s+)no\s+no\s+(\S+.+?)$', '\g<1>\g<2>',
-                                 retval[idx])
+            retval[idx] = _RE_DOUBLE_NO.sub('\g<1>\g<2>', retval[idx])
 
         if debug:
             _log.debug("Completed diff:")
@@ -2306,6 +2577,16 @@ class CiscoConfParse(object):
 
     ### The methods below are marked SEMI-PRIVATE because they return an object
     ###  or iterable of objects instead of the configuration text itself.
+    def _build_linespec_regex(self, linespec, exactmatch=False, 
+        ignore_ws=False):
+        """SEMI-PRIVATE: Return the compiled regex for a linespec, as
+        :func:`~ciscoconfparse.CiscoConfParse.find_objects` uses it"""
+        if ignore_ws:
+            linespec = self._build_space_tolerant_regex(linespec)
+        if exactmatch:
+            linespec = "^%s$" % linespec
+        return compile_regex(linespec)
+
     def _build_space_tolerant_regex(self, linespec):
         """SEMI-PRIVATE: Accept a string, and return a string with all
         spaces replaced with '\s+'"""
@@ -2313,7 +2594,7 @@ class CiscoConfParse(object):
         # Unicode below
         backslash = '\x5c'
 
-        linespec = re.sub('\s+', backslash + "s+", linespec)
+        linespec = _RE_WHITESPACE.sub(backslash + "s+", linespec)
 
         return linespec
 
@@ -2322,12 +2603,119 @@ class CiscoConfParse(object):
         ## NOTE TO SELF: do not remove _find_line_OBJ(); used by Cisco employees
         if not exactmatch:
             # Return objects whose text attribute matches linespec
-            linespec_re = re.compile(linespec)
+            linespec_re = compile_regex(linespec)
         elif exactmatch:
             # Return objects whose text attribute matches linespec exactly
-            linespec_re = re.compile("^%s$" % linespec)
-        return list(
-            filter(lambda obj: linespec_re.search(obj.text), self.ConfigObjs))
+            linespec_re = compile_regex("^%s$" % linespec)
+        return self.ConfigObjs._search_text(linespec_re)
+
+    def _find_objects_by_children(self, parentspec, childspecs, keep):
+        """SEMI-PRIVATE: Return the objects which match ``parentspec`` and 
+        for which ``keep()`` is True, in config order.  ``keep()`` is called
+        with a list of booleans, one per regex in ``childspecs``, which is 
+        True if one of the object's children matches that regex.
+
+        A child regex which could match fewer lines than the parents have 
+        children is searched once over the whole config, and its matches 
+        are mapped to their parents; if keep() needs a match for it, only 
+        those parents are searched with ``parentspec``."""
+        objs = self.ConfigObjs
+        parent_re = compile_regex(parentspec)
+        child_res = [compile_regex(spec) for spec in childspecs]
+        child_counts = [objs._estimate_lines(regex) for regex in child_res]
+
+        rarest = None
+        if child_res and not keep([False] * len(child_res)):
+            ## Every result has a child which matches the rarest childspec
+            idx = child_counts.index(min(child_counts))
+            if child_counts[idx] < objs._estimate_lines(parent_re):
+                rarest = idx
+        if rarest is None:
+            candidates = objs._search_text(parent_re)
+        else:
+            candidates = sorted([obj for obj in self._parents_of(
+                objs._search_text(child_res[rarest])).values() 
+                if parent_re.search(obj.text)], key=attrgetter('linenum'))
+
+        child_work = sum([len(obj.children) for obj in candidates])
+        matched = list()
+        for idx, regex in enumerate(child_res):
+            if idx==rarest:
+                matched.append([True] * len(candidates))
+            elif child_counts[idx] < child_work:
+                parents = self._parents_of(objs._search_text(regex))
+                matched.append([(id(obj) in parents) for obj in candidates])
+            else:
+                matched.append([bool(obj.re_search_children(regex)) for obj 
+                    in candidates])
+        return [obj for idx, obj in enumerate(candidates) 
+            if keep([results[idx] for results in matched])]
+
+    def _find_objects_by_parents(self, parentspec, childspec):
+        """SEMI-PRIVATE: Return the objects which match ``childspec`` and 
+        have an ancestor which matches ``parentspec``, in config order.
+
+        If ``parentspec`` could match fewer lines than ``childspec``, the 
+        parents are found first; the descendants of those parents are 
+        searched if they have fewer children than ``childspec`` could match.
+        Otherwise the ancestors of each matching child are checked, and each
+        ancestor is only checked once."""
+        objs = self.ConfigObjs
+        parent_re = compile_regex(parentspec)
+        child_re = compile_regex(childspec)
+        child_count = objs._estimate_lines(child_re)
+
+        ## id() of an object -> whether it, or one of its ancestors, matches
+        ##    parentspec
+        known = dict()
+        is_parent = lambda obj: parent_re.search(obj.text)
+        if objs._estimate_lines(parent_re) < child_count:
+            parents = objs._search_text(parent_re)
+            if sum([len(obj.children) for obj in parents]) < child_count:
+                retval = list()
+                seen = set([])
+                for parent in parents:
+                    if id(parent) in seen:
+                        # Nested in a parent which was already searched
+                        continue
+                    for obj in parent.all_children:
+                        seen.add(id(obj))
+                        if child_re.search(obj.text):
+                            retval.append(obj)
+                return retval
+            for parent in parents:
+                known[id(parent)] = True
+            is_parent = lambda obj: False
+
+        retval = list()
+        for child in objs._search_text(child_re):
+            found = False
+            lineage = list()
+            obj = child
+            while not (obj.parent is obj):
+                obj = obj.parent
+                found = known.get(id(obj))
+                if not (found is None):
+                    break
+                lineage.append(obj)
+                found = bool(is_parent(obj))
+                if found:
+                    break
+            for obj in lineage:
+                known[id(obj)] = found
+            if found:
+                retval.append(child)
+        return retval
+
+    def _parents_of(self, children):
+        """SEMI-PRIVATE: Return a dict which maps id() of each parent of 
+        ``children`` to that parent"""
+        retval = dict()
+        for child in children:
+            parent = child.parent
+            if not (parent is child):
+                retval[id(parent)] = parent
+        return retval
 
     def _find_sibling_OBJ(self, lineobject):
         """SEMI-PRIVATE: Takes a singe object and returns a list of sibling
@@ -2339,13 +2727,13 @@ class CiscoConfParse(object):
         """SEMI-PRIVATE: Takes a single object and returns a list of
         decendants in all 'children' / 'grandchildren' / etc... after it.
         It should NOT return the children of siblings"""
-        # sort the list, and get unique objects
-        retval = set(lineobject.children)
+        retval = list()
         for candidate in lineobject.children:
-            if candidate.has_children:
-                for child in candidate.children:
-                    retval.add(child)
-        retval = sorted(retval)
+            retval.append(candidate)
+            retval.extend(candidate.children)
+        ## Already sorted, unless a comment child sits between a child's own
+        ##    children; sort() only has to merge those runs
+        retval.sort(key=attrgetter('linenum'))
         return retval
 
     def _unique_OBJ(self, objectlist):
@@ -2353,10 +2741,7 @@ class CiscoConfParse(object):
         duplicates).
         The returned value is sorted by configuration line number
         (lowest first)"""
-        retval = set([])
-        for obj in objectlist:
-            retval.add(obj)
-        return sorted(retval)
+        return sorted(set(objectlist), key=attrgetter('linenum'))
 
     def _objects_to_uncfg(self, objectlist, unconflist):
         # Used by req_cfgspec_excl_diff()
@@ -2372,38 +2757,49 @@ class CiscoConfParse(object):
         return retval
 
 
-class IOSConfigList(MutableSequence):
-    """A custom list to hold :class:`~models_cisco.IOSCfgLine` objects.  Most people will never need to use this class directly.
+class BaseConfigList(MutableSequence):
+    """The config list engine shared by :class:`~ciscoconfparse.IOSConfigList`
+    and :class:`~ciscoconfparse.ASAConfigList`.  Most people will never need
+    to use this class directly.
+
+    Everything which differs between config syntaxes (the line classes,
+    banners and brace-delimited text) comes from the syntax's entry in
+    ``_CONFIG_SYNTAXES``, so IOS, ASA and Junos configs share the same
+    hierarchy build and the same insert, delete and relink code.
     """
 
+    syntax = 'ios'      # The default syntax of this config list
+
     def __init__(self,
                  data=None,
                  comment_delimiter='!',
                  debug=False,
                  factory=False,
                  ignore_blank_lines=True,
-                 syntax='ios',
+                 syntax=None,
+                 columnar=False,
+                 cache_dir=None,
                  CiscoConfParse=None):
         """Initialize the class.
 
         Kwargs:
-            - data (list): A list of parsed :class:`~models_cisco.IOSCfgLine` objects
+            - data (list): A list of configuration lines
             - comment (str): A comment delimiter.  This should only be changed when parsing non-Cisco IOS configurations, which do not use a !  as the comment delimiter.  ``comment`` defaults to '!'
             - debug (bool): ``debug`` defaults to False, and should be kept that way unless you're working on a very tricky config parsing problem.  Debug output is not particularly friendly
             - ignore_blank_lines (bool): ``ignore_blank_lines`` defaults to True; when this is set True, ciscoconfparse ignores blank configuration lines.  You might want to set ``ignore_blank_lines`` to False if you intentionally use blank lines in your configuration (ref: Github Issue #2).
+            - syntax (str): ``syntax`` defaults to the syntax of the config list class; 'ios', 'asa' or 'junos'
+            - columnar (bool): ``columnar`` defaults to False; if set ``True``, lines are stored as parallel arrays and line objects are only built when they are used.
+            - cache_dir (str): ``cache_dir`` defaults to None; if set to a directory (or a :class:`~ccp_cache.ParseCache`), the parsed lines are cached there.
 
         Returns:
-           - An instance of an :class:`~ciscoconfparse.IOSConfigList` object.
+           - An instance of a config list object.
 
         """
-        #data = kwargs.get('data', None)
-        #comment_delimiter = kwargs.get('comment_delimiter', '!')
-        #debug = kwargs.get('debug', False)
-        #factory = kwargs.get('factory', False)
-        #ignore_blank_lines = kwargs.get('ignore_blank_lines', True)
-        #syntax = kwargs.get('syntax', 'ios')
-        #CiscoConfParse = kwargs.get('CiscoConfParse', None)
-        super(IOSConfigList, self).__init__()
+        super(BaseConfigList, self).__init__()
+
+        syntax = syntax or self.syntax
+        if not (syntax in _CONFIG_SYNTAXES):
+            raise ValueError("FATAL: '{}' is an unknown syntax".format(syntax))
 
         self._list = list()
         self.CiscoConfParse = CiscoConfParse
@@ -2411,14 +2807,28 @@ class IOSConfigList(MutableSequence):
         self.factory = factory
         self.ignore_blank_lines = ignore_blank_lines
         self.syntax = syntax
-        self.dna = 'IOSConfigList'
+        self.columnar = columnar
+        if isinstance(cache_dir, ParseCache) or (cache_dir is None):
+            self.cache = cache_dir
+        else:
+            self.cache = ParseCache(cache_dir)
+        self.dna = self.__class__.__name__
         self.debug = debug
+        self._syntax = _CONFIG_SYNTAXES[syntax]
+        self._dirty = dict()    # Lines to relink, keyed by id()
+        self._retext = dict()   # Lines whose text changed, keyed by id()
+        self._batch = None      # Edits queued inside a with block
+        self._token_index = None    # Line positions by first word, or 
+                                    #     False once the index is wanted
+        self._text_blob = None      # (text, line offsets) for every line
+        self._generation = 0        # Bumped by every change to the config
+        self._hand_linked = False   # True once add_child() or add_parent()
+                                    #     changed family links
 
         ## Support either a list or a generator instance
         if getattr(data, '__iter__', False):
-            self._list = self._bootstrap_obj_init(data)
-        else:
-            self._list = list()
+            self._list = self._bootstrap_obj_init(data,
+                braces=self._syntax.braces)
 
     def __len__(self):
         return len(self._list)
@@ -2427,8 +2837,12 @@ class IOSConfigList(MutableSequence):
         return self._list[ii]
 
     def __delitem__(self, ii):
-        del self._list[ii]
-        self._bootstrap_from_text()
+        if isinstance(ii, slice):
+            objs = self._list[ii]
+        else:
+            objs = [self._list[ii]]
+        self._delete_lines(objs)
+        self._relink()
 
     def __setitem__(self, ii, val):
         return self._list[ii]
@@ -2437,115 +2851,175 @@ class IOSConfigList(MutableSequence):
         return self.__repr__()
 
     def __enter__(self):
-        # Add support for with statements...
-        # FIXME: *with* statements dont work
-        for obj in self._list:
-            yield obj
+        ## Queue inserts and deletes until the outermost with block exits;
+        ##    see CiscoConfParse.batch()
+        if self._batch is None:
+            self._batch = _ConfigBatch()
+        self._batch.depth += 1
+        return self
 
     def __exit__(self, *args, **kwargs):
-        # FIXME: *with* statements dont work
-        self._list[0].confobj.CiscoConfParse.atomic()
+        self._batch.depth -= 1
+        if self._batch.depth == 0:
+            batch = self._batch
+            self._batch = None
+            batch.apply(self)
+            self._reassign_linenums()
+            self._relink()
 
     def __repr__(self):
-        return """<IOSConfigList, comment='%s', conf=%s>""" % (
+        return """<%s, comment='%s', conf=%s>""" % (self.dna,
             self.comment_delimiter, self._list)
 
     def _bootstrap_from_text(self):
         ## reparse all objects from their text attributes... this is *very* slow
-        ## Ultimate goal: get rid of all reparsing from text... 
-        self._list = self._bootstrap_obj_init(
-            list(map(attrgetter('text'), self._list)))
+        ##    and builds new objects; _relink() is normally enough
+        self._dirty = dict()
+        self._retext = dict()
+        self._config_changed()
+        self._list = self._bootstrap_obj_init(list(self.iter_text()))
         if self.debug:
             _log.debug("self._list = {0}".format(self._list))
 
+    def _relink(self):
+        ## Relink the families of lines which changed since the last relink
+        if self._batch is None:
+            self._generation += 1
+            _relink_config_list(self)
+
+    def _mark_dirty(self, obj):
+        ## obj was inserted or moved; relink its family
+        self._dirty[id(obj)] = obj
+        self._config_changed()
+
+    def _line_text_changed(self, obj):
+        ## Called by BaseCfgLine when obj.text is assigned
+        self._dirty[id(obj)] = obj
+        self._retext[id(obj)] = obj
+        self._config_changed()
+
+    def _config_changed(self):
+        ## Lines were inserted, deleted or changed; start a new generation, 
+        ##    and drop the first-word index and the text blob until the 
+        ##    next query rebuilds them
+        self._generation += 1
+        self._token_index = None
+        self._text_blob = None
+
+    def _links_edited(self):
+        ## Called by BaseCfgLine when add_child() or add_parent() change a 
+        ##    family; the links no longer have to follow the config order
+        self._generation += 1
+        self._hand_linked = True
+
+    def _descendants(self, obj):
+        ## Return the descendants of obj from the slice of lines after it 
+        ##    (see _index_subtrees()), or None if the family links changed
+        ##    since the last relink
+        if self._dirty or self._hand_linked:
+            return None
+        begin = obj.linenum + 1
+        lines = self._list
+        if not ((0 < begin <= len(lines)) and (lines[begin - 1] is obj)):
+            # obj was deleted
+            return None
+        ## Comments without a parent can sit between descendants
+        depth = obj._depth
+        return [child for child in lines[begin:begin + obj._subtree_len] 
+            if child._depth > depth]
+
+    def _delete_lines(self, objs, recurse=False):
+        ## Delete objs (and their descendants if recurse) in one pass
+        return _delete_config_lines(self, objs, recurse=recurse)
+
+    def _new_line(self, val):
+        ## Build the line object for text which is inserted into the config
+        if not getattr(val, 'capitalize', False):
+            raise ValueError('FATAL insert - Cannot insert "{0}"'.format(val))
+        elif self.factory:
+            return ConfigLineFactory(
+                text=val,
+                comment_delimiter=self.comment_delimiter,
+                syntax=self.syntax,
+                confobj=self)
+        return self._syntax.line_class(
+            text=val, comment_delimiter=self.comment_delimiter, confobj=self)
+
     def has_line_with(self, linespec):
-        return bool(filter(methodcaller('re_search', linespec), self._list))
+        ## Stop at the first match
+        for obj in self._iter_search_text(compile_regex(linespec)):
+            return True
+        return False
 
     def insert_before(self, robj, val, atomic=False):
         ## Insert something before robj
         if getattr(robj, 'capitalize', False):
             # robj must not be a string...
             raise ValueError
+        obj = self._new_line(val)
 
-        if getattr(val, 'capitalize', False):
-            if self.factory:
-                obj = ConfigLineFactory(
-                    text=val,
-                    comment_delimiter=self.comment_delimiter,
-                    syntax=self.syntax)
-            elif self.syntax == 'ios':
-                obj = IOSCfgLine(
-                    text=val, comment_delimiter=self.comment_delimiter)
+        if not (self._batch is None):
+            self._batch.insert_before(robj, obj)
+            return
 
+        self._index_lines()
         ii = self._list.index(robj)
         if not (ii is None):
             ## Do insertion here
             self._list.insert(ii, obj)
+            self._mark_dirty(obj)
 
+        ## Just renumber lines...
+        self._reassign_linenums()
         if atomic:
-            # Reparse the whole config as a text list
-            self._bootstrap_from_text()
-        else:
-            ## Just renumber lines...
-            self._reassign_linenums()
+            # Relink the families which changed
+            self._relink()
 
     def insert_after(self, robj, val, atomic=False):
         ## Insert something after robj
         if getattr(robj, 'capitalize', False):
             raise ValueError
+        obj = self._new_line(val)
 
-        ## If val is a string...
-        if getattr(val, 'capitalize', False):
-            if self.factory:
-                obj = ConfigLineFactory(
-                    text=val,
-                    comment_delimiter=self.comment_delimiter,
-                    syntax=self.syntax)
-            elif self.syntax == 'ios':
-                obj = IOSCfgLine(
-                    text=val, comment_delimiter=self.comment_delimiter)
-
-        ## FIXME: This shouldn't be required
-        ## Removed 2015-01-24 during rewrite...
-        #self._reassign_linenums()
+        if not (self._batch is None):
+            self._batch.insert_after(robj, obj)
+            return
 
+        self._index_lines()
         ii = self._list.index(robj)
         if not (ii is None):
             ## Do insertion here
             self._list.insert(ii + 1, obj)
+            self._mark_dirty(obj)
 
+        ## Just renumber lines...
+        self._reassign_linenums()
         if atomic:
-            # Reparse the whole config as a text list
-            self._bootstrap_from_text()
-        else:
-            ## Just renumber lines...
-            self._reassign_linenums()
+            # Relink the families which changed
+            self._relink()
 
     def insert(self, ii, val):
-        if getattr(val, 'capitalize', False):
-            if self.factory:
-                obj = ConfigLineFactory(
-                    text=val,
-                    comment_delimiter=self.comment_delimiter,
-                    syntax=self.syntax)
-            elif self.syntax == 'ios':
-                obj = IOSCfgLine(
-                    text=val, comment_delimiter=self.comment_delimiter)
-            else:
-                raise ValueError(
-                    'FATAL insert string - Cannot insert "{0}"'.format(val))
-        else:
-            raise ValueError('FATAL insert - Cannot insert "{0}"'.format(val))
+        obj = self._new_line(val)
+
+        if not (self._batch is None):
+            self._batch.insert(self._list, ii, obj)
+            return obj
 
         ## Insert something at index ii
+        self._index_lines()
         self._list.insert(ii, obj)
+        self._mark_dirty(obj)
 
         ## Just renumber lines...
         self._reassign_linenums()
+        return obj
 
-    def append(self, val):
+    def append(self, val, atomic=False):
         list_idx = len(self._list)
-        self.insert(list_idx, val)
+        obj = self.insert(list_idx, val)
+        if atomic:
+            self._relink()
+        return obj
 
     def config_heirarchy(self):
         """Walk this configuration and return the following tuple
@@ -2565,545 +3039,412 @@ class IOSConfigList(MutableSequence):
 
         return parent_siblings, nonparent_siblings
 
-    def _banner_mark_regex(self, REGEX):
-        # Build a list of all leading banner lines
-        banner_objs = list(
-            filter(lambda obj: REGEX.search(obj.text), self._list))
-
-        BANNER_STR_RE = r'^(?:(?P<btype>(?:set\s+)*banner\s\w+\s+)(?P<bchar>\S)(?:\S)?)$'
-        for parent in banner_objs:
-            parent.oldest_ancestor = True
-
-            ## Parse out the banner type and delimiting banner character
-            mm = re.search(BANNER_STR_RE, parent.text)
-            if not (mm is None):
-                mm_results = mm.groupdict()
-                (banner_lead, bannerdelimit) = (mm_results['btype'].rstrip(),
-                                                mm_results['bchar'])
+    def _bootstrap_obj_init(self, text_list, braces=False):
+        """Accept a text list and format into proper objects; with
+        ``braces``, the text is a brace-delimited Junos config (see
+        :func:`~ciscoconfparse._junos_lines`)"""
+        syntax = self._syntax
+        if self.factory and not (self.syntax in _LINE_CLASSES):
+            raise ValueError(
+                "FATAL: factory is not supported with syntax='{0}'".format(
+                self.syntax))
+        elif (self.factory=='lazy') and _LINE_CLASSES[self.syntax].own_layout:
+            line_factory = self._lazy_line_factory()
+        elif self.factory=='lazy' and self.columnar:
+            line_factory = lambda line: syntax.lazy_line_class(line,
+                self.comment_delimiter, confobj=self)
+        elif self.factory and not (self.factory=='lazy'):
+            line_factory = lambda line: ConfigLineFactory(
+                line, self.comment_delimiter, syntax=self.syntax,
+                confobj=self)
+        else:
+            ## With factory='lazy', plain lines become placeholders below
+            line_factory = lambda line: syntax.line_class(line,
+                self.comment_delimiter, confobj=self)
+
+        self._hand_linked = False
+        self._config_changed()
+        if self.columnar:
+            if braces:
+                text_list = [line for line, indent in
+                    _junos_lines(text_list, self.comment_delimiter)]
+            retval = _ColumnarLines(text_list, line_factory, confobj=self,
+                comment_delimiter=self.comment_delimiter,
+                ignore_blank_lines=self.ignore_blank_lines,
+                banners=syntax.banners)
+            self._list = retval
+            return retval
+
+        if self.cache is not None:
+            text_list = list(text_list)
+        retval, cache_key = _load_parse_cache(self, text_list)
+        if retval is None:
+            if braces:
+                retval = _build_junos_hierarchy(text_list, line_factory,
+                    confobj=self, comment_delimiter=self.comment_delimiter)
             else:
-                (banner_lead, bannerdelimit) = ('', None)
-
-            if self.debug:
-                _log.debug("banner_lead = '{0}'".format(banner_lead))
-                _log.debug("bannerdelimit = '{0}'".format(bannerdelimit))
-                _log.debug("{0} starts at line {1}".format(banner_lead,
-                                                           parent.linenum))
-
-            idx = parent.linenum
-            while not (bannerdelimit is None):
-                ## Check whether the banner line has both begin and end delimter
-                if idx == parent.linenum:
-                    parts = parent.text.split(bannerdelimit)
-                    if len(parts) > 2:
-                        ## banner has both begin and end delimiter on one line
-                        if self.debug:
-                            _log.debug("{0} ends at line"
-                                       " {1}".format(banner_lead,
-                                                     parent.linenum))
-                        break
-
-                idx += 1
-                try:
-                    obj = self._list[idx]
-                    if (obj.text is None):
-                        if self.debug:
-                            _log.warning(
-                                "found empty text while parsing '{0}' in the banner".
-                                format(obj))
-                        pass
-                    elif bannerdelimit in obj.text.strip():
-                        if self.debug:
-                            _log.debug("{0} ends at line"
-                                       " {1}".format(banner_lead, obj.linenum))
-                        parent.children.append(obj)
-                        parent.child_indent = 0
-                        obj.parent = parent
-                        break
-                    elif obj.is_comment and (obj.indent == 0):
-                        break
-                    parent.children.append(obj)
-                    parent.child_indent = 0
-                    obj.parent = parent
-                except IndexError:
-                    break
-
-    def _bootstrap_obj_init(self, text_list):
-        """Accept a text list and format into proper objects"""
-        # Append text lines as IOSCfgLine objects...
-        BANNER_STR = set([
-            'login',
-            'motd',
-            'incoming',
-            'exec',
-            'telnet',
-            'lcd',
-        ])
-        BANNER_RE = re.compile('|'.join(
-            [r'^(set\s+)*banner\s+{0}'.format(ii) for ii in BANNER_STR]))
-        retval = list()
-        idx = 0
+                retval = _build_config_hierarchy(
+                    text_list, line_factory, confobj=self,
+                    ignore_blank_lines=self.ignore_blank_lines,
+                    banners=syntax.banners)
+            data = (cache_key is not None) and _dump_config_hierarchy(retval)
+            if data:
+                self.cache.store(cache_key, data)
 
-        max_indent = 0
-        parents = dict()
-        for line in text_list:
-            # Reject empty lines if ignore_blank_lines...
-            if self.ignore_blank_lines and line.strip() == '':
-                continue
-            # 
-            if not self.factory:
-                obj = IOSCfgLine(line, self.comment_delimiter)
-            elif self.syntax == 'ios':
-                obj = ConfigLineFactory(
-                    line, self.comment_delimiter, syntax='ios')
-            else:
-                raise ValueError
+        self._list = retval
+        if self.factory=='lazy':
+            _use_lazy_lines(retval, self.syntax)
+        return retval
 
-            obj.confobj = self
-            obj.linenum = idx
-            indent = len(line) - len(line.lstrip())
-            obj.indent = indent
+    def _lazy_line_factory(self):
+        ## factory='lazy' placeholders can't be promoted to classes with 
+        ##    their own layout, so those lines are built up front
+        line_classes = _LINE_CLASSES[self.syntax]
+        if self.columnar:
+            placeholder = self._syntax.lazy_line_class
+        else:
+            ## Plain lines become placeholders after the parse
+            placeholder = self._syntax.line_class
 
-            is_config_line = obj.is_config_line
-
-            ## Parent cache:
-            ## Maintain indent vs max_indent in a family and
-            ##     cache the parent until indent<max_indent
-            if (indent < max_indent) and is_config_line:
-                parent = None
-                # walk parents and intelligently prune stale parents
-                stale_parent_idxs = filter(
-                    lambda ii: ii >= indent,
-                    sorted(
-                        parents.keys(), reverse=True))
-                for parent_idx in stale_parent_idxs:
-                    del parents[parent_idx]
-            else:
-                ## As long as the child indent hasn't gone backwards, 
-                ##    we can use a cached parent
-                parent = parents.get(indent, None)
-
-            ## If indented, walk backwards and find the parent...
-            ## 1.  Assign parent to the child
-            ## 2.  Assign child to the parent
-            ## 3.  Assign parent's child_indent
-            ## 4.  Maintain oldest_ancestor
-            if (indent > 0) and not (parent is None):
-                ## Add the line as a child (parent was cached)
-                self._add_child_to_parent(retval, idx, indent, parent, obj)
-            elif (indent > 0) and (parent is None):
-                ## Walk backwards to find parent, and add the line as a child
-                candidate_parent_index = idx - 1
-                while candidate_parent_index >= 0:
-                    candidate_parent = retval[candidate_parent_index]
-                    if (candidate_parent.indent<indent) and \
-                        candidate_parent.is_config_line:
-                        # We found the parent
-                        parent = candidate_parent
-                        parents[indent] = parent  # Cache the parent
-                        if indent == 0:
-                            parent.oldest_ancestor = True
-                        break
-                    else:
-                        candidate_parent_index -= 1
+        def line_factory(line):
+            cls = line_classes.eager_class(line) or placeholder
+            return cls(line, self.comment_delimiter, confobj=self)
+        return line_factory
 
-                ## Add the line as a child...
-                self._add_child_to_parent(retval, idx, indent, parent, obj)
-
-            ## Handle max_indent
-            if (indent == 0) and is_config_line:
-                # only do this if it's a config line...
-                max_indent = 0
-            elif indent > max_indent:
-                max_indent = indent
-
-            retval.append(obj)
-            idx += 1
-
-        self._list = retval
-        self._banner_mark_regex(BANNER_RE)
-        return retval
-
-    def _add_child_to_parent(self, _list, idx, indent, parentobj, childobj):
-        ## parentobj could be None when trying to add a child that should not 
-        ##    have a parent
-        if parentobj is None:
-            if self.debug:
-                _log.debug("parentobj is None")
-            return
-
-        if self.debug:
-            #_log.debug("Adding child '{0}' to parent"
-            #    " '{1}'".format(childobj, parentobj))
-            #_log.debug("BEFORE parent.children - {0}"
-            #    .format(parentobj.children))
-            pass
-        if childobj.is_comment and (_list[idx - 1].indent > indent):
-            ## I *really* hate making this exception, but legacy 
-            ##   ciscoconfparse never marked a comment as a child 
-            ##   when the line immediately above it was indented more
-            ##   than the comment line
-            pass
-        elif (childobj.parent is childobj):
-            # Child has not been assigned yet
-            parentobj.children.append(childobj)
-            childobj.parent = parentobj
-            childobj.parent.child_indent = indent
-        else:
-            pass
-
-        if self.debug:
-            #_log.debug("     AFTER parent.children - {0}"
-            #    .format(parentobj.children))
-            pass
-
-    def iter_with_comments(self, begin_index=0):
-        for idx, obj in enumerate(self._list):
-            if (idx >= begin_index):
-                yield obj
+    def iter_with_comments(self, begin_index=0):
+        for idx, obj in enumerate(self._list):
+            if (idx >= begin_index):
+                yield obj
 
     def iter_no_comments(self, begin_index=0):
         for idx, obj in enumerate(self._list):
             if (idx >= begin_index) and (not obj.is_comment):
                 yield obj
 
-    def _reassign_linenums(self):
-        # Call this after any insertion or deletion
-        for idx, obj in enumerate(self._list):
-            obj.linenum = idx
-
-    @property
-    def all_parents(self):
-        return [obj for obj in self._list if obj.has_children]
-
-    @property
-    def last_index(self):
-        return (self.__len__() - 1)
-
-
-class ASAConfigList(MutableSequence):
-    """A custom list to hold :class:`~models_asa.ASACfgLine` objects.  Most 
-       people will never need to use this class directly.
-
-
-    """
-
-    def __init__(self,
-                 data=None,
-                 comment_delimiter='!',
-                 debug=False,
-                 factory=False,
-                 ignore_blank_lines=True,
-                 syntax='asa',
-                 CiscoConfParse=None):
-        """Initialize the class.
-
-        Kwargs:
-            - data (list): A list of parsed :class:`~models_asa.ASACfgLine` objects
-            - comment (str): A comment delimiter.  This should only be changed when parsing non-Cisco IOS configurations, which do not use a !  as the comment delimiter.  ``comment`` defaults to '!'
-            - debug (bool): ``debug`` defaults to False, and should be kept that way unless you're working on a very tricky config parsing problem.  Debug output is not particularly friendly
-            - ignore_blank_lines (bool): ``ignore_blank_lines`` defaults to True; when this is set True, ciscoconfparse ignores blank configuration lines.  You might want to set ``ignore_blank_lines`` to False if you intentionally use blank lines in your configuration.
-
-        Attributes:
-            - names (dict): A Python dictionary, which maps a Cisco ASA name to a string representing the address
-            - object_group_network (dict): A Python dictionary, which maps a Cisco ASA object-group network name to the :class:`~models_asa.ASAObjNetwork` object
-            - object_group_service (dict): A Python dictionary, which maps a Cisco ASA object-group service name to the :class:`~models_asa.ASAObjService` object
-            - access_list (dict): A Python dictionary, which maps a Cisco ASA access-list name to the list of ACEs for that ACL
- 
-        Returns:
-            - An instance of an :class:`~ciscoconfparse.ASAConfigList` object.
- 
-        """
-        super(ASAConfigList, self).__init__()
-
-        self._list = list()
-        self.CiscoConfParse = CiscoConfParse
-        self.comment_delimiter = comment_delimiter
-        self.factory = factory
-        self.ignore_blank_lines = ignore_blank_lines
-        self.syntax = syntax
-        self.dna = 'ASAConfigList'
-        self.debug = debug
-
-        ## Support either a list or a generator instance
-        if getattr(data, '__iter__', False):
-            self._bootstrap_obj_init(data)
+    def iter_text(self):
+        """Iterate over the text of each line; with ``columnar=True`` this
+        does not build line objects"""
+        if self.columnar:
+            return self._list.iter_text()
+        return (obj.text for obj in self._list)
+
+    def _search_text(self, regex):
+        ## Return objects whose text matches the compiled regex; a regex
+        ##    anchored on a literal only runs on lines which start with it,
+        ##    and other regexes scan the text blob
+        positions = self._candidate_lines(regex)
+        if positions is None:
+            found = self._search_blob(regex)
+            if not (found is None):
+                objs = self._list
+                return [objs[idx] for idx in found]
+        if self.columnar:
+            return self._list.search_text(regex, positions)
+        elif positions is None:
+            return [obj for obj in self._list if regex.search(obj._text)]
+        objs = self._list
+        return [obj for obj in [objs[idx] for idx in positions]
+            if regex.search(obj._text)]
+
+    def _iter_search_text(self, regex):
+        ## Yield the objects whose text matches the compiled regex, in 
+        ##    config order; nothing after the last object used is searched
+        lines = self._list
+        if self.columnar:
+            return (lines[idx] for idx in self._iter_search_idx(regex))
+        positions = self._candidate_lines(regex)
+        if positions is None:
+            objs = iter(lines)
         else:
-            self._list = list()
-
-        ###
-        ### Internal structures
-        self._RE_NAMES = re.compile(r'^\s*name\s+(\d+\.\d+\.\d+\.\d+)\s+(\S+)')
-        self._RE_OBJNET = re.compile(r'^\s*object-group\s+network\s+(\S+)')
-        self._RE_OBJSVC = re.compile(r'^\s*object-group\s+service\s+(\S+)')
-        self._RE_OBJACL = re.compile(r'^\s*access-list\s+(\S+)')
-        self._network_cache = dict()
-
-    def __len__(self):
-        return len(self._list)
-
-    def __getitem__(self, ii):
-        return self._list[ii]
-
-    def __delitem__(self, ii):
-        del self._list[ii]
-        self._bootstrap_from_text()
-
-    def __setitem__(self, ii, val):
-        return self._list[ii]
-
-    def __str__(self):
-        return self.__repr__()
-
-    def __enter__(self):
-        # Add support for with statements...
-        # FIXME: *with* statements dont work
-        for obj in self._list:
-            yield obj
-
-    def __exit__(self, *args, **kwargs):
-        # FIXME: *with* statements dont work
-        self._list[0].confobj.CiscoConfParse.atomic()
-
-    def __repr__(self):
-        return """<ASAConfigList, comment='%s', conf=%s>""" % (
-            self.comment_delimiter, self._list)
-
-    def _bootstrap_from_text(self):
-        ## reparse all objects from their text attributes... this is *very* slow
-        ## Ultimate goal: get rid of all reparsing from text... 
-        self._list = self._bootstrap_obj_init(
-            list(map(attrgetter('text'), self._list)))
-
-    def has_line_with(self, linespec):
-        return bool(filter(methodcaller('re_search', linespec), self._list))
-
-    def insert_before(self, robj, val, atomic=False):
-        ## Insert something before robj
-        if getattr(robj, 'capitalize', False):
-            raise ValueError
-
-        if getattr(val, 'capitalize', False):
-            if self.factory:
-                obj = ConfigLineFactory(
-                    text=val,
-                    comment_delimiter=self.comment_delimiter,
-                    syntax=self.syntax)
-            elif self.syntax == 'asa':
-                obj = ASACfgLine(
-                    text=val, comment_delimiter=self.comment_delimiter)
-
-        ii = self._list.index(robj)
-        if not (ii is None):
-            ## Do insertion here
-            self._list.insert(ii, obj)
-
-        if atomic:
-            # Reparse the whole config as a text list
-            self._bootstrap_from_text()
+            objs = (lines[idx] for idx in positions)
+        return (obj for obj in objs if regex.search(obj._text))
+
+    def _iter_search_idx(self, regex):
+        ## Yield the positions of the lines whose text matches the compiled
+        ##    regex, without building line objects
+        positions = self._candidate_lines(regex)
+        if positions is None:
+            pairs = enumerate(self.iter_text())
+        elif self.columnar:
+            text_at = self._list.text_at
+            pairs = ((idx, text_at(idx)) for idx in positions)
         else:
-            ## Just renumber lines...
-            self._reassign_linenums()
-
-    def insert_after(self, robj, val, atomic=False):
-        ## Insert something after robj
-        if getattr(robj, 'capitalize', False):
-            raise ValueError
-
-        if getattr(val, 'capitalize', False):
-            if self.factory:
-                obj = ConfigLineFactory(
-                    text=val,
-                    comment_delimiter=self.comment_delimiter,
-                    syntax=self.syntax)
-            elif self.syntax == 'asa':
-                obj = ASACfgLine(
-                    text=val, comment_delimiter=self.comment_delimiter)
-
-        ## FIXME: This shouldn't be required
-        self._reassign_linenums()
-
-        ii = self._list.index(robj)
-        if not (ii is None):
-            ## Do insertion here
-            self._list.insert(ii + 1, obj)
+            lines = self._list
+            pairs = ((idx, lines[idx]._text) for idx in positions)
+        return (idx for idx, text in pairs if regex.search(text))
+
+    def _search_blob(self, regex):
+        """Return the positions of the lines whose text matches the compiled
+        ``regex``, found with one search of the text of every line joined by 
+        newlines, or None if ``regex`` cannot search the joined text (see 
+        :func:`~ccp_regex.multiline_regex`)"""
+        blob_regex = multiline_regex(regex)
+        if blob_regex is None:
+            return None
+        blob = self._blob_offsets()
+        if blob is None:
+            return None
+        text, offsets = blob
+        search = blob_regex.search
+        last = len(offsets) - 1
+        end = len(text)
+        retval = list()
+        pos = 0
+        while pos <= end:
+            match = search(text, pos)
+            if match is None:
+                break
+            idx = bisect_right(offsets, match.start()) - 1
+            ## Resume on the next line; a hit which runs into it must match 
+            ##    the line by itself
+            if idx < last:
+                pos = offsets[idx + 1]
+            else:
+                pos = end + 1
+            if (match.end() < pos) or regex.search(text[offsets[idx]:pos - 1]):
+                retval.append(idx)
+        return retval
 
-        if atomic:
-            # Reparse the whole config as a text list
-            self._bootstrap_from_text()
+    def _search_tokens(self, pattern, exactmatch=False):
+        """Return the objects whose words match ``pattern``, like 
+        :meth:`~ccp_abc.BaseCfgLine.match_tokens`.  A pattern which starts 
+        with a word only looks at the lines which start with it (see 
+        :meth:`_first_token_index`)"""
+        size = len(pattern)
+        checks = [(idx, token) for idx, token in enumerate(pattern) 
+            if not (token is ANY)]
+        lines = self._list
+        positions = None
+        if checks and checks[0][0]==0:
+            positions = self._first_token_index().get(checks[0][1], ())
+            checks = checks[1:]
+        ## A line without the longest word cannot match; a substring test 
+        ##    is cheaper than splitting the line
+        probe = ''
+        for idx, token in checks:
+            if len(token) > len(probe):
+                probe = token
+        if (positions is None) and probe:
+            positions = self._lines_containing(probe)
+        if positions is None:
+            positions = range(len(lines))
+
+        if self.columnar:
+            text_at = lines.text_at
+            pairs = ((idx, text_at(idx)) for idx in positions)
+            pairs = ((idx, text.split()) for idx, text in pairs 
+                if probe in text)
         else:
-            ## Just renumber lines...
-            self._reassign_linenums()
-
-    def insert(self, ii, val):
-        ## Insert something at index ii
-        if getattr(val, 'capitalize', False):
-            if self.factory:
-                obj = ConfigLineFactory(
-                    text=val,
-                    comment_delimiter=self.comment_delimiter,
-                    syntax=self.syntax)
-            elif self.syntax == 'asa':
-                obj = ASACfgLine(
-                    text=val, comment_delimiter=self.comment_delimiter)
-
-        self._list.insert(ii, obj)
-
-        ## Just renumber lines...
-        self._reassign_linenums()
-
-    def append(self, val, atomic=False):
-        list_idx = len(self._list)
-        self.insert(list_idx, val, atomic)
-
-    def config_heirarchy(self):
-        """Walk this configuration and return the following tuple
-        at each parent 'level':
-            (list_of_parent_siblings, list_of_nonparent_siblings)"""
-        parent_siblings = list()
-        nonparent_siblings = list()
+            pairs = self._iter_tokens([lines[idx] for idx in positions], 
+                probe)
 
-        for obj in self.CiscoConfParse.find_objects('^\S+'):
-            if obj.is_comment:
+        retval = list()
+        for line, tokens in pairs:
+            if (len(tokens) < size) or (exactmatch and len(tokens) > size):
                 continue
-            elif len(obj.children) == 0:
-                nonparent_siblings.append(obj)
+            for idx, token in checks:
+                if tokens[idx]!=token:
+                    break
             else:
-                parent_siblings.append(obj)
-
-        return parent_siblings, nonparent_siblings
+                retval.append(line)
+        if self.columnar:
+            return [lines[idx] for idx in retval]
+        return retval
 
-    def _bootstrap_obj_init(self, text_list):
-        """Accept a text list and format into proper objects"""
-        # Append text lines as IOSCfgLine objects...
+    def _lines_containing(self, probe):
+        """Return the positions of the lines whose text contains ``probe``
+        (which must not contain a newline), found with ``find()`` on the text 
+        blob, or None if there is no blob"""
+        blob = self._blob_offsets()
+        if blob is None:
+            return None
+        text, offsets = blob
+        last = len(offsets) - 1
         retval = list()
-        idx = 0
-
-        max_indent = 0
-        parents = dict()
-        for line in text_list:
-            # Reject empty lines if ignore_blank_lines...
-            if self.ignore_blank_lines and line.strip() == '':
-                continue
+        pos = text.find(probe)
+        while pos >= 0:
+            idx = bisect_right(offsets, pos) - 1
+            retval.append(idx)
+            if idx==last:
+                break
+            pos = text.find(probe, offsets[idx + 1])
+        return retval
 
-            if self.syntax == 'asa' and self.factory:
-                obj = ConfigLineFactory(
-                    line, self.comment_delimiter, syntax='asa')
-            elif self.syntax == 'asa' and not self.factory:
-                obj = ASACfgLine(
-                    text=line, comment_delimiter=self.comment_delimiter)
+    def _iter_tokens(self, objs, probe):
+        ## Yield (obj, obj.tokens) for objs, skipping the lines which were 
+        ##    not split yet and do not contain probe
+        for obj in objs:
+            tokens = obj._tokens
+            if tokens is None:
+                if not (probe in obj._text):
+                    continue
+                tokens = obj.tokens
+            yield obj, tokens
+
+    def _blob_offsets(self):
+        """Return the text of every line joined by newlines, and the sorted 
+        offsets where each line starts in it, or None if a line contains a 
+        newline.  The blob is built when it is first used, and rebuilt after 
+        the config changes"""
+        if self._text_blob is None:
+            if self.columnar:
+                texts = list(self._list.iter_text())
             else:
-                raise ValueError
-
-            obj.confobj = self
-            obj.linenum = idx
-            indent = len(line) - len(line.lstrip())
-            obj.indent = indent
-
-            is_config_line = obj.is_config_line
-
-            ## Parent cache:
-            ## Maintain indent vs max_indent in a family and
-            ##     cache the parent until indent<max_indent
-            if (indent < max_indent) and is_config_line:
-                parent = None
-                # walk parents and intelligently prune stale parents
-                stale_parent_idxs = filter(
-                    lambda ii: ii >= indent,
-                    sorted(
-                        parents.keys(), reverse=True))
-                for parent_idx in stale_parent_idxs:
-                    del parents[parent_idx]
+                texts = [obj._text for obj in self._list]
+            offsets = list()
+            pos = 0
+            for text in texts:
+                offsets.append(pos)
+                pos += len(text) + 1
+            text = '\n'.join(texts)
+            if (not texts) or text.count('\n') != len(texts) - 1:
+                self._text_blob = False
             else:
-                ## As long as the child indent hasn't gone backwards, 
-                ##    we can use a cached parent
-                parent = parents.get(indent, None)
-
-            ## If indented, walk backwards and find the parent...
-            ## 1.  Assign parent to the child
-            ## 2.  Assign child to the parent
-            ## 3.  Assign parent's child_indent
-            ## 4.  Maintain oldest_ancestor
-            if (indent > 0) and not (parent is None):
-                ## Add the line as a child (parent was cached)
-                self._add_child_to_parent(retval, idx, indent, parent, obj)
-            elif (indent > 0) and (parent is None):
-                ## Walk backwards to find parent, and add the line as a child
-                candidate_parent_index = idx - 1
-                while candidate_parent_index >= 0:
-                    candidate_parent = retval[candidate_parent_index]
-                    if (candidate_parent.indent<indent) and \
-                        candidate_parent.is_config_line:
-                        # We found the parent
-                        parent = candidate_parent
-                        parents[indent] = parent  # Cache the parent
-                        if indent == 0:
-                            parent.oldest_ancestor = True
-                        break
-                    else:
-                        candidate_parent_index -= 1
-
-                ## Add the line as a child...
-                self._add_child_to_parent(retval, idx, indent, parent, obj)
-
-            ## Handle max_indent
-            if (indent == 0) and is_config_line:
-                # only do this if it's a config line...
-                max_indent = 0
-            elif indent > max_indent:
-                max_indent = indent
-
-            retval.append(obj)
-            idx += 1
-
-        self._list = retval
-        ## Insert ASA-specific banner processing here, if required
+                self._text_blob = (text, offsets)
+        return self._text_blob or None
+
+    def _count_text(self, regex):
+        ## Count the lines whose text matches the compiled regex
+        if self._candidate_lines(regex) is None:
+            found = self._search_blob(regex)
+            if not (found is None):
+                return len(found)
+        if self.columnar:
+            matches = self._iter_search_idx(regex)
+        else:
+            matches = self._iter_search_text(regex)
+        count = 0
+        for match in matches:
+            count += 1
+        return count
+
+    def _search_text_multi(self, regexes):
+        ## Return the objects which match each compiled regex.  Regexes 
+        ##    which search the same lines (every line, or the lines which 
+        ##    start with the same word) share one pass over those lines
+        use_index = len([regex for regex in regexes 
+            if not (literal_prefixes(regex) is None)]) > 1
+        if use_index:
+            ## Several anchored regexes pay for the first-word index
+            self._first_token_index()
+        passes = dict()
+        for idx, regex in enumerate(regexes):
+            positions = None
+            if use_index:
+                positions = self._candidate_lines(regex)
+            key = (positions is None) and -1 or id(positions)
+            passes.setdefault(key, (positions, list()))[1].append(idx)
+
+        retval = [None] * len(regexes)
+        for positions, members in passes.values():
+            found = self._search_lines_multi(
+                [regexes[idx] for idx in members], positions)
+            for idx, objs in zip(members, found):
+                retval[idx] = objs
         return retval
 
-    def _add_child_to_parent(self, _list, idx, indent, parentobj, childobj):
-        ## parentobj could be None when trying to add a child that should not 
-        ##    have a parent
-        if parentobj is None:
-            if self.debug:
-                _log.debug("parentobj is None")
-            return
-
-        if self.debug:
-            _log.debug("Adding child '{0}' to parent"
-                       " '{1}'".format(childobj, parentobj))
-            _log.debug("     BEFORE parent.children - {0}"
-                       .format(parentobj.children))
-        if childobj.is_comment and (_list[idx - 1].indent > indent):
-            ## I *really* hate making this exception, but legacy 
-            ##   ciscoconfparse never marked a comment as a child 
-            ##   when the line immediately above it was indented more
-            ##   than the comment line
-            pass
-        elif (childobj.parent is childobj):
-            # Child has not been assigned yet
-            parentobj.children.append(childobj)
-            childobj.parent = parentobj
-            childobj.parent.child_indent = indent
+    def _search_lines_multi(self, regexes, positions=None):
+        ## Search the lines at positions (or every line) for each compiled 
+        ##    regex, using the alternations from ccp_regex.combine_regexes()
+        lines = self._list
+        if positions is None:
+            if self.columnar:
+                items = enumerate(lines.iter_text())
+            else:
+                items = ((obj, obj._text) for obj in lines)
+        elif self.columnar:
+            items = ((idx, lines.text_at(idx)) for idx in positions)
         else:
-            pass
-
-        if self.debug:
-            _log.debug("     AFTER parent.children - {0}"
-                       .format(parentobj.children))
-
-    def iter_with_comments(self, begin_index=0):
-        for idx, obj in enumerate(self._list):
-            if (idx >= begin_index):
-                yield obj
+            items = ((obj, obj._text) for obj in 
+                [lines[idx] for idx in positions])
+
+        groups = combine_regexes(regexes)
+        retval = [list() for regex in regexes]
+        for line, text in items:
+            for combined, members in groups:
+                if (combined is None) or combined.search(text):
+                    for idx in members:
+                        if regexes[idx].search(text):
+                            retval[idx].append(line)
+        if self.columnar:
+            retval = [[lines[idx] for idx in found] for found in retval]
+        return retval
 
-    def iter_no_comments(self, begin_index=0):
-        for idx, obj in enumerate(self._list):
-            if (idx >= begin_index) and (not obj.is_comment):
-                yield obj
+    def _candidate_lines(self, regex):
+        """Return the sorted positions of the lines which could match the
+        compiled ``regex``, or None if every line could match.  See
+        :func:`~ccp_regex.literal_prefixes`"""
+        prefixes = literal_prefixes(regex)
+        if prefixes is None:
+            return None
+        elif self._token_index is None:
+            ## Building the index costs about as much as two scans, so wait
+            ##    for a second query before the config changes again
+            self._token_index = False
+            return None
+        index = self._first_token_index()
+        found = list()
+        for literal, exact in prefixes:
+            if exact:
+                found.append(index.get(literal, ()))
+            else:
+                found.extend([positions for token, positions in 
+                    index.items() if token.startswith(literal)])
+        if len(found)==1:
+            return found[0]
+        return sorted(set(chain.from_iterable(found)))
+
+    def _estimate_lines(self, regex):
+        """Return the number of lines which a search for the compiled 
+        ``regex`` has to look at; the query planner compares these counts"""
+        positions = self._candidate_lines(regex)
+        if positions is None:
+            return len(self._list)
+        return len(positions)
+
+    def _first_token_index(self):
+        """Return a dict which maps the first word of each line to the 
+        positions of the lines which start with it; the index is built when 
+        it is first used, and rebuilt after the config changes"""
+        if not self._token_index:
+            if self.columnar:
+                texts = self._list.iter_text()
+            else:
+                texts = [obj._text for obj in self._list]
+            index = dict()
+            for idx, text in enumerate(texts):
+                words = text.split(None, 1)
+                if words:
+                    index.setdefault(words[0], list()).append(idx)
+            self._token_index = index
+        return self._token_index
 
     def _reassign_linenums(self):
         # Call this after any insertion or deletion
+        if not (self._batch is None):
+            # Nothing moves until the batch is applied
+            return
+        elif not (type(self._list) is list):
+            # _ChunkedLines (and edited _ColumnarLines) derive linenums
+            return
         for idx, obj in enumerate(self._list):
-            obj.linenum = idx
+            obj._linenum = idx
+
+    def _index_lines(self):
+        ## Index line positions before the first insert or delete, so
+        ##    neither needs list.index() or renumbering every line
+        if type(self._list) is list:
+            self._list = _ChunkedLines(self._list)
+
+    def _chunked_lines(self):
+        ## Return the _ChunkedLines which holds the line objects, so lines 
+        ##    can be deleted and relinked in place
+        self._index_lines()
+        lines = self._list
+        if isinstance(lines, _ColumnarLines):
+            lines._detach()
+            lines = lines._objs
+        return lines
 
     @property
     def all_parents(self):
@@ -3113,6 +3454,34 @@ class ASAConfigList(MutableSequence):
     def last_index(self):
         return (self.__len__() - 1)
 
+
+class IOSConfigList(BaseConfigList):
+    """A custom list to hold :class:`~models_cisco.IOSCfgLine` objects (or
+    :class:`~models_junos.JunosCfgLine` objects, with ``syntax='junos'``).
+    Most people will never need to use this class directly.  See
+    :class:`~ciscoconfparse.BaseConfigList` for its arguments.
+    """
+
+    syntax = 'ios'
+
+
+class ASAConfigList(BaseConfigList):
+    """A custom list to hold :class:`~models_asa.ASACfgLine` objects.  Most
+       people will never need to use this class directly.  See
+       :class:`~ciscoconfparse.BaseConfigList` for its arguments.
+
+       Attributes:
+           - names (dict): A Python dictionary, which maps a Cisco ASA name to a string representing the address
+           - object_group_network (dict): A Python dictionary, which maps a Cisco ASA object-group network name to the :class:`~models_asa.ASAObjNetwork` object
+           - access_list (dict): A Python dictionary, which maps a Cisco ASA access-list name to the list of ACEs for that ACL
+    """
+
+    syntax = 'asa'
+
+    def __init__(self, *args, **kwargs):
+        super(ASAConfigList, self).__init__(*args, **kwargs)
+        self._network_cache = dict()
+
     ###
     ### ASA-specific stuff here...
     ###
@@ -3120,7 +3489,7 @@ class ASAConfigList(MutableSequence):
     def names(self):
         """Return a dictionary of name to address mappings"""
         retval = dict()
-        name_rgx = self._RE_NAMES
+        name_rgx = self._syntax.symbols['names']
         for obj in self.CiscoConfParse.find_objects(name_rgx):
             addr = obj.re_match_typed(name_rgx, group=1, result_type=str)
             name = obj.re_match_typed(name_rgx, group=2, result_type=str)
@@ -3131,7 +3500,7 @@ class ASAConfigList(MutableSequence):
     def object_group_network(self):
         """Return a dictionary of name to object-group network mappings"""
         retval = dict()
-        obj_rgx = self._RE_OBJNET
+        obj_rgx = self._syntax.symbols['object_group_network']
         for obj in self.CiscoConfParse.find_objects(obj_rgx):
             name = obj.re_match_typed(obj_rgx, group=1, result_type=str)
             retval[name] = obj
@@ -3141,9 +3510,9 @@ class ASAConfigList(MutableSequence):
     def access_list(self):
         """Return a dictionary of ACL name to ACE (list) mappings"""
         retval = dict()
-        for obj in self.CiscoConfParse.find_objects(self._RE_OBJACL):
-            name = obj.re_match_typed(
-                self._RE_OBJACL, group=1, result_type=str)
+        acl_rgx = self._syntax.symbols['access_list']
+        for obj in self.CiscoConfParse.find_objects(acl_rgx):
+            name = obj.re_match_typed(acl_rgx, group=1, result_type=str)
             tmp = retval.get(name, [])
             tmp.append(obj)
             retval[name] = tmp
@@ -3202,31 +3571,1789 @@ class CiscoPassword(object):
         return dp
 
 
-def ConfigLineFactory(text="", comment_delimiter="!", syntax='ios'):
-    # Complicted & Buggy
-    #classes = [j for (i,j) in globals().iteritems() if isinstance(j, TypeType) and issubclass(j, BaseCfgLine)]
-
-    ## Manual and simple
-    if syntax == 'ios':
-        classes = [
-            IOSIntfLine, IOSRouteLine, IOSAccessLine,
-            IOSAaaLoginAuthenticationLine, IOSAaaEnableAuthenticationLine,
-            IOSAaaCommandsAuthorizationLine, IOSAaaCommandsAccountingLine,
-            IOSAaaExecAccountingLine, IOSAaaGroupServerLine, IOSHostnameLine,
-            IOSIntfGlobal, IOSCfgLine
-        ]  # This is simple
-    elif syntax == 'asa':
-        classes = [
-            ASAName, ASAObjNetwork, ASAObjService, ASAObjGroupNetwork,
-            ASAObjGroupService, ASAIntfLine, ASAIntfGlobal, ASAHostnameLine,
-            ASAAclLine, ASACfgLine
-        ]
-    for cls in classes:
-        if cls.is_object_for(text):
-            inst = cls(text=text, comment_delimiter=comment_delimiter
-                       )  # instance of the proper subclass
-            return inst
-    raise ValueError("Could not find an object for '%s'" % line)
+class ParseResult(object):
+    """The result of parsing one file with 
+    :func:`~ciscoconfparse.parse_many`.
+
+    Results are small and picklable, because the parsed lines are held in 
+    the compact form used by the parse cache; the 
+    :class:`~ciscoconfparse.CiscoConfParse` instance is only built when 
+    ``parse`` is first read, in the process which reads it.
+
+    Attributes:
+        - path (str): The path of the configuration file
+        - parse (:class:`~ciscoconfparse.CiscoConfParse`): The parsed configuration, or None if there was an error
+        - error (str): None, or a description of the exception raised while parsing ``path``
+        - traceback (str): None, or the traceback of the exception raised while parsing ``path``
+        - elapsed (float): Seconds spent parsing ``path``
+        - lines (int): The number of parsed configuration lines
+    """
+
+    def __init__(self, path, options=None, data=None, error=None,
+        traceback=None, elapsed=0.0):
+        self.path = path
+        self.options = options or dict()
+        self.error = error
+        self.traceback = traceback
+        self.elapsed = elapsed
+        self._data = data
+        self._parse = None
+
+    def __repr__(self):
+        if self.error:
+            return "<ParseResult '{0}' error: {1}>".format(self.path, 
+                self.error)
+        return "<ParseResult '{0}' lines: {1} elapsed: {2:.3f}s>".format(
+            self.path, self.lines, self.elapsed)
+
+    def __getstate__(self):
+        ## Never pickle the objects; they are rebuilt from _data
+        state = self.__dict__.copy()
+        state['_parse'] = None
+        return state
+
+    @property
+    def lines(self):
+        if self._data is None:
+            return 0
+        return len(self._data['tags'])
+
+    @property
+    def parse(self):
+        if (self._parse is None) and (self._data is not None):
+            self._parse = _parse_from_dump(self._data, **self.options)
+        return self._parse
+
+
+def parse_many(paths, syntax='ios', factory=False, workers=None, **kwargs):
+    """Parse many configuration files in a pool of worker processes, and 
+    yield a :class:`~ciscoconfparse.ParseResult` for each file as soon as 
+    it is parsed; results are not in the same order as ``paths``.
+
+    An exception while parsing one file is recorded in its 
+    :class:`~ciscoconfparse.ParseResult`, and the other files are still 
+    parsed.
+
+    Args:
+        - paths (list): Paths of the configuration files
+    Kwargs:
+        - syntax (str): The syntax of all the files; see :class:`~ciscoconfparse.CiscoConfParse`
+        - factory (bool): See :class:`~ciscoconfparse.CiscoConfParse`
+        - workers (int): The number of worker processes; defaults to the number of CPUs.  If ``workers`` is 1, files are parsed in this process
+        - kwargs: Other :class:`~ciscoconfparse.CiscoConfParse` keyword arguments (i.e. ``comment``, ``ignore_blank_lines``, ``linesplit_rgx`` or ``cache_dir``)
+
+    .. code-block:: python
+
+       >>> import glob
+       >>> for result in parse_many(glob.glob('configs/*.ios'), workers=4):
+       ...     if result.error:
+       ...         print("{0} failed: {1}".format(result.path, result.error))
+       ...     else:
+       ...         intfs = result.parse.find_objects(r'^interface')
+       ...
+       >>>
+    """
+    options = dict(kwargs)
+    options.update({'syntax': syntax, 'factory': factory})
+    jobs = [(path, options) for path in paths]
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if (workers <= 1) or (len(jobs) <= 1):
+        for job in jobs:
+            yield _parse_many_worker(job)
+
+    elif ProcessPoolExecutor is not None:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        futures = dict()
+        try:
+            futures = dict([(executor.submit(_parse_many_worker, job), job[0])
+                for job in jobs])
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    ## i.e. a worker process died
+                    yield ParseResult(futures[future], options=options,
+                        error=_format_error(e))
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    else:
+        pool = multiprocessing.Pool(workers)
+        try:
+            for result in pool.imap_unordered(_parse_many_worker, jobs):
+                yield result
+        finally:
+            pool.terminate()
+            pool.join()
+
+
+def _parse_many_worker(job):
+    ## Parse one file for parse_many(), and never raise
+    path, options = job
+    start = time.time()
+    try:
+        ## Read the file here, so a bad path reports the OS error, and not
+        ##    the bare RuntimeError from CiscoConfParse()
+        fh = open(path, mode="rU")
+        try:
+            text = fh.read()
+        finally:
+            fh.close()
+        config = re.split(options.get('linesplit_rgx', r"\r*\n+"), text)
+        parse = CiscoConfParse(config, **options)
+        if parse.columnar:
+            raise ValueError("FATAL: parse_many() does not support columnar")
+        data = _dump_config_hierarchy(parse.ConfigObjs._list)
+        if data is None:
+            raise ValueError("FATAL: Could not serialize '{0}'".format(path))
+    except Exception as e:
+        return ParseResult(path, options=options, error=_format_error(e),
+            traceback=traceback.format_exc(), elapsed=time.time() - start)
+
+    ## Only the options which CiscoConfParse needs to rebuild the lines
+    rebuild = dict([(name, options[name]) for name in options 
+        if name in ('syntax', 'factory', 'comment', 'ignore_blank_lines')])
+    return ParseResult(path, options=rebuild, data=data,
+        elapsed=time.time() - start)
+
+
+def _format_error(e):
+    return "{0}: {1}".format(e.__class__.__name__, e)
+
+
+def _parse_from_dump(data, **kwargs):
+    ## Build a CiscoConfParse from _dump_config_hierarchy() data
+    parse = CiscoConfParse([], **kwargs)
+    ConfigObjs = parse.ConfigObjs
+    objs = _load_config_hierarchy(data, confobj=ConfigObjs,
+        comment_delimiter=ConfigObjs.comment_delimiter)
+    if parse.factory=='lazy':
+        _use_lazy_lines(objs, parse.syntax)
+    ConfigObjs._list = objs
+    ConfigObjs._config_changed()
+    return parse
+
+
+def _iter_text_lines(fh, linesplit_rgx=r"\r*\n+", chunk_size=65536):
+    """Read ``fh`` in chunks of ``chunk_size`` characters and yield the text 
+    between matches of ``linesplit_rgx``, exactly like 
+    ``re.split(linesplit_rgx, fh.read())`` but without holding the whole 
+    file in memory"""
+    rgx = re.compile(linesplit_rgx)
+    buf = ''
+    while True:
+        chunk = fh.read(chunk_size)
+        if not chunk:
+            break
+        buf += chunk
+        pos = 0
+        for mm in rgx.finditer(buf):
+            ## A match that touches the end of the buffer might continue 
+            ##    in the next chunk
+            if mm.end() >= len(buf):
+                break
+            yield buf[pos:mm.start()]
+            pos = mm.end()
+        buf = buf[pos:]
+    for line in rgx.split(buf):
+        yield line
+
+
+def _banner_delimiter(text):
+    """Return the delimiter which ends the banner that ``text`` begins, or 
+    None if ``text`` does not begin a banner or the banner also ends on the 
+    same line"""
+    mm = _BANNER_STR_RE.search(text)
+    if mm is None:
+        return None
+    bannerdelimit = mm.group('bchar')
+    if len(text.split(bannerdelimit)) > 2:
+        return None
+    return bannerdelimit
+
+
+def _ios_section_end(comment_delimiter='!', banners=True):
+    """Return a callable, which accepts each line of an IOS-style config in 
+    order and returns ``[0]`` if the line starts a new top-level family, or 
+    an empty list if it does not"""
+    comment_chars = set(comment_delimiter)
+    state = {'bannerdelimit': None}
+
+    def section_end(line):
+        bannerdelimit = state['bannerdelimit']
+        text = line.strip()
+        is_comment = bool(text) and (text[0] in comment_chars)
+        if not (bannerdelimit is None):
+            ## Banner text is never a new family; see _link_config_lines()
+            if (bannerdelimit in text) or (is_comment and 
+                (line[0:1] in comment_chars)):
+                state['bannerdelimit'] = None
+            return []
+
+        if (not text) or is_comment or (line[0:1].strip() == ''):
+            return []
+
+        if banners and _BANNER_RE.search(line):
+            state['bannerdelimit'] = _banner_delimiter(line)
+        return [0]
+
+    return section_end
+
+
+def _junos_lines(text_list, comment_delimiter='#', stop_width=4):
+    """Tokenize a brace-delimited Junos config.  For each statement and 
+    comment, yield its text as an IOS-style line and the indent of that 
+    line, which is ``stop_width`` spaces for each open brace.  See 
+    :class:`~ciscoconfparse._JunosTokenizer`.
+    """
+    tokenizer = _JunosTokenizer(comment_delimiter, stop_width)
+    for line in text_list:
+        for text, indent, offset, is_statement in tokenizer.feed(line):
+            yield ' ' * indent + text, indent
+
+
+## The characters which change the state of _JunosTokenizer
+_JUNOS_SPECIAL_RE = re.compile(r'[{};"\\]|/\*|\*/')
+
+
+class _JunosTokenizer(object):
+    """Split the lines of a brace-delimited Junos config into statements.
+
+    Unquoted ``{``, ``}`` and ``;`` end a statement, and so does the end of 
+    a line; ``{`` and ``}`` open and close a block, so 
+    ``lldp { interface all; }`` is a parent with one child.  Braces and 
+    semicolons in quoted strings are part of the statement; a string which 
+    spans lines yields one line of text per config line.  A backslash 
+    only escapes the next character in a quoted string.  A line which 
+    starts with a comment delimiter is a comment, and starts with ``!`` 
+    instead; a comment after a statement, which may also start with ``#``, 
+    stays on that statement's line.  A ``/* */`` comment is a comment line 
+    of its own (one per config line), which starts with ``!``.  A ``}`` 
+    without an open block raises ValueError.
+
+    :meth:`feed` accepts one line at a time, so a config can be read as a 
+    stream.
+    """
+
+    def __init__(self, comment_delimiter='#', stop_width=4):
+        self.comment_chars = set(comment_delimiter)
+        ## Junos annotates statements with '#', e.g. '## SECRET-DATA'
+        self.trailing_chars = self.comment_chars | set('#')
+        self.stop_width = stop_width
+        self.depth = 0
+        self.quoted = False         # Inside a quoted string
+        self.commented = False      # Inside a /* */ comment
+        self.comment_start = None   # Offset of the /* */ comment in a line
+
+    def feed(self, line):
+        """Return a list of ``(text, indent, offset, is_statement)`` tuples 
+        for the statements and comments in ``line``.  ``offset`` is where 
+        the text starts in ``line``; ``is_statement`` is False for comments 
+        and for the rest of a quoted string from an earlier line"""
+        retval = list()
+        text = line.strip()
+        if text == '':
+            return retval
+        elif (not self.quoted) and (not self.commented) and \
+            (text[0] in self.comment_chars):
+            retval.append(('!' + text[1:], self._indent(),
+                line.index(text), False))
+            return retval
+
+        continued = self.quoted
+        pieces = list()             # Text of the current statement
+        start = None                # Offset of the current statement
+        if continued:
+            start = line.index(text)
+        elif self.commented:
+            self.comment_start = line.index(text)
+        pos = 0
+        last_end = None             # Terminator of the last statement
+        for mm in _JUNOS_SPECIAL_RE.finditer(line):
+            token, ii = mm.group(0), mm.start()
+            if ii < pos:
+                ## Escaped by a backslash
+                continue
+            elif self.commented:
+                if token == '*/':
+                    self._emit_comment(retval, line[:mm.end()])
+                    pos = mm.end()
+                continue
+            elif self.quoted:
+                if token == '\\':
+                    pieces.append(line[pos:ii + 2])
+                    pos = ii + 2
+                elif token == '"':
+                    pieces.append(line[pos:mm.end()])
+                    pos = mm.end()
+                    self.quoted = False
+                continue
+            elif token == '\\':
+                ## Only an escape in a quoted string
+                continue
+
+            segment = line[pos:ii].lstrip()
+            if (start is None) and segment:
+                if segment[0] in self._comment_chars(last_end):
+                    ## A comment runs to the end of the line
+                    break
+                start = ii - len(segment)
+            pieces.append(line[pos:ii])
+            pos = mm.end()
+            if token == '"':
+                if start is None:
+                    start = ii
+                pieces.append(token)
+                self.quoted = True
+            elif token == '/*':
+                self.commented = True
+                self.comment_start = ii
+            elif token in '{};':
+                if self._emit(retval, pieces, start, continued, False):
+                    last_end = ii
+                pieces, start, continued = list(), None, False
+                if token == '{':
+                    self.depth += 1
+                elif token == '}':
+                    if self.depth == 0:
+                        raise ValueError("Could not parse: '{0}'".format(
+                            text))
+                    self.depth -= 1
+
+        rest = ''
+        if not self.commented:
+            rest = line[pos:]
+        comment = rest.strip()
+        if (start is None) and comment and \
+            (comment[0] in self._comment_chars(last_end)):
+            if last_end is None:
+                retval.append(('!' + comment[1:], self._indent(),
+                    line.index(comment, pos), False))
+            else:
+                ## Keep it with the statement before it, e.g.
+                ##     encrypted-password "xyz"; ## SECRET-DATA
+                text, indent, offset, is_statement = retval[-1]
+                retval[-1] = (text + line[last_end:].rstrip(), indent,
+                    offset, is_statement)
+            return retval
+
+        if (start is None) and comment:
+            start = pos + len(rest) - len(rest.lstrip())
+        pieces.append(rest)
+        self._emit(retval, pieces, start, continued, True)
+        if self.commented:
+            ## The comment continues on the next line
+            self._emit_comment(retval, line)
+            self.commented = True
+        return retval
+
+    def _comment_chars(self, last_end):
+        if last_end is None:
+            return self.comment_chars
+        return self.trailing_chars
+
+    def _indent(self):
+        return self.stop_width * self.depth
+
+    def _emit_comment(self, retval, line):
+        ## Emit the /* */ comment which ends at the end of line
+        retval.append(('!' + line[self.comment_start:].strip(), 
+            self._indent(), self.comment_start, False))
+        self.commented = False
+        self.comment_start = None
+
+    def _emit(self, retval, pieces, start, continued, eol):
+        ## A statement keeps the space before a brace, e.g. 'system '
+        text = ''.join(pieces)
+        if eol:
+            text = text.strip()
+        else:
+            text = text.lstrip()
+        if text:
+            retval.append((text, self._indent(), start, not continued))
+            return True
+        return False
+
+
+def _junos_section_end(comment_delimiter='#'):
+    """Return a callable, which accepts each line of a brace-delimited 
+    Junos config in order and returns the offsets in the line where new 
+    top-level families start.  The first family starts at the first 
+    statement, so comments above it stay with it"""
+    tokenizer = _JunosTokenizer(comment_delimiter)
+    state = {'started': False}
+
+    def section_end(line):
+        retval = list()
+        for text, indent, offset, is_statement in tokenizer.feed(line):
+            if is_statement and (indent == 0):
+                if state['started']:
+                    retval.append(offset)
+                state['started'] = True
+        return retval
+
+    return section_end
+
+
+def _stack_parent(stack, node, indent, is_config_line, is_comment, 
+    prev_indent):
+    """Return the parent node of a line with ``indent``, or None if it has
+    no parent.  Config lines are pushed onto ``stack`` as (indent, node).
+
+    The parent of an indented line is the closest previous config line 
+    (not a comment or blank line) with a smaller indent.  Those candidates 
+    are kept on a stack whose indents always increase from bottom to top; 
+    a config line pops every entry indented as far or further than itself,
+    so each line is pushed and popped at most once.
+    """
+    parent = None
+    if is_config_line:
+        while stack and (stack[-1][0] >= indent):
+            stack.pop()
+        if (indent > 0) and stack:
+            parent = stack[-1][1]
+        stack.append((indent, node))
+    elif indent > 0:
+        # Comments and blank lines never become parents, so leave
+        #     the stack alone and search it from the top
+        for candidate_indent, candidate in reversed(stack):
+            if candidate_indent < indent:
+                parent = candidate
+                break
+
+    if is_comment and (parent is not None) and (prev_indent > indent):
+        ## I *really* hate making this exception, but legacy 
+        ##   ciscoconfparse never marked a comment as a child 
+        ##   when the line immediately above it was indented more
+        ##   than the comment line
+        return None
+    return parent
+
+
+def _build_config_hierarchy(text_list, line_factory, confobj=None,
+    ignore_blank_lines=True, banners=False):
+    """Build line objects from ``text_list`` and link their parents and 
+    children in a single pass.
+
+    ``line_factory`` is called with each line of text and must return a 
+    :class:`~ccp_abc.BaseCfgLine` instance.  This is shared by the IOS, ASA 
+    and Junos config lists; IOS uses ``banners=True`` (see 
+    :func:`~ciscoconfparse._link_config_lines`).  Junos configs are built 
+    from their braces by :func:`~ciscoconfparse._build_junos_hierarchy`, 
+    but lines edited afterwards are IOS-style text.
+    """
+    retval = list()
+
+    def new_objs():
+        idx = 0
+        for line in text_list:
+            # Reject empty lines if ignore_blank_lines...
+            if ignore_blank_lines and line.strip() == '':
+                continue
+
+            obj = line_factory(line)
+            obj.confobj = confobj
+            obj._linenum = idx
+            obj.indent = len(line) - len(line.lstrip())
+            retval.append(obj)
+            idx += 1
+            yield obj
+
+    _link_config_lines(new_objs(), banners=banners)
+    _index_subtrees(retval)
+    return retval
+
+
+def _build_junos_hierarchy(text_list, line_factory, confobj=None,
+    comment_delimiter='#'):
+    """Build line objects from the brace-delimited Junos config in 
+    ``text_list`` and link their parents and children in a single pass.
+
+    Each line's indent comes from its brace depth 
+    (:func:`~ciscoconfparse._junos_lines`), so the text is never reparsed.
+    """
+    retval = list()
+
+    def new_objs():
+        idx = 0
+        for line, indent in _junos_lines(text_list, comment_delimiter):
+            obj = line_factory(line)
+            obj.confobj = confobj
+            obj._linenum = idx
+            obj.indent = indent
+            retval.append(obj)
+            idx += 1
+            yield obj
+
+    _link_config_lines(new_objs())
+    _index_subtrees(retval)
+    return retval
+
+
+def _link_config_lines(objs, banners=False):
+    """Link the parents and children of the line objects in ``objs`` (any 
+    iterable, in config order, with ``indent`` already set).
+
+    If ``banners`` is True, every line which matches ``_BANNER_RE`` is an 
+    oldest_ancestor, and the lines after a banner (up to and including the 
+    line with its closing delimiter) become its children as they are read;
+    they never go on the parent stack, so banner text is never linked 
+    anywhere else.  Lines after the closing delimiter have no parent until 
+    the next unindented config line.  An unindented comment without the 
+    delimiter ends the banner early, and is not part of it.
+    """
+    stack = list()  # Open parent candidates, indents increase toward the top
+    prev_indent = 0
+    banner = None
+    bannerdelimit = None
+    for obj in objs:
+        indent = obj.indent
+        if not (banner is None):
+            text = obj.text.strip()
+            if (bannerdelimit in text) or not (obj.is_comment and 
+                (indent == 0)):
+                banner.children.append(obj)
+                banner.child_indent = 0
+                obj.parent = banner
+                if bannerdelimit in text:
+                    ## Nothing after the banner belongs to it
+                    banner = None
+                    del stack[:]
+                prev_indent = indent
+                continue
+            banner = None
+
+        parent = _stack_parent(stack, obj, indent, obj.is_config_line,
+            obj.is_comment, prev_indent)
+        if not (parent is None):
+            parent.children.append(obj)
+            obj.parent = parent
+            parent.child_indent = indent
+
+        if banners and (indent == 0) and _BANNER_RE.search(obj.text):
+            obj.oldest_ancestor = True
+            bannerdelimit = _banner_delimiter(obj.text)
+            if not (bannerdelimit is None):
+                banner = obj
+        prev_indent = indent
+
+
+def _index_subtrees(objs):
+    """Set the ``_depth`` and ``_subtree_len`` of the linked line objects in 
+    ``objs`` (whole top-level families, in config order).
+
+    ``_subtree_len`` is the number of lines after a line up to its last 
+    descendant, so :func:`~ccp_abc.BaseCfgLine.all_children` is a slice of 
+    the config; the lines in that slice which are not descendants are 
+    comments with no deeper ``_depth``.  Both values are relative, so edits
+    elsewhere in the config never change them.
+    """
+    for idx, obj in enumerate(objs):
+        parent = obj.parent
+        if parent is obj:
+            obj._depth = 0
+        else:
+            obj._depth = parent._depth + 1
+        obj._subtree_len = idx       # The index of the last descendant, for now
+
+    ## Descendants come after their ancestors, so walking backwards finishes
+    ##    each line's subtree before its parent needs it
+    for idx in range(len(objs) - 1, -1, -1):
+        obj = objs[idx]
+        end = obj._subtree_len
+        parent = obj.parent
+        if not (parent is obj) and (end > parent._subtree_len):
+            parent._subtree_len = end
+        obj._subtree_len = end - idx
+
+
+def _delete_config_lines(confobj, objs, recurse=False):
+    """Delete the line objects in ``objs`` (and all their descendants, if 
+    ``recurse`` is True) from ``confobj``, and return the deleted objects in 
+    config order.  Lines which are no longer in ``confobj`` are skipped.  
+    The lines around each deleted run are marked for 
+    :func:`~ciscoconfparse._relink_config_list`; nothing is relinked here.
+    """
+    victims = dict()
+    stack = list(objs)
+    while stack:
+        obj = stack.pop()
+        if not (id(obj) in victims):
+            victims[id(obj)] = obj
+            if recurse:
+                stack.extend(obj.children)
+
+    if not (confobj._batch is None):
+        retval = sorted(victims.values(), key=attrgetter('linenum'))
+        for obj in retval:
+            confobj._batch.delete(obj)
+        return retval
+
+    lines = confobj._chunked_lines()
+    confobj._config_changed()
+    found = list()
+    for obj in victims.values():
+        linenum = obj.linenum
+        if (0 <= linenum < len(lines)) and (lines[linenum] is obj):
+            found.append((linenum, obj))
+    found.sort(key=lambda pair: pair[0])
+
+    ## Relink the lines on either side of each deleted run
+    dirty = confobj._dirty
+    for linenum, obj in found:
+        for idx in (linenum - 1, linenum + 1):
+            if (0 <= idx < len(lines)) and not (id(lines[idx]) in victims):
+                dirty[id(lines[idx])] = lines[idx]
+    lines.delete_many(found)
+    return [obj for linenum, obj in found]
+
+
+class _ConfigBatch(object):
+    """Inserts and deletes queued on an :class:`~ciscoconfparse.IOSConfigList` 
+    or :class:`~ciscoconfparse.ASAConfigList` by 
+    :func:`~ciscoconfparse.CiscoConfParse.batch`.  Lines are queued relative 
+    to existing (or queued) line objects, so nothing needs an index until 
+    :func:`apply` merges everything in one pass.
+    """
+
+    def __init__(self):
+        self.depth = 0          # Nesting level of with blocks
+        self.before = dict()    # Lines to insert before a line, keyed by id()
+        self.after = dict()     # Lines to insert after a line, keyed by id()
+        self.appended = list()  # Lines to add at the end of the config
+        self.deleted = dict()   # Lines to delete, keyed by id()
+
+    def insert_before(self, robj, obj):
+        self.before.setdefault(id(robj), list()).append(obj)
+
+    def insert_after(self, robj, obj):
+        ## As with list.insert(), the last line inserted after robj is the 
+        ##     first line after it
+        self.after.setdefault(id(robj), list()).insert(0, obj)
+
+    def insert(self, objs, ii, obj):
+        ## list.insert() semantics, relative to the unmodified objs
+        if ii < 0:
+            ii = max(len(objs) + ii, 0)
+        if ii < len(objs):
+            self.insert_before(objs[ii], obj)
+        else:
+            self.appended.append(obj)
+
+    def delete(self, obj):
+        self.deleted[id(obj)] = obj
+
+    def apply(self, confobj):
+        """Merge the queued lines into ``confobj``, and mark the lines around
+        each change for :func:`~ciscoconfparse._relink_config_list`"""
+        before, after, deleted = self.before, self.after, self.deleted
+        dirty = confobj._dirty
+        for objs in list(before.values()) + list(after.values()) + [
+            self.appended]:
+            for obj in objs:
+                dirty[id(obj)] = obj
+
+        ## A line object on the stack still needs its queued neighbors; a 
+        ##    1-tuple is a line ready to go into the new list
+        retval = list()
+        stack = self.appended[::-1] + confobj._list[::-1]
+        gap = False
+        while stack:
+            item = stack.pop()
+            if isinstance(item, tuple):
+                obj = item[0]
+                if id(obj) in deleted:
+                    if retval:
+                        dirty[id(retval[-1])] = retval[-1]
+                    gap = True
+                    continue
+                if gap:
+                    dirty[id(obj)] = obj
+                    gap = False
+                retval.append(obj)
+            else:
+                stack.extend(after.get(id(item), ())[::-1])
+                stack.append((item,))
+                stack.extend(before.get(id(item), ())[::-1])
+        confobj._index_lines()
+        confobj._list[:] = retval
+        confobj._config_changed()
+
+
+def _relink_config_list(confobj):
+    """Relink the families of the lines in ``confobj`` (an 
+    :class:`~ciscoconfparse.IOSConfigList` or 
+    :class:`~ciscoconfparse.ASAConfigList`) which were inserted, deleted 
+    around, or had their text changed since the last relink.
+
+    An unindented config line empties the stack in 
+    :func:`~ciscoconfparse._stack_parent`, so the lines between two 
+    unchanged top-level lines can be relinked without looking at the rest 
+    of the config (banners extend that span to their closing delimiter).  
+    The line objects are kept; with ``factory=True`` only lines with new 
+    text are reclassified.  The result is the same as reparsing the whole 
+    config from text.
+    """
+    dirty = confobj._dirty
+    retext = confobj._retext
+    if not dirty:
+        return
+    confobj._dirty = dict()
+    confobj._retext = dict()
+
+    objs = confobj._chunked_lines()
+    banners = confobj._syntax.banners
+
+    ## Only lines which are still in the list matter
+    dirty = dict([(key, obj) for key, obj in dirty.items()
+        if (0 <= obj.linenum < len(objs)) and (objs[obj.linenum] is obj)])
+
+    if confobj.ignore_blank_lines:
+        blank = sorted([(obj.linenum, obj) for obj in dirty.values() 
+            if obj.text.strip()==''], key=lambda pair: pair[0])
+        for idx, obj in blank:
+            del dirty[id(obj)]
+            for neighbor in objs[max(idx - 1, 0):idx + 2]:
+                if neighbor.text.strip():
+                    dirty[id(neighbor)] = neighbor
+        if blank:
+            objs.delete_many(blank)
+            confobj._config_changed()
+
+    for key, obj in retext.items():
+        if not (key in dirty):
+            continue
+        obj.set_comment_bool()
+        new = obj
+        if confobj.factory=='lazy':
+            cls = _LINE_CLASSES[confobj.syntax].eager_class(obj.text)
+            if cls is not None:
+                new = _reinit_line(obj, cls)
+            elif _own_layout(type(obj)):
+                new = _reinit_line(obj, confobj._syntax.lazy_line_class)
+            else:
+                _use_lazy_lines([obj], confobj.syntax)
+        elif confobj.factory:
+            new = _reinit_line(obj, 
+                _LINE_CLASSES[confobj.syntax].classify(obj.text))
+        if not (new is obj):
+            ## The line moved to or from a class with its own layout; the 
+            ##    new object takes its place, and is relinked below
+            objs[obj.linenum] = new
+            del dirty[key]
+            dirty[id(new)] = new
+    for obj in dirty.values():
+        obj.indent = len(obj.text) - len(obj.text.lstrip())
+
+    end = 0
+    for idx in sorted([obj.linenum for obj in dirty.values()]):
+        if idx < end:
+            continue
+        begin = idx
+        while (begin > 0) and ((id(objs[begin]) in dirty) or 
+            not _is_family_root(objs[begin])):
+            begin -= 1
+        end = _family_end(objs, idx, dirty)
+
+        ## Banners can swallow the top-level lines after them
+        banner_idx = begin
+        while banners and (banner_idx < end):
+            if _BANNER_RE.search(objs[banner_idx].text):
+                banner_end = _banner_end(objs, banner_idx)
+                if banner_end >= end:
+                    end = _family_end(objs, banner_end, dirty)
+            banner_idx += 1
+
+        _relink_config_span(objs, begin, end, banners=banners)
+
+
+def _is_family_root(obj):
+    ## An unindented config line starts a new top-level family (unless it
+    ##    was part of a banner, which may have changed)
+    return (obj.indent==0) and obj.is_config_line and (obj.parent is obj)
+
+
+def _family_end(objs, idx, dirty):
+    ## Return the index of the first unchanged family root after idx
+    idx += 1
+    while (idx < len(objs)) and ((id(objs[idx]) in dirty) or 
+        not _is_family_root(objs[idx])):
+        idx += 1
+    return idx
+
+
+def _banner_end(objs, idx):
+    ## Return the index of the last line in the banner which starts at idx;
+    ##    this follows _link_config_lines()
+    bannerdelimit = _banner_delimiter(objs[idx].text)
+    if bannerdelimit is None:
+        return idx
+    for end in range(idx + 1, len(objs)):
+        obj = objs[end]
+        if bannerdelimit in obj.text.strip():
+            return end
+        elif obj.is_comment and (obj.indent == 0):
+            return end - 1
+    return len(objs) - 1
+
+
+def _relink_config_span(objs, begin, end, banners=False):
+    ## Rebuild the family links of objs[begin:end], like 
+    ##    _build_config_hierarchy() does for a whole config
+    span = objs[begin:end]
+    for obj in span:
+        obj.parent = obj
+        obj.children = list()
+        obj.child_indent = 0
+        obj.oldest_ancestor = False
+    _link_config_lines(span, banners=banners)
+    _index_subtrees(span)
+
+
+def _load_parse_cache(confobj, text_list):
+    """Look up ``text_list`` in the parse cache of ``confobj`` (an 
+    :class:`~ciscoconfparse.IOSConfigList` or 
+    :class:`~ciscoconfparse.ASAConfigList`).  Return a tuple of the cached 
+    line objects (or None) and the cache key (None without a cache).
+    ``text_list`` must be a list if there is a cache."""
+    if confobj.cache is None:
+        return None, None
+
+    kwargs = {
+        'syntax': confobj.syntax,
+        'comment': confobj.comment_delimiter,
+        'factory': confobj.factory,
+        'ignore_blank_lines': confobj.ignore_blank_lines,
+    }
+    if confobj.factory:
+        ## register_line_class() changes the results
+        kwargs['line_classes'] = [_line_class_name(cls) for cls in 
+            _LINE_CLASSES[confobj.syntax].classes]
+    cache_key = confobj.cache.key(text_list, **kwargs)
+    data = confobj.cache.load(cache_key)
+    if data is None:
+        return None, cache_key
+    return _load_config_hierarchy(data, confobj=confobj,
+        comment_delimiter=confobj.comment_delimiter), cache_key
+
+
+def _dump_config_hierarchy(objs):
+    """Serialize a list of parsed line objects for the on-disk parse cache;
+    :func:`~ciscoconfparse._load_config_hierarchy` rebuilds the list.
+
+    Family relationships are stored as line indexes, the classes as names 
+    and the text as one newline-joined string, so the pickle is small and 
+    quick to load.  Return None if the objects can't be serialized.
+    """
+    index = dict([(id(obj), idx) for idx, obj in enumerate(objs)])
+    class_names = list()
+    class_tags = dict()
+    text = list()
+    tags = array('H')
+    indent = array('l')
+    child_indent = array('l')
+    parent = array('l')
+    num_children = array('l')
+    children = array('l')
+    is_comment = list()
+    oldest_ancestor = list()
+    for idx, obj in enumerate(objs):
+        cls = type(obj)
+        tag = class_tags.get(cls, None)
+        if tag is None:
+            tag = class_tags[cls] = len(class_names)
+            class_names.append(_line_class_name(cls))
+        text.append(obj.text)
+        tags.append(tag)
+        indent.append(obj.indent)
+        child_indent.append(obj.child_indent)
+        parent.append(index[id(obj.parent)])
+        num_children.append(len(obj.children))
+        children.extend([index[id(child)] for child in obj.children])
+        is_comment.append(obj.is_comment)
+        if obj.oldest_ancestor:
+            oldest_ancestor.append(idx)
+
+    text = '\n'.join(text)
+    if text.count('\n')!=max(len(objs) - 1, 0):
+        return None     # A line with an embedded newline
+    return {
+        'text': text,
+        'classes': class_names,
+        'tags': tags,
+        'indent': indent,
+        'child_indent': child_indent,
+        'parent': parent,
+        'num_children': num_children,
+        'children': children,
+        'is_comment': is_comment,
+        'oldest_ancestor': oldest_ancestor,
+    }
+
+
+def _load_config_hierarchy(data, confobj=None, comment_delimiter='!'):
+    """Rebuild the line objects serialized by 
+    :func:`~ciscoconfparse._dump_config_hierarchy`; return None if a line 
+    class is no longer known"""
+    classes = list()
+    for name in data['classes']:
+        cls = _line_classes_by_name().get(name, None)
+        if cls is None:
+            return None
+        classes.append(cls)
+
+    ## Model classes may do more in __init__(), so only the plain line 
+    ##    classes are built without calling it
+    plain = [(cls in _PLAIN_LINE_CLASSES) for cls in classes]
+    new = object.__new__
+    tags = data['tags']
+    indent = data['indent']
+    child_indent = data['child_indent']
+    is_comment = data['is_comment']
+    retval = list()
+    text_list = data['text'] and data['text'].split('\n') or []
+    for idx, text in enumerate(text_list):
+        tag = tags[idx]
+        if plain[tag]:
+            obj = new(classes[tag])
+            obj._text = text
+            obj._tokens = None
+            obj._parsed = None
+            obj._chunk = None
+            obj._comment_delimiter = comment_delimiter
+            obj.confobj = confobj
+        else:
+            obj = classes[tag](text=text, comment_delimiter=comment_delimiter,
+                confobj=confobj)
+        obj._linenum = idx
+        obj.indent = indent[idx]
+        obj.child_indent = child_indent[idx]
+        obj.is_comment = is_comment[idx]
+        obj.oldest_ancestor = False
+        retval.append(obj)
+
+    offset = 0
+    parent = data['parent']
+    num_children = data['num_children']
+    children = data['children']
+    for idx, obj in enumerate(retval):
+        obj.parent = retval[parent[idx]]
+        if num_children[idx]:
+            obj.children = [retval[cidx] for cidx in 
+                children[offset:offset + num_children[idx]]]
+            offset += num_children[idx]
+        else:
+            obj.children = list()
+    for idx in data['oldest_ancestor']:
+        retval[idx].oldest_ancestor = True
+    _index_subtrees(retval)
+    return retval
+
+
+def _line_class_name(cls):
+    ## Placeholders of a factory='lazy' parse are stored as their base class
+    if issubclass(cls, _LazyFactoryLine):
+        cls = cls.__mro__[2]
+    return "{0}.{1}".format(cls.__module__, cls.__name__)
+
+
+def _line_classes_by_name():
+    retval = dict()
+    for line_classes in _LINE_CLASSES.values():
+        for cls in line_classes.classes + [line_classes.default]:
+            retval[_line_class_name(cls)] = cls
+    for syntax in _CONFIG_SYNTAXES.values():
+        retval[_line_class_name(syntax.line_class)] = syntax.line_class
+    return retval
+
+
+class _LineChunk(object):
+    """A run of consecutive lines in a :class:`_ChunkedLines`"""
+    __slots__ = ('owner', 'items', 'k', 'local')
+
+    def __init__(self, owner, items, k):
+        self.owner = owner
+        self.items = items
+        self.k = k              # Index of this chunk in owner._chunks
+        self.local = None       # {id(obj): index in items}, built on demand
+
+
+class _ChunkedLines(MutableSequence):
+    """The line objects of an edited :class:`~ciscoconfparse.IOSConfigList`
+    or :class:`~ciscoconfparse.ASAConfigList`, kept in chunks of about 
+    ``CHUNK_SIZE`` lines.
+
+    Each line object points at its chunk, so finding a line's position 
+    (its ``linenum``), inserting or deleting only touches one chunk, and 
+    the offsets of the chunks after it, instead of the whole list.  Chunk 
+    offsets are fixed up lazily, so a run of edits pays for them once.
+    """
+
+    CHUNK_SIZE = 512
+
+    def __init__(self, objs=()):
+        super(_ChunkedLines, self).__init__()
+        self._assign(objs)
+
+    def _assign(self, objs):
+        objs = list(objs)
+        size = self.CHUNK_SIZE
+        self._chunks = list()
+        for begin in range(0, len(objs), size):
+            chunk = _LineChunk(self, objs[begin:begin + size], 
+                len(self._chunks))
+            for obj in chunk.items:
+                obj._chunk = chunk
+            self._chunks.append(chunk)
+        self._starts = list(range(0, len(objs), size))
+        self._valid = len(self._chunks)     # _starts[:_valid] are current
+        self._len = len(objs)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return chain.from_iterable([chunk.items for chunk in self._chunks])
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __getitem__(self, ii):
+        if isinstance(ii, slice):
+            begin, end, step = ii.indices(self._len)
+            if step != 1:
+                return list(self)[ii]
+            return list(islice(self._iter_from(begin), max(end - begin, 0)))
+        chunk, jj = self._locate(ii)
+        return chunk.items[jj]
+
+    def __setitem__(self, ii, val):
+        if isinstance(ii, slice):
+            objs = list(self)
+            for idx, obj in enumerate(objs):
+                obj._linenum = idx
+                obj._chunk = None
+            objs[ii] = val
+            self._assign(objs)
+            return
+        chunk, jj = self._locate(ii)
+        self._release(chunk.items[jj], ii)
+        chunk.items[jj] = val
+        val._chunk = chunk
+        chunk.local = None
+
+    def __delitem__(self, ii):
+        if isinstance(ii, slice):
+            for idx in sorted(range(self._len)[ii], reverse=True):
+                del self[idx]
+            return
+        if ii < 0:
+            ii += self._len
+        chunk, jj = self._locate(ii)
+        self._release(chunk.items.pop(jj), ii)
+        self._len -= 1
+        if len(chunk.items) == 0:
+            self._remove_chunk(chunk)
+        else:
+            self._changed(chunk)
+
+    def insert(self, ii, val):
+        if ii < 0:
+            ii = max(ii + self._len, 0)
+        if not self._chunks:
+            self._chunks.append(_LineChunk(self, list(), 0))
+            self._starts.append(0)
+            self._valid = 1
+        if ii >= self._len:
+            chunk = self._chunks[-1]
+            jj = len(chunk.items)
+        else:
+            chunk, jj = self._locate(ii)
+        chunk.items.insert(jj, val)
+        val._chunk = chunk
+        self._len += 1
+        self._changed(chunk)
+        if len(chunk.items) > 2 * self.CHUNK_SIZE:
+            self._split(chunk)
+
+    def delete_many(self, found):
+        """Delete the ``(index, obj)`` pairs in ``found``, which must be in 
+        this list; only the chunks which hold them are rebuilt"""
+        if not found:
+            return
+        deleted = dict()        # {chunk.k: set of id(obj)}
+        for ii, obj in found:
+            deleted.setdefault(obj._chunk.k, set()).add(id(obj))
+        for ii, obj in found:
+            self._release(obj, ii)
+        chunks = self._chunks
+        for k, ids in deleted.items():
+            chunk = chunks[k]
+            chunk.items = [obj for obj in chunk.items if not (id(obj) in ids)]
+            chunk.local = None
+        self._len -= len(found)
+
+        first = min(deleted)
+        if [k for k in deleted if not chunks[k].items]:
+            self._chunks = [chunk for chunk in chunks if chunk.items]
+            del self._starts[len(self._chunks):]
+            self._renumber_chunks(first)
+        self._valid = min(self._valid, first + 1, len(self._chunks))
+
+    def index(self, val):
+        ## Identity, not BaseCfgLine.__eq__(); line objects know their chunk
+        chunk = getattr(val, '_chunk', None)
+        if (chunk is None) or not (chunk.owner is self):
+            raise ValueError("{0} is not in list".format(val))
+        return self._position(val)
+
+    def _position(self, obj):
+        ## Return the index of obj, which must be in this list
+        chunk = obj._chunk
+        if chunk.k >= self._valid:
+            self._fix_starts(chunk.k)
+        local = chunk.local
+        if local is None:
+            local = chunk.local = dict([(id(item), idx) for idx, item in 
+                enumerate(chunk.items)])
+        return self._starts[chunk.k] + local[id(obj)]
+
+    def _locate(self, ii):
+        ## Return the chunk which holds index ii, and ii's index in the chunk
+        if ii < 0:
+            ii += self._len
+        if (ii < 0) or (ii >= self._len):
+            raise IndexError("list index out of range")
+        if self._valid < len(self._chunks):
+            self._fix_starts(len(self._chunks) - 1)
+        k = bisect_right(self._starts, ii) - 1
+        return self._chunks[k], ii - self._starts[k]
+
+    def _iter_from(self, ii):
+        if ii >= self._len:
+            return iter(())
+        chunk, jj = self._locate(ii)
+        return chain(islice(chunk.items, jj, None), chain.from_iterable(
+            item.items for item in islice(self._chunks, chunk.k + 1, None)))
+
+    def _fix_starts(self, k):
+        ## Bring the offsets of chunks up to (and including) k up to date
+        starts = self._starts
+        chunks = self._chunks
+        if self._valid == 0 and chunks:
+            starts[0] = 0
+            self._valid = 1
+        for kk in range(self._valid, k + 1):
+            starts[kk] = starts[kk - 1] + len(chunks[kk - 1].items)
+        self._valid = max(self._valid, k + 1)
+
+    def _changed(self, chunk):
+        ## The length of chunk changed; every chunk after it moved
+        chunk.local = None
+        self._valid = min(self._valid, chunk.k + 1)
+
+    def _split(self, chunk):
+        half = len(chunk.items) // 2
+        new = _LineChunk(self, chunk.items[half:], chunk.k + 1)
+        del chunk.items[half:]
+        for obj in new.items:
+            obj._chunk = new
+        self._chunks.insert(new.k, new)
+        self._starts.insert(new.k, 0)
+        self._renumber_chunks(new.k + 1)
+        self._changed(chunk)
+
+    def _remove_chunk(self, chunk):
+        del self._chunks[chunk.k]
+        del self._starts[chunk.k]
+        self._renumber_chunks(chunk.k)
+        self._valid = min(self._valid, chunk.k)
+
+    def _renumber_chunks(self, k):
+        chunks = self._chunks
+        for kk in range(k, len(chunks)):
+            chunks[kk].k = kk
+
+    def _release(self, obj, ii):
+        ## obj left this list; it keeps its last linenum
+        obj._linenum = ii
+        obj._chunk = None
+
+
+class _ColumnarLines(MutableSequence):
+    """A lazy replacement for the python list of line objects in 
+    :class:`~ciscoconfparse.IOSConfigList` and 
+    :class:`~ciscoconfparse.ASAConfigList` (``columnar=True``).
+
+    The parse is held as parallel arrays, indexed by line number:
+
+        - text (list): The text of each line
+        - indent (array): Whitespace indentation of each line
+        - parent (array): Index of the parent line, or -1
+        - first_child (array): Index of the first child line, or -1
+        - subtree_end (array): Index of the last descendant (or the line itself)
+        - is_comment (array): 1 if the line is a comment
+        - child_indent (array): Indentation of the children of each line
+
+    Line objects are built by ``line_factory`` only when they are read; 
+    reading one line builds its whole top-level family, so parent and 
+    children references always point to real objects.  Any insertion or 
+    deletion builds all remaining objects, and the list behaves like a 
+    normal python list afterwards.
+    """
+
+    def __init__(self, text_list, line_factory, confobj=None, 
+        comment_delimiter='!', ignore_blank_lines=True, banners=False):
+        self.line_factory = line_factory
+        self.confobj = confobj
+        self.text = list()
+        self.indent = array('l')
+        self.parent = array('l')
+        self.first_child = array('l')
+        self.subtree_end = array('l')
+        self.is_comment = array('b')
+        self.child_indent = array('l')
+        self.oldest_ancestor = set()   # Indexes of lines marked as such
+        self._objs = list()            # Line objects, or None if not built
+
+        comment_chars = set(comment_delimiter)
+        stack = list()
+        prev_indent = 0
+        banner = -1
+        bannerdelimit = None
+        idx = 0
+        for line in text_list:
+            stripped = line.strip()
+            # Reject empty lines if ignore_blank_lines...
+            if ignore_blank_lines and stripped == '':
+                continue
+
+            indent = len(line) - len(line.lstrip())
+            is_comment = bool(stripped) and (stripped[0] in comment_chars)
+            is_config_line = bool(stripped) and not is_comment
+
+            ## Banners are linked like _link_config_lines() does
+            if (banner >= 0) and ((bannerdelimit in stripped) or 
+                not (is_comment and (indent == 0))):
+                parent = banner
+                child_indent = 0
+                if bannerdelimit in stripped:
+                    banner = -1
+                    del stack[:]
+            else:
+                banner = -1
+                parent = _stack_parent(stack, idx, indent, is_config_line,
+                    is_comment, prev_indent)
+                child_indent = indent
+                if (banners and (indent == 0) and 
+                    _BANNER_RE.search(line)):
+                    self.oldest_ancestor.add(idx)
+                    bannerdelimit = _banner_delimiter(line)
+                    if not (bannerdelimit is None):
+                        banner = idx
+
+            if parent is None:
+                parent = -1
+            else:
+                if self.first_child[parent] < 0:
+                    self.first_child[parent] = idx
+                self.child_indent[parent] = child_indent
+
+            self.text.append(line)
+            self.indent.append(indent)
+            self.parent.append(parent)
+            self.first_child.append(-1)
+            self.subtree_end.append(idx)
+            self.is_comment.append(is_comment)
+            self.child_indent.append(0)
+            prev_indent = indent
+            idx += 1
+
+        ## Children always follow their parent, so walking backwards sees 
+        ##    every descendant before its ancestors
+        subtree_end = self.subtree_end
+        for idx in range(len(self.text) - 1, -1, -1):
+            parent = self.parent[idx]
+            if (parent >= 0) and (subtree_end[idx] > subtree_end[parent]):
+                subtree_end[parent] = subtree_end[idx]
+
+        self._objs = [None] * len(self.text)
+
+    def __len__(self):
+        return len(self._objs)
+
+    def __getitem__(self, ii):
+        if isinstance(ii, slice):
+            return [self._get_obj(idx) for idx in range(*ii.indices(len(self)))]
+        if ii < 0:
+            ii += len(self)
+        if (ii < 0) or (ii >= len(self)):
+            raise IndexError("list index out of range")
+        return self._get_obj(ii)
+
+    def __setitem__(self, ii, val):
+        self._detach()
+        self._objs[ii] = val
+
+    def __delitem__(self, ii):
+        self._detach()
+        del self._objs[ii]
+
+    def __iter__(self):
+        if self.is_detached:
+            return iter(self._objs)
+        return (self._get_obj(idx) for idx in range(0, len(self)))
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def insert(self, ii, val):
+        self._detach()
+        self._objs.insert(ii, val)
+
+    def index(self, val):
+        ## Line objects know where they are, unless the list was modified
+        linenum = getattr(val, 'linenum', -1)
+        if (0 <= linenum < len(self)) and (self._objs[linenum] is val):
+            return linenum
+        for idx, obj in enumerate(self):
+            if obj == val:
+                return idx
+        raise ValueError("{0} is not in list".format(val))
+
+    @property
+    def is_detached(self):
+        """True once the arrays are dropped and every line object is built"""
+        return (self.text is None)
+
+    def iter_text(self):
+        """Iterate over the text of each line, without building objects"""
+        if self.is_detached:
+            for obj in self._objs:
+                yield obj.text
+        else:
+            ## Prefer the text of built objects; callers may change it
+            for obj, text in zip(self._objs, self.text):
+                if obj is None:
+                    yield text
+                else:
+                    yield obj.text
+
+    def search_text(self, regex, positions=None):
+        """Return the line objects whose text matches the compiled ``regex``;
+        only the families of matching lines are built.  If ``positions`` is 
+        given, only the lines at those positions are searched"""
+        if positions is None:
+            return [self._get_obj(idx) for idx, text in 
+                enumerate(self.iter_text()) if regex.search(text)]
+        text_at = self.text_at
+        return [self._get_obj(idx) for idx in positions 
+            if regex.search(text_at(idx))]
+
+    def text_at(self, idx):
+        """Return the text of the line at ``idx``, without building objects"""
+        obj = self._objs[idx]
+        if obj is None:
+            return self.text[idx]
+        return obj.text
+
+    def children_idx(self, idx):
+        """Return the indexes of the children of the line at ``idx``"""
+        first_child = self.first_child[idx]
+        if first_child < 0:
+            return list()
+        parent = self.parent
+        return [cidx for cidx in range(first_child, self.subtree_end[idx] + 1)
+            if parent[cidx] == idx]
+
+    def _get_obj(self, idx):
+        obj = self._objs[idx]
+        if obj is None:
+            root = idx
+            while self.parent[root] >= 0:
+                root = self.parent[root]
+            self._build_objs(root, self.subtree_end[root])
+            obj = self._objs[idx]
+        return obj
+
+    def _build_objs(self, begin, end):
+        ## Build all missing objects in begin..end (inclusive), then link them
+        objs = self._objs
+        new_idxs = list()
+        for idx in range(begin, end + 1):
+            if objs[idx] is None:
+                obj = self.line_factory(self.text[idx])
+                obj.confobj = self.confobj
+                obj._linenum = idx
+                obj.indent = self.indent[idx]
+                obj.child_indent = self.child_indent[idx]
+                obj._subtree_len = self.subtree_end[idx] - idx
+                obj.oldest_ancestor = (idx in self.oldest_ancestor)
+                objs[idx] = obj
+                new_idxs.append(idx)
+
+        for idx in new_idxs:
+            obj = objs[idx]
+            parent = self.parent[idx]
+            if parent >= 0:
+                obj.parent = objs[parent] or self._get_obj(parent)
+                # Built above, or earlier in this loop
+                obj._depth = obj.parent._depth + 1
+            obj.children = [objs[cidx] or self._get_obj(cidx) 
+                for cidx in self.children_idx(idx)]
+
+    def _detach(self):
+        ## Build every object and drop the arrays; they can't follow edits
+        if not self.is_detached:
+            if len(self._objs) > 0:
+                self._build_objs(0, len(self._objs) - 1)
+            self._objs = _ChunkedLines(self._objs)
+            self.text = None
+            self.indent = self.parent = self.first_child = None
+            self.subtree_end = self.is_comment = self.child_indent = None
+
+
+def _own_layout(cls):
+    ## True if cls adds a __dict__ or slots to BaseCfgLine; python can't 
+    ##    swap a line's __class__ to or from such a class
+    return cls.__basicsize__ != BaseCfgLine.__basicsize__
+
+
+class _LineClassTrie(object):
+    """Pick the model class for a line of text, on behalf of 
+    :func:`~ciscoconfparse.ConfigLineFactory`.
+
+    Classes are kept in priority order, and ``default`` is used when no 
+    other class claims the line.  Each class lists the line prefixes its 
+    ``is_object_for()`` could accept in ``factory_prefixes``; a character 
+    trie over those prefixes (lowercased, with all whitespace as ' ') finds 
+    the few candidate classes for a line, so most lines need zero or one 
+    ``is_object_for()`` call instead of one per class.  Classes with 
+    ``factory_prefixes = None`` are candidates for every line.
+    """
+
+    _WHITESPACE = frozenset(' \t\n\r\f\v')
+
+    def __init__(self, classes, default):
+        self.classes = list()
+        self.default = default
+        self._prefixes = list()
+        for cls in classes:
+            self.register(cls, index=len(self.classes))
+
+    def register(self, cls, prefixes=None, index=0):
+        """Add ``cls`` at ``index`` in the priority list (first by default).
+
+        ``prefixes`` defaults to ``cls.factory_prefixes``."""
+        if prefixes is None:
+            prefixes = cls.factory_prefixes
+        if getattr(prefixes, 'capitalize', False):
+            prefixes = (prefixes,)
+        self.classes.insert(index, cls)
+        self._prefixes.insert(index, prefixes)
+        self._build()
+
+    def _build(self):
+        ## Lazy factory lines may answer these without being promoted, 
+        ##    because no model class overrides them
+        overridden = set()
+        for cls in self.classes + [self.default]:
+            for klass in cls.__mro__:
+                if klass is BaseCfgLine:
+                    break
+                overridden.update(klass.__dict__)
+        self.lazy_names = frozenset([name for name in BaseCfgLine.__dict__
+            if not (name in overridden)])
+        self.own_layout = frozenset([cls for cls in self.classes 
+            if _own_layout(cls)])
+
+        self._trie = dict()
+        self._depth = 0
+        self._any = list()     # Indexes of classes without prefixes
+        for idx, prefixes in enumerate(self._prefixes):
+            if prefixes is None:
+                self._any.append(idx)
+                continue
+            for prefix in prefixes:
+                node = self._trie
+                for char in self._normalize(prefix):
+                    node = node.setdefault(char, dict())
+                node.setdefault('', list()).append(idx)
+                self._depth = max(self._depth, len(prefix))
+
+    def _normalize(self, text):
+        whitespace = self._WHITESPACE
+        return [(char in whitespace) and ' ' or char for char in text.lower()]
+
+    def candidates(self, text):
+        """Return the classes, in priority order, which might accept text"""
+        retval = list(self._any)
+        node = self._trie
+        whitespace = self._WHITESPACE
+        for char in text[0:self._depth].lower():
+            if char in whitespace:
+                char = ' '
+            node = node.get(char, None)
+            if node is None:
+                break
+            retval.extend(node.get('', ()))
+        classes = self.classes
+        return [classes[idx] for idx in sorted(set(retval))]
+
+    def classify(self, text, skip_own_layout=False):
+        """Return the first candidate class whose is_object_for() accepts 
+        ``text``, or the default class.  With ``skip_own_layout``, classes 
+        in ``own_layout`` are not tried."""
+        own_layout = skip_own_layout and self.own_layout
+        for cls in self.candidates(text):
+            if own_layout and (cls in own_layout):
+                continue
+            if cls.is_object_for(text):
+                return cls
+        return self.default
+
+    def eager_class(self, text):
+        """Return the class for ``text`` if it is in ``own_layout``, or 
+        None.  A ``factory='lazy'`` placeholder can't be promoted to those 
+        classes in place, so their lines are built up front."""
+        candidates = self.candidates(text)
+        for cls in candidates:
+            if cls in self.own_layout:
+                break
+        else:
+            return None
+        for cls in candidates:
+            if cls.is_object_for(text):
+                return (cls in self.own_layout) and cls or None
+        return None
+
+
+_LINE_CLASSES = {
+    'ios': _LineClassTrie([
+        IOSIntfLine, IOSRouteLine, IOSAccessLine,
+        IOSAaaLoginAuthenticationLine, IOSAaaEnableAuthenticationLine,
+        IOSAaaCommandsAuthorizationLine, IOSAaaCommandsAccountingLine,
+        IOSAaaExecAccountingLine, IOSAaaGroupServerLine, IOSHostnameLine,
+        IOSIntfGlobal,
+    ], default=IOSCfgLine),
+    'asa': _LineClassTrie([
+        ASAName, ASAObjNetwork, ASAObjService, ASAObjGroupNetwork,
+        ASAObjGroupService, ASAIntfLine, ASAIntfGlobal, ASAHostnameLine,
+        ASAAclLine,
+    ], default=ASACfgLine),
+}
+
+
+class _LazyFactoryLine(object):
+    """Mixin for the placeholder lines of a ``factory='lazy'`` parse.
+
+    Placeholders are plain lines which had their ``__class__`` swapped to a 
+    subclass of this mixin after the parse (or when built, with 
+    ``columnar=True``), so parsing costs the same as ``factory=False``.  
+    The placeholder only answers attributes which are the same for every 
+    model class (text, linenum, parent, children...).  Anything else, 
+    including ``__class__``, first promotes the line to the class 
+    :func:`~ciscoconfparse.ConfigLineFactory` would have chosen, by swapping 
+    ``__class__`` and running that class' ``__init__()``.  The family 
+    relationships are kept, so a promoted line is identical to a line parsed 
+    with ``factory=True``.
+    """
+    __slots__ = ()
+
+    _syntax = None       # The key in _LINE_CLASSES
+    _STATE = ('_linenum', '_chunk', 'parent', 'child_indent', 'is_comment', 
+        'children', 'oldest_ancestor', 'indent', '_depth', '_subtree_len')
+
+    def __getattribute__(self, name):
+        if name in _LINE_CLASSES[type(self)._syntax].lazy_names:
+            return object.__getattribute__(self, name)
+        _promote_lazy_line(self)
+        return getattr(self, name)
+
+    def __setattr__(self, name, value):
+        ## New text could change the class; promote using the old text.  
+        ##    Model attributes (e.g. ifindex) need the model class
+        if (name=='text') and (getattr(self, 'text', None) is not None):
+            _promote_lazy_line(self)
+        elif not (name in _LINE_CLASSES[type(self)._syntax].lazy_names):
+            _promote_lazy_line(self)
+            return setattr(self, name, value)
+        object.__setattr__(self, name, value)
+
+    def __repr__(self):
+        _promote_lazy_line(self)
+        return repr(self)
+
+
+def _promote_lazy_line(obj):
+    ## Turn a _LazyFactoryLine into the class chosen by ConfigLineFactory
+    lazy_cls = type(obj)
+    text = object.__getattribute__(obj, 'text')
+    ## Lines of own_layout classes were built up front; those registered 
+    ##    after the parse don't change its lines (as with factory=True)
+    _reinit_line(obj, _LINE_CLASSES[lazy_cls._syntax].classify(text,
+        skip_own_layout=True))
+
+
+def _reinit_line(obj, cls):
+    ## Make obj a new instance of cls in place, keeping its family links; 
+    ##    return obj, or a new line object if obj or cls has its own layout
+    old_cls = type(obj)
+    get = object.__getattribute__
+    text = get(obj, 'text')
+    comment_delimiter = get(obj, 'comment_delimiter')
+    state = [(name, get(obj, name)) for name in _LazyFactoryLine._STATE]
+
+    if _own_layout(old_cls) or _own_layout(cls):
+        new = cls(text=text, comment_delimiter=comment_delimiter,
+            confobj=get(obj, 'confobj'))
+        for name, value in state:
+            object.__setattr__(new, name, value)
+        return new
+
+    object.__setattr__(obj, '__class__', cls)
+    try:
+        cls.__init__(obj, text=text, comment_delimiter=comment_delimiter,
+            confobj=get(obj, 'confobj'))
+    except:
+        object.__setattr__(obj, '__class__', old_cls)
+        raise
+    finally:
+        for name, value in state:
+            object.__setattr__(obj, name, value)
+    return obj
+
+
+def _use_lazy_lines(objs, syntax):
+    ## Swap plain lines to the factory='lazy' placeholder class; lines of
+    ##    own_layout classes were built up front, and keep their class
+    lazy_cls = _CONFIG_SYNTAXES[syntax].lazy_line_class
+    if not _LINE_CLASSES[syntax].own_layout:
+        for obj in objs:
+            object.__setattr__(obj, '__class__', lazy_cls)
+        return
+    for obj in objs:
+        if not _own_layout(type(obj)):
+            object.__setattr__(obj, '__class__', lazy_cls)
+
+
+class _LazyIOSCfgLine(_LazyFactoryLine, IOSCfgLine):
+    __slots__ = ()
+    _syntax = 'ios'
+
+
+class _LazyASACfgLine(_LazyFactoryLine, ASACfgLine):
+    __slots__ = ()
+    _syntax = 'asa'
+
+
+class _ConfigSyntax(object):
+    """The parts of parsing which differ between config syntaxes; 
+    :class:`~ciscoconfparse.BaseConfigList` looks up its ``syntax`` in 
+    ``_CONFIG_SYNTAXES``.
+
+    Attributes:
+        - name (str): The syntax name, which is also the key of its line classes in ``_LINE_CLASSES`` (if it supports ``factory=True``)
+        - line_class: The class of lines parsed without ``factory``; it must do no work in __init__() beyond BaseCfgLine's
+        - lazy_line_class: The placeholder class used with ``factory='lazy'``, or None
+        - banners (bool): True if IOS-style banners are parsed (see :func:`~ciscoconfparse._link_config_lines`)
+        - braces (bool): True if configs are brace-delimited (see :func:`~ciscoconfparse._junos_lines`)
+        - symbols (dict): Compiled regexes of syntax-specific symbol tables, by name
+        - config_list: The :class:`~ciscoconfparse.BaseConfigList` subclass which :class:`~ciscoconfparse.CiscoConfParse` uses
+    """
+
+    def __init__(self, name, line_class, lazy_line_class=None, 
+        banners=False, braces=False, symbols=None, 
+        config_list=IOSConfigList):
+        self.name = name
+        self.config_list = config_list
+        self.line_class = line_class
+        self.lazy_line_class = lazy_line_class
+        self.banners = banners
+        self.braces = braces
+        self.symbols = symbols or dict()
+
+    def __repr__(self):
+        return "<_ConfigSyntax '{0}'>".format(self.name)
+
+
+_CONFIG_SYNTAXES = {
+    'ios': _ConfigSyntax('ios', IOSCfgLine, _LazyIOSCfgLine, banners=True),
+    'asa': _ConfigSyntax('asa', ASACfgLine, _LazyASACfgLine, 
+        config_list=ASAConfigList, symbols={
+        'names': register_regex(r'^\s*name\s+(\d+\.\d+\.\d+\.\d+)\s+(\S+)'),
+        'object_group_network': register_regex(
+            r'^\s*object-group\s+network\s+(\S+)'),
+        'object_group_service': register_regex(
+            r'^\s*object-group\s+service\s+(\S+)'),
+        'access_list': register_regex(r'^\s*access-list\s+(\S+)'),
+        }),
+    'junos': _ConfigSyntax('junos', JunosCfgLine, braces=True),
+    }
+
+## Line classes with no work in __init__() beyond BaseCfgLine's
+_PLAIN_LINE_CLASSES = frozenset([syntax.line_class for syntax in 
+    _CONFIG_SYNTAXES.values()])
+
+
+def register_line_class(cls, syntax='ios', prefixes=None):
+    """Teach :func:`~ciscoconfparse.ConfigLineFactory` (``factory=True``) 
+    about a custom :class:`~ccp_abc.BaseCfgLine` subclass.  Registered 
+    classes are tried before the built-in classes.
+
+    Like the built-in classes, ``cls`` should declare ``__slots__ = ()`` 
+    and derive its attributes from the line text (e.g. with properties); 
+    then a line can change class in place, when a ``factory='lazy'`` line 
+    is first used or when :meth:`~ciscoconfparse.CiscoConfParse.commit` 
+    reclassifies a line with new text.  Any other class (e.g. one which 
+    sets attributes in ``__init__()``) also works, but its lines are built 
+    when the config is parsed, and ``commit()`` replaces a line object 
+    which moves to or from it.
+
+    Args:
+        - cls (class): A :class:`~ccp_abc.BaseCfgLine` subclass with an ``is_object_for()`` classmethod
+    Kwargs:
+        - syntax (str): The syntax which should use ``cls``; 'ios' or 'asa'
+        - prefixes (tuple): The line prefixes ``cls.is_object_for()`` could accept; defaults to ``cls.factory_prefixes``.  If there are no prefixes, ``is_object_for()`` is called for every line.
+
+    .. code-block:: python
+
+       >>> class MyNtpLine(IOSCfgLine):
+       ...     __slots__ = ()
+       ...     factory_prefixes = ('ntp server',)
+       ...     @classmethod
+       ...     def is_object_for(cls, line="", re=re):
+       ...         return bool(re.search(r'^ntp\sserver', line))
+       ...     @property
+       ...     def server(self):
+       ...         return self.text.split()[2]
+       ...
+       >>> register_line_class(MyNtpLine, syntax='ios')
+       >>> parse = CiscoConfParse(['ntp server 192.0.2.1'], factory='lazy')
+       >>> parse.ConfigObjs[0].server
+       '192.0.2.1'
+       >>> parse.ConfigObjs[0]
+       <MyNtpLine # 0 'ntp server 192.0.2.1'>
+       >>>
+    """
+    if not (syntax in _LINE_CLASSES):
+        raise ValueError("FATAL: '{}' is an unknown syntax".format(syntax))
+    _LINE_CLASSES[syntax].register(cls, prefixes=prefixes)
+
+
+def ConfigLineFactory(text="", comment_delimiter="!", syntax='ios', 
+    confobj=None):
+    ## Ask the syntax's trie for the few classes which might match...
+    line_classes = _LINE_CLASSES.get(syntax, None)
+    if line_classes is None:
+        raise ValueError("FATAL: '{}' is an unknown syntax".format(syntax))
+    cls = line_classes.classify(text)
+    return cls(text=text, comment_delimiter=comment_delimiter,
+               confobj=confobj)  # instance of the proper subclass
 
 
 ### TODO: Add unit tests below
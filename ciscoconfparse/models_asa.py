@@ -1,9 +1,10 @@
 import re
 
 from protocol_values import ASA_TCP_PORTS, ASA_UDP_PORTS, ASA_IP_PROTOCOLS
-from ccp_abc import BaseCfgLine
+from ccp_abc import BaseCfgLine, _UserAttribute
 from ccp_util import L4Object
 from ccp_util import IPv4Obj
+from ccp_regex import register_regex
 
 ### HUGE UGLY WARNING:
 ###   Anything in models_asa.py could change at any time, until I remove this
@@ -72,6 +73,9 @@ class ASACfgLine(BaseCfgLine):
         - an instance of :class:`~models_asa.ASACfgLine`.
 
     """
+
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         """Accept an ASA line number and initialize family relationship
         attributes"""
@@ -130,11 +134,14 @@ class ASACfgLine(BaseCfgLine):
 #    default -> def
 
 class BaseASAIntfLine(ASACfgLine):
+    __slots__ = ()
+    factory_prefixes = ()
+
+    ifindex = _UserAttribute()    # Optional, for user use
+    default_ipv4_addr_object = IPv4Obj('127.0.0.1/32', strict=False)
+
     def __init__(self, *args, **kwargs):
         super(BaseASAIntfLine, self).__init__(*args, **kwargs)
-        self.ifindex = None    # Optional, for user use
-        self.default_ipv4_addr_object = IPv4Obj('127.0.0.1/32', 
-            strict=False)
 
     def __repr__(self):
         if not self.is_switchport:
@@ -382,21 +389,16 @@ class BaseASAIntfLine(ASACfgLine):
 ##
 
 _RE_NAMEOBJECT_STR = r'^name\s+(?P<addr>\d+\.\d+\.\d+\.\d+)\s(?P<name>\S+)'
-_RE_NAMEOBJECT = re.compile(_RE_NAMEOBJECT_STR, re.VERBOSE)
+_RE_NAMEOBJECT = register_regex(_RE_NAMEOBJECT_STR, re.VERBOSE)
 class ASAName(ASACfgLine):
+    __slots__ = ()
+    factory_prefixes = ('name ',)
 
     def __init__(self, *args, **kwargs):
         """Accept an ASA line number and initialize family relationship
         attributes"""
         super(ASAName, self).__init__(*args, **kwargs)
-        mm = _RE_NAMEOBJECT.search(self.text)
-        if not (mm is None):
-            self._mm_results = mm.groupdict()   # All regex match results
-        else:
-            raise ValueError
-
-        self.name = self._mm_results['name']
-        self.addr = self._mm_results['addr']
+        self._mm_results    # Raise ValueError now, not on first use
 
     @classmethod
     def is_object_for(cls, line="", re=re):
@@ -404,6 +406,28 @@ class ASAName(ASACfgLine):
             return True
         return False
 
+    def _parse_mm_results(self):
+        mm = _RE_NAMEOBJECT.search(self.text)
+        if mm is None:
+            raise ValueError
+        return mm.groupdict()
+
+    @property
+    def _mm_results(self):
+        ## All regex match results, kept in the _parsed slot until text changes
+        parsed = self._parsed
+        if parsed is None:
+            parsed = self._parsed = self._parse_mm_results()
+        return parsed
+
+    @property
+    def name(self):
+        return self._mm_results['name']
+
+    @property
+    def addr(self):
+        return self._mm_results['addr']
+
     @property
     def result_dict(self):
         mm_r = self._mm_results
@@ -419,6 +443,8 @@ class ASAName(ASACfgLine):
 ##
 
 class ASAObjNetwork(ASACfgLine):
+    __slots__ = ()
+    factory_prefixes = ('object network ',)
 
     def __init__(self, *args, **kwargs):
         """Accept an ASA line number and initialize family relationship
@@ -436,6 +462,8 @@ class ASAObjNetwork(ASACfgLine):
 ##
 
 class ASAObjService(ASACfgLine):
+    __slots__ = ()
+    factory_prefixes = ('object service ',)
 
     def __init__(self, *args, **kwargs):
         """Accept an ASA line number and initialize family relationship
@@ -457,23 +485,27 @@ _RE_NETOBJECT_STR = r"""(?:                         # Non-capturing parenthesis
 |(^\s*group-object\s+(?P<groupobject>\S+))
 )                                                   # Close non-capture parens
 """
-_RE_NETOBJECT = re.compile(_RE_NETOBJECT_STR, re.VERBOSE)
+_RE_NETOBJECT = register_regex(_RE_NETOBJECT_STR, re.VERBOSE)
 class ASAObjGroupNetwork(ASACfgLine):
+    __slots__ = ()
+    factory_prefixes = ('object-group network ',)
 
     def __init__(self, *args, **kwargs):
         """Accept an ASA line number and initialize family relationship
         attributes"""
         super(ASAObjGroupNetwork, self).__init__(*args, **kwargs)
 
-        self.name = self.re_match_typed(r'^object-group\s+network\s+(\S+)', group=1, 
-            result_type=str)
-
     @classmethod
     def is_object_for(cls, line="", re=re):
         if 'object-group network ' in line[0:21].lower():
             return True
         return False
 
+    @property
+    def name(self):
+        return self._re_match_field(r'^object-group\s+network\s+(\S+)', 
+            group=1, result_type=str)
+
     @property
     def hash_children(self):
         ## Manually override the BaseCfgLine method since this recurses through
@@ -558,33 +590,45 @@ _RE_PORTOBJ_STR = r"""(?:                            # Non-capturing parentesis
 |(^\s*group-object\s+(?P<groupobject>\S+))
 )                                                   # Close non-capture parens
 """.format('tcp|udp|tcp-udp')
-_RE_PORTOBJECT = re.compile(_RE_PORTOBJ_STR, re.VERBOSE)
+_RE_PORTOBJECT = register_regex(_RE_PORTOBJ_STR, re.VERBOSE)
 
 class ASAObjGroupService(ASACfgLine):
+    __slots__ = ()
+    factory_prefixes = ('object-group service ',)
 
     def __init__(self, *args, **kwargs):
         """Accept an ASA line number and initialize family relationship 
             attributes"""
         super(ASAObjGroupService, self).__init__(*args, **kwargs)
 
-        self.protocol_type = self.re_match_typed(r'^object-group\s+service\s+\S+(\s+.+)*$',
-            group=1, default='', result_type=str).strip()
-        self.name = self.re_match_typed(r'^object-group\s+service\s+(\S+)',
-            group=1, default='', result_type=str)
+    @classmethod
+    def is_object_for(cls, line="", re=re):
+        if 'object-group service ' in line[0:21].lower():
+            return True
+        return False
+
+    _FIELDS_REGEX = r'^object-group\s+service\s+(\S+)(\s+.+)*$'
+
+    @property
+    def protocol_type(self):
+        return self._re_match_field(self._FIELDS_REGEX, group=2, default='',
+            result_type=str).strip()
+
+    @property
+    def name(self):
+        return self._re_match_field(self._FIELDS_REGEX, group=1, default='',
+            result_type=str)
+
+    @property
+    def L4Objects_are_directional(self):
         ## If *no protocol* is specified in the object-group statement, the 
         ##   object-group can be used for both source or destination ports 
         ##   at the same time.  Thus L4Objects_are_directional is True if we
         ##   do not specify a protocol in the 'object-group service' line
         if (self.protocol_type==''):
-            self.L4Objects_are_directional = True
-        else:
-            self.L4Objects_are_directional = False
-
-    @classmethod
-    def is_object_for(cls, line="", re=re):
-        if 'object-group service ' in line[0:21].lower():
             return True
-        return False
+        else:
+            return False
 
     def __repr__(self):
         return "<ASAObjGroupService {0} protocol: {1}>".format(self.name, self.protocol_type)
@@ -654,16 +698,19 @@ class ASAObjGroupService(ASACfgLine):
 ##
 
 class ASAIntfLine(BaseASAIntfLine):
+    __slots__ = ()
+    factory_prefixes = ('interface',)
 
     def __init__(self, *args, **kwargs):
         """Accept an ASA line number and initialize family relationship
         attributes"""
         super(ASAIntfLine, self).__init__(*args, **kwargs)
 
+    _OBJECT_FOR_REGEX = register_regex(r'^interface\s+(\S+.+)')
+
     @classmethod
     def is_object_for(cls, line="", re=re):
-        intf_regex = r'^interface\s+(\S+.+)'
-        if re.search(intf_regex, line):
+        if cls._OBJECT_FOR_REGEX.search(line):
             return True
         return False
 
@@ -672,17 +719,22 @@ class ASAIntfLine(BaseASAIntfLine):
 ##
 
 class ASAIntfGlobal(BaseCfgLine):
+    __slots__ = ()
+    factory_prefixes = ('mtu',)
+    feature = 'interface global'
+
     def __init__(self, *args, **kwargs):
         super(ASAIntfGlobal, self).__init__(*args, **kwargs)
-        self.feature = 'interface global'
 
     def __repr__(self):
         return "<%s # %s '%s'>" % (self.classname, self.linenum, 
             self.text)
 
+    _OBJECT_FOR_REGEX = register_regex('^mtu')
+
     @classmethod
     def is_object_for(cls, line="", re=re):
-        if re.search('^mtu', line):
+        if cls._OBJECT_FOR_REGEX.search(line):
             return True
         return False
 
@@ -692,17 +744,22 @@ class ASAIntfGlobal(BaseCfgLine):
 ##
 
 class ASAHostnameLine(BaseCfgLine):
+    __slots__ = ()
+    factory_prefixes = ('hostname',)
+    feature = 'hostname'
+
     def __init__(self, *args, **kwargs):
         super(ASAHostnameLine, self).__init__(*args, **kwargs)
-        self.feature = 'hostname'
 
     def __repr__(self):
         return "<%s # %s '%s'>" % (self.classname, self.linenum, 
             self.hostname)
 
+    _OBJECT_FOR_REGEX = register_regex('^hostname')
+
     @classmethod
     def is_object_for(cls, line="", re=re):
-        if re.search('^hostname', line):
+        if cls._OBJECT_FOR_REGEX.search(line):
             return True
         return False
 
@@ -718,6 +775,9 @@ class ASAHostnameLine(BaseCfgLine):
 ##
 
 class BaseASARouteLine(BaseCfgLine):
+    __slots__ = ()
+    factory_prefixes = ()
+
     def __init__(self, *args, **kwargs):
         super(BaseASARouteLine, self).__init__(*args, **kwargs)
 
@@ -766,19 +826,27 @@ class BaseASARouteLine(BaseCfgLine):
 ##
 
 class ASARouteLine(BaseASARouteLine):
+    __slots__ = ()
+    factory_prefixes = ('ip',)
+
     def __init__(self, *args, **kwargs):
         super(ASARouteLine, self).__init__(*args, **kwargs)
-        if 'ipv6' in self.text:
-            self.feature = 'ipv6 route'
-        else:
-            self.feature = 'ip route'
+
+    _OBJECT_FOR_REGEX = register_regex('^(ip|ipv6)\s+route\s+\S')
 
     @classmethod
     def is_object_for(cls, line="", re=re):
-        if re.search('^(ip|ipv6)\s+route\s+\S', line):
+        if cls._OBJECT_FOR_REGEX.search(line):
             return True
         return False
 
+    @property
+    def feature(self):
+        if 'ipv6' in self.text:
+            return 'ipv6 route'
+        else:
+            return 'ip route'
+
     @property
     def address_family(self):
         ## ipv4, ipv6, etc
@@ -977,18 +1045,15 @@ _RE_ACLOBJECT_STR = r"""(?:                         # Non-capturing parenthesis
   )
 )                                                   # Close non-capture parens
 """.format(_ACL_PROTOCOLS, _ACL_LOGLEVELS, _ACL_ICMP_PROTOCOLS)
-_RE_ACLOBJECT = re.compile(_RE_ACLOBJECT_STR, re.VERBOSE)
+_RE_ACLOBJECT = register_regex(_RE_ACLOBJECT_STR, re.VERBOSE)
 
 class ASAAclLine(ASACfgLine):
+    __slots__ = ()
 
     def __init__(self, *args, **kwargs):
         """Provide attributes on Cisco ASA Access-Lists"""
         super(ASAAclLine, self).__init__(*args, **kwargs)
-        mm = _RE_ACLOBJECT.search(self.text)
-        if not (mm is None):
-            self._mm_results = mm.groupdict()   # All regex match results
-        else:
-            raise ValueError("[FATAL] models_asa cannot parse '{0}'".format(self.text))
+        self._mm_results    # Raise ValueError now, not on first use
 
     @classmethod
     def is_object_for(cls, line="", re=re):
@@ -997,6 +1062,20 @@ class ASAAclLine(ASACfgLine):
             return True
         return False
 
+    def _parse_mm_results(self):
+        mm = _RE_ACLOBJECT.search(self.text)
+        if mm is None:
+            raise ValueError("[FATAL] models_asa cannot parse '{0}'".format(self.text))
+        return mm.groupdict()
+
+    @property
+    def _mm_results(self):
+        ## All regex match results, kept in the _parsed slot until text changes
+        parsed = self._parsed
+        if parsed is None:
+            parsed = self._parsed = self._parse_mm_results()
+        return parsed
+
     @property
     def src_addr_method(self):
         mm_r = self._mm_results
@@ -1015,7 +1094,6 @@ class ASAAclLine(ASACfgLine):
         ## NOTE: I intended to match dst addrs here...
         elif mm_r['acl_name3']:
             ## Special case: standard ACLs match any src implicitly
-            self._mm_results['src_network3'] = 'any4'
             return 'network'
         else:
             raise ValueError("Cannot parse ACL source address method for '{0}'".format(self.text))
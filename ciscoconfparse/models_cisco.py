@@ -5,7 +5,8 @@ import os
 from ccp_util import _IPV6_REGEX_STR_COMPRESSED1, _IPV6_REGEX_STR_COMPRESSED2
 from ccp_util import _IPV6_REGEX_STR_COMPRESSED3
 from ccp_util import CiscoRange, IPv4Obj, IPv6Obj
-from ccp_abc import BaseCfgLine
+from ccp_abc import BaseCfgLine, _UserAttribute
+from ccp_regex import register_regex
 
 ### HUGE UGLY WARNING:
 ###   Anything in models_cisco.py could change at any time, until I remove this
@@ -73,6 +74,8 @@ class IOSCfgLine(BaseCfgLine):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         """Accept an IOS line number and initialize family relationship
         attributes"""
@@ -169,7 +172,7 @@ class IOSCfgLine(BaseCfgLine):
         return False
 
     _VIRTUAL_INTF_REGEX_STR = r"""^interface\s+(Loopback|Vlan|Tunnel|Dialer|Virtual-Template|Port-Channel)"""
-    _VIRTUAL_INTF_REGEX = re.compile(_VIRTUAL_INTF_REGEX_STR, re.I)
+    _VIRTUAL_INTF_REGEX = register_regex(_VIRTUAL_INTF_REGEX_STR, re.I)
 
     @property
     def is_virtual_intf(self):
@@ -295,10 +298,14 @@ class IOSCfgLine(BaseCfgLine):
 
 
 class BaseIOSIntfLine(IOSCfgLine):
+    __slots__ = ()
+    factory_prefixes = ()
+
+    ifindex = _UserAttribute()  # Optional, for user use
+    default_ipv4_addr_object = IPv4Obj('127.0.0.1/32', strict=False)
+
     def __init__(self, *args, **kwargs):
         super(BaseIOSIntfLine, self).__init__(*args, **kwargs)
-        self.ifindex = None  # Optional, for user use
-        self.default_ipv4_addr_object = IPv4Obj('127.0.0.1/32', strict=False)
 
     def __repr__(self):
         if not self.is_switchport:
@@ -357,7 +364,7 @@ class BaseIOSIntfLine(IOSCfgLine):
         return self._build_abbvs()
 
     _INTF_NAME_RE_STR = r'^interface\s+(\S+[0-9\/\.\s]+)\s*'
-    _INTF_NAME_REGEX = re.compile(_INTF_NAME_RE_STR)
+    _INTF_NAME_REGEX = register_regex(_INTF_NAME_RE_STR)
 
     @property
     def name(self):
@@ -1452,6 +1459,9 @@ class BaseIOSIntfLine(IOSCfgLine):
 
 
 class IOSIntfLine(BaseIOSIntfLine):
+    __slots__ = ()
+    factory_prefixes = ('interface',)
+
     def __init__(self, *args, **kwargs):
         """Accept an IOS line number and initialize family relationship
         attributes
@@ -1462,10 +1472,11 @@ class IOSIntfLine(BaseIOSIntfLine):
         """
         super(IOSIntfLine, self).__init__(*args, **kwargs)
 
+    _OBJECT_FOR_REGEX = register_regex(r'^interface\s+(\S+.+)')
+
     @classmethod
     def is_object_for(cls, line="", re=re):
-        intf_regex = r'^interface\s+(\S+.+)'
-        if re.search(intf_regex, line):
+        if cls._OBJECT_FOR_REGEX.search(line):
             return True
         return False
 
@@ -1476,18 +1487,21 @@ class IOSIntfLine(BaseIOSIntfLine):
 
 
 class IOSIntfGlobal(BaseCfgLine):
+    __slots__ = ()
+    feature = 'interface global'
+
     def __init__(self, *args, **kwargs):
         super(IOSIntfGlobal, self).__init__(*args, **kwargs)
-        self.feature = 'interface global'
 
     def __repr__(self):
         return "<%s # %s '%s'>" % (self.classname, self.linenum, self.text)
 
+    _OBJECT_FOR_REGEX = register_regex(
+        '^(no\s+cdp\s+run)|(logging\s+event\s+link-status\s+global)|(spanning-tree\sportfast\sdefault)|(spanning-tree\sportfast\sbpduguard\sdefault)')
+
     @classmethod
     def is_object_for(cls, line="", re=re):
-        if re.search(
-                '^(no\s+cdp\s+run)|(logging\s+event\s+link-status\s+global)|(spanning-tree\sportfast\sdefault)|(spanning-tree\sportfast\sbpduguard\sdefault)',
-                line):
+        if cls._OBJECT_FOR_REGEX.search(line):
             return True
         return False
 
@@ -1528,16 +1542,21 @@ class IOSIntfGlobal(BaseCfgLine):
 
 
 class IOSHostnameLine(BaseCfgLine):
+    __slots__ = ()
+    factory_prefixes = ('hostname',)
+    feature = 'hostname'
+
     def __init__(self, *args, **kwargs):
         super(IOSHostnameLine, self).__init__(*args, **kwargs)
-        self.feature = 'hostname'
 
     def __repr__(self):
         return "<%s # %s '%s'>" % (self.classname, self.linenum, self.hostname)
 
+    _OBJECT_FOR_REGEX = register_regex('^hostname')
+
     @classmethod
     def is_object_for(cls, line="", re=re):
-        if re.search('^hostname', line):
+        if cls._OBJECT_FOR_REGEX.search(line):
             return True
         return False
 
@@ -1554,17 +1573,23 @@ class IOSHostnameLine(BaseCfgLine):
 
 
 class IOSAccessLine(BaseCfgLine):
+    __slots__ = ()
+    factory_prefixes = ('line',)
+    feature = 'access line'
+
     def __init__(self, *args, **kwargs):
         super(IOSAccessLine, self).__init__(*args, **kwargs)
-        self.feature = 'access line'
 
     def __repr__(self):
         return "<%s # %s '%s' info: '%s'>" % (self.classname, self.linenum,
                                               self.name, self.range_str)
 
+    _OBJECT_FOR_REGEX = register_regex('^line')
+    _ASYNC_LINE_REGEX = register_regex('\d+')
+
     @classmethod
     def is_object_for(cls, line="", re=re):
-        if re.search('^line', line):
+        if cls._OBJECT_FOR_REGEX.search(line):
             return True
         return False
 
@@ -1579,7 +1604,7 @@ class IOSAccessLine(BaseCfgLine):
         retval = self.re_match_typed(
             r'^line\s+(\S+)', result_type=str, default='')
         # special case for IOS async lines: i.e. "line 33 48"
-        if re.search('\d+', retval):
+        if self._ASYNC_LINE_REGEX.search(retval):
             return ''
         return retval
 
@@ -1635,6 +1660,9 @@ class IOSAccessLine(BaseCfgLine):
 
 
 class BaseIOSRouteLine(BaseCfgLine):
+    __slots__ = ()
+    factory_prefixes = ()
+
     def __init__(self, *args, **kwargs):
         super(BaseIOSRouteLine, self).__init__(*args, **kwargs)
 
@@ -1689,7 +1717,7 @@ class BaseIOSRouteLine(BaseCfgLine):
 ##-------------  IOS Route line object
 ##
 
-_RE_IP_ROUTE = re.compile(r"""^ip\s+route
+_RE_IP_ROUTE = register_regex(r"""^ip\s+route
 (?:\s+(?:vrf\s+(?P<vrf>\S+)))?          # VRF detection
 \s+
 (?P<prefix>\d+\.\d+\.\d+\.\d+)          # Prefix detection
@@ -1707,7 +1735,7 @@ _RE_IP_ROUTE = re.compile(r"""^ip\s+route
 (?:\s+tag\s+(?P<tag>\d+))?       # Route tag
 """, re.VERBOSE)
 
-_RE_IPV6_ROUTE = re.compile(r"""^ipv6\s+route
+_RE_IPV6_ROUTE = register_regex(r"""^ipv6\s+route
 (?:\s+vrf\s+(?P<vrf>\S+))?
 (?:\s+(?P<prefix>{0})\/(?P<masklength>\d+))    # Prefix detection
 (?:
@@ -1723,24 +1751,12 @@ _RE_IPV6_ROUTE = re.compile(r"""^ipv6\s+route
 
 
 class IOSRouteLine(BaseIOSRouteLine):
+    __slots__ = ()
+    factory_prefixes = ('ip route', 'ipv6 route ')
+
     def __init__(self, *args, **kwargs):
         super(IOSRouteLine, self).__init__(*args, **kwargs)
-        if 'ipv6' in self.text[0:4]:
-            self.feature = 'ipv6 route'
-            self._address_family = "ipv6"
-            mm = _RE_IPV6_ROUTE.search(self.text)
-            if not (mm is None):
-                self.route_info = mm.groupdict()
-            else:
-                raise ValueError("Could not parse '{0}'".format(self.text))
-        else:
-            self.feature = 'ip route'
-            self._address_family = "ip"
-            mm = _RE_IP_ROUTE.search(self.text)
-            if not (mm is None):
-                self.route_info = mm.groupdict()
-            else:
-                raise ValueError("Could not parse '{0}'".format(self.text))
+        self.route_info    # Raise ValueError now, not on first use
 
     @classmethod
     def is_object_for(cls, line="", re=re):
@@ -1748,6 +1764,33 @@ class IOSRouteLine(BaseIOSRouteLine):
             return True
         return False
 
+    def _parse_route(self):
+        if self._address_family == "ipv6":
+            mm = _RE_IPV6_ROUTE.search(self.text)
+        else:
+            mm = _RE_IP_ROUTE.search(self.text)
+        if mm is None:
+            raise ValueError("Could not parse '{0}'".format(self.text))
+        return mm.groupdict()
+
+    @property
+    def feature(self):
+        return self._address_family + ' route'
+
+    @property
+    def _address_family(self):
+        if 'ipv6' in self._text[0:4]:
+            return "ipv6"
+        return "ip"
+
+    @property
+    def route_info(self):
+        ## Kept in the _parsed slot until text changes
+        parsed = self._parsed
+        if parsed is None:
+            parsed = self._parsed = self._parse_route()
+        return parsed
+
     @property
     def vrf(self):
         if not (self.route_info['vrf'] is None):
@@ -1921,22 +1964,44 @@ class IOSRouteLine(BaseIOSRouteLine):
 ##-------------  IOS TACACS+ Group
 ##
 class IOSAaaGroupServerLine(BaseCfgLine):
+    __slots__ = ()
+    factory_prefixes = ('aaa group server',)
+    feature = 'aaa group server'
+
     def __init__(self, *args, **kwargs):
         super(IOSAaaGroupServerLine, self).__init__(*args, **kwargs)
-        self.feature = 'aaa group server'
-
-        REGEX = r'^aaa\sgroup\sserver\s(?P<protocol>\S+)\s(?P<group>\S+)\s*$'
-        mm = re.search(REGEX, self.text)
-        if not (mm is None):
-            groups = mm.groupdict()
-            self.protocol = groups.get('protocol', '')
-            self.group = groups.get('group', '')
-        else:
+        self._groups    # Raise ValueError now, not on first use
+
+    def _parse_groups(self):
+        mm = self._GROUP_SERVER_REGEX.search(self.text)
+        if mm is None:
             raise ValueError
+        return mm.groupdict()
+
+    @property
+    def _groups(self):
+        ## Kept in the _parsed slot until text changes
+        parsed = self._parsed
+        if parsed is None:
+            parsed = self._parsed = self._parse_groups()
+        return parsed
+
+    @property
+    def protocol(self):
+        return self._groups.get('protocol', '')
+
+    @property
+    def group(self):
+        return self._groups.get('group', '')
+
+    _OBJECT_FOR_REGEX = register_regex(r'^aaa\sgroup\sserver')
+    _GROUP_SERVER_REGEX = register_regex(
+        r'^aaa\sgroup\sserver\s(?P<protocol>\S+)\s(?P<group>\S+)\s*$')
+    _SERVER_PRIVATE_REGEX = register_regex('^\s+server-private\s+(\S+)\s')
 
     @classmethod
     def is_object_for(cls, line="", re=re):
-        if re.search(r'^aaa\sgroup\sserver', line):
+        if cls._OBJECT_FOR_REGEX.search(line):
             return True
         return False
 
@@ -1959,9 +2024,8 @@ class IOSAaaGroupServerLine(BaseCfgLine):
     @property
     def server_private(self, re=re):
         retval = set([])
-        rgx_priv = re.compile('^\s+server-private\s+(\S+)\s')
         for cobj in self.children:
-            mm = rgx_priv.search(cobj.text)
+            mm = self._SERVER_PRIVATE_REGEX.search(cobj.text)
             if not (mm is None):
                 retval.add(mm.group(1))  # This is the server's ip
         return retval
@@ -1973,107 +2037,163 @@ class IOSAaaGroupServerLine(BaseCfgLine):
 
 
 class IOSAaaLoginAuthenticationLine(BaseCfgLine):
-    def __init__(self, *args, **kwargs):
-        super(IOSAaaLoginAuthenticationLine, self).__init__(*args, **kwargs)
-        self.feature = 'aaa authentication login'
-
-        regex = r'^aaa\sauthentication\slogin\s(\S+)\sgroup\s(\S+)(.+?)$'
-        self.list_name = self.re_match_typed(
-            regex, group=1, result_type=str, default='')
-        self.group = self.re_match_typed(
-            regex, group=2, result_type=str, default='')
-        methods_str = self.re_match_typed(
-            regex, group=3, result_type=str, default='')
-        self.methods = methods_str.strip().split('\s')
+    __slots__ = ()
+    factory_prefixes = ('aaa authentication login',)
+    feature = 'aaa authentication login'
+
+    _FIELDS_REGEX = r'^aaa\sauthentication\slogin\s(\S+)\sgroup\s(\S+)(.+?)$'
+    _OBJECT_FOR_REGEX = register_regex(r'^aaa\sauthentication\slogin')
 
     @classmethod
     def is_object_for(cls, line="", re=re):
-        if re.search(r'^aaa\sauthentication\slogin', line):
+        if cls._OBJECT_FOR_REGEX.search(line):
             return True
         return False
 
+    @property
+    def list_name(self):
+        return self._re_match_field(self._FIELDS_REGEX, group=1, 
+            result_type=str, default='')
+
+    @property
+    def group(self):
+        return self._re_match_field(self._FIELDS_REGEX, group=2, 
+            result_type=str, default='')
+
+    @property
+    def methods(self):
+        methods_str = self._re_match_field(self._FIELDS_REGEX, group=3, 
+            result_type=str, default='')
+        return methods_str.strip().split('\s')
+
 
 class IOSAaaEnableAuthenticationLine(BaseCfgLine):
-    def __init__(self, *args, **kwargs):
-        super(IOSAaaEnableAuthenticationLine, self).__init__(*args, **kwargs)
-        self.feature = 'aaa authentication enable'
-
-        regex = r'^aaa\sauthentication\senable\s(\S+)\sgroup\s(\S+)(.+?)$'
-        self.list_name = self.re_match_typed(
-            regex, group=1, result_type=str, default='')
-        self.group = self.re_match_typed(
-            regex, group=2, result_type=str, default='')
-        methods_str = self.re_match_typed(
-            regex, group=3, result_type=str, default='')
-        self.methods = methods_str.strip().split('\s')
+    __slots__ = ()
+    factory_prefixes = ('aaa authentication enable',)
+    feature = 'aaa authentication enable'
+
+    _FIELDS_REGEX = r'^aaa\sauthentication\senable\s(\S+)\sgroup\s(\S+)(.+?)$'
+    _OBJECT_FOR_REGEX = register_regex(r'^aaa\sauthentication\senable')
 
     @classmethod
     def is_object_for(cls, line="", re=re):
-        if re.search(r'^aaa\sauthentication\senable', line):
+        if cls._OBJECT_FOR_REGEX.search(line):
             return True
         return False
 
+    @property
+    def list_name(self):
+        return self._re_match_field(self._FIELDS_REGEX, group=1, 
+            result_type=str, default='')
+
+    @property
+    def group(self):
+        return self._re_match_field(self._FIELDS_REGEX, group=2, 
+            result_type=str, default='')
+
+    @property
+    def methods(self):
+        methods_str = self._re_match_field(self._FIELDS_REGEX, group=3, 
+            result_type=str, default='')
+        return methods_str.strip().split('\s')
+
 
 class IOSAaaCommandsAuthorizationLine(BaseCfgLine):
-    def __init__(self, *args, **kwargs):
-        super(IOSAaaCommandsAuthorizationLine, self).__init__(*args, **kwargs)
-        self.feature = 'aaa authorization commands'
-
-        regex = r'^aaa\sauthorization\scommands\s(\d+)\s(\S+)\sgroup\s(\S+)(.+?)$'
-        self.level = self.re_match_typed(
-            regex, group=1, result_type=int, default=0)
-        self.list_name = self.re_match_typed(
-            regex, group=2, result_type=str, default='')
-        self.group = self.re_match_typed(
-            regex, group=3, result_type=str, default='')
-        methods_str = self.re_match_typed(
-            regex, group=4, result_type=str, default='')
-        self.methods = methods_str.strip().split('\s')
+    __slots__ = ()
+    factory_prefixes = ('aaa authorization commands',)
+    feature = 'aaa authorization commands'
+
+    _FIELDS_REGEX = r'^aaa\sauthorization\scommands\s(\d+)\s(\S+)\sgroup\s(\S+)(.+?)$'
+    _OBJECT_FOR_REGEX = register_regex(r'^aaa\sauthorization\scommands')
 
     @classmethod
     def is_object_for(cls, line="", re=re):
-        if re.search(r'^aaa\sauthorization\scommands', line):
+        if cls._OBJECT_FOR_REGEX.search(line):
             return True
         return False
 
+    @property
+    def level(self):
+        return self._re_match_field(self._FIELDS_REGEX, group=1, 
+            result_type=int, default=0)
+
+    @property
+    def list_name(self):
+        return self._re_match_field(self._FIELDS_REGEX, group=2, 
+            result_type=str, default='')
+
+    @property
+    def group(self):
+        return self._re_match_field(self._FIELDS_REGEX, group=3, 
+            result_type=str, default='')
+
+    @property
+    def methods(self):
+        methods_str = self._re_match_field(self._FIELDS_REGEX, group=4, 
+            result_type=str, default='')
+        return methods_str.strip().split('\s')
+
 
 class IOSAaaCommandsAccountingLine(BaseCfgLine):
-    def __init__(self, *args, **kwargs):
-        super(IOSAaaCommandsAccountingLine, self).__init__(*args, **kwargs)
-        self.feature = 'aaa accounting commands'
-
-        regex = r'^aaa\saccounting\scommands\s(\d+)\s(\S+)\s(none|stop\-only|start\-stop)\sgroup\s(\S+)$'
-        self.level = self.re_match_typed(
-            regex, group=1, result_type=int, default=0)
-        self.list_name = self.re_match_typed(
-            regex, group=2, result_type=str, default='')
-        self.record_type = self.re_match_typed(
-            regex, group=3, result_type=str, default='')
-        self.group = self.re_match_typed(
-            regex, group=4, result_type=str, default='')
+    __slots__ = ()
+    factory_prefixes = ('aaa accounting commands',)
+    feature = 'aaa accounting commands'
+
+    _FIELDS_REGEX = r'^aaa\saccounting\scommands\s(\d+)\s(\S+)\s(none|stop\-only|start\-stop)\sgroup\s(\S+)$'
+    _OBJECT_FOR_REGEX = register_regex(r'^aaa\saccounting\scommands')
 
     @classmethod
     def is_object_for(cls, line="", re=re):
-        if re.search(r'^aaa\saccounting\scommands', line):
+        if cls._OBJECT_FOR_REGEX.search(line):
             return True
         return False
 
+    @property
+    def level(self):
+        return self._re_match_field(self._FIELDS_REGEX, group=1, 
+            result_type=int, default=0)
+
+    @property
+    def list_name(self):
+        return self._re_match_field(self._FIELDS_REGEX, group=2, 
+            result_type=str, default='')
+
+    @property
+    def record_type(self):
+        return self._re_match_field(self._FIELDS_REGEX, group=3, 
+            result_type=str, default='')
+
+    @property
+    def group(self):
+        return self._re_match_field(self._FIELDS_REGEX, group=4, 
+            result_type=str, default='')
+
 
 class IOSAaaExecAccountingLine(BaseCfgLine):
-    def __init__(self, *args, **kwargs):
-        super(IOSAaaExecAccountingLine, self).__init__(*args, **kwargs)
-        self.feature = 'aaa accounting exec'
+    __slots__ = ()
+    factory_prefixes = ('aaa accounting exec',)
+    feature = 'aaa accounting exec'
 
-        regex = r'^aaa\saccounting\sexec\s(\S+)\s(none|stop\-only|start\-stop)\sgroup\s(\S+)$'
-        self.list_name = self.re_match_typed(
-            regex, group=1, result_type=str, default='')
-        self.record_type = self.re_match_typed(
-            regex, group=2, result_type=str, default='')
-        self.group = self.re_match_typed(
-            regex, group=3, result_type=str, default='')
+    _FIELDS_REGEX = r'^aaa\saccounting\sexec\s(\S+)\s(none|stop\-only|start\-stop)\sgroup\s(\S+)$'
+    _OBJECT_FOR_REGEX = register_regex(r'^aaa\saccounting\sexec')
 
     @classmethod
     def is_object_for(cls, line="", re=re):
-        if re.search(r'^aaa\saccounting\sexec', line):
+        if cls._OBJECT_FOR_REGEX.search(line):
             return True
         return False
+
+    @property
+    def list_name(self):
+        return self._re_match_field(self._FIELDS_REGEX, group=1, 
+            result_type=str, default='')
+
+    @property
+    def record_type(self):
+        return self._re_match_field(self._FIELDS_REGEX, group=2, 
+            result_type=str, default='')
+
+    @property
+    def group(self):
+        return self._re_match_field(self._FIELDS_REGEX, group=3, 
+            result_type=str, default='')
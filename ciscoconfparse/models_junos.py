@@ -2,8 +2,9 @@ import sys
 import re
 import os
 
-from ccp_abc import BaseCfgLine
+from ccp_abc import BaseCfgLine, _UserAttribute
 from ccp_util import IPv4Obj
+from ccp_regex import register_regex
 
 ### HUGE UGLY WARNING:
 ###   Anything in models_junos.py could change at any time, until I remove this
@@ -71,6 +72,9 @@ class JunosCfgLine(BaseCfgLine):
         - An instance of :class:`~models_junos.JunosCfgLine`.
 
     """
+
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         """Accept an Junos line number and initialize family relationship
         attributes"""
@@ -263,11 +267,13 @@ class JunosCfgLine(BaseCfgLine):
 #    default -> def
 
 class BaseJunosIntfLine(JunosCfgLine):
+    __slots__ = ()
+
+    ifindex = _UserAttribute()    # Optional, for user use
+    default_ipv4_addr_object = IPv4Obj('127.0.0.1/32', strict=False)
+
     def __init__(self, *args, **kwargs):
         super(BaseJunosIntfLine, self).__init__(*args, **kwargs)
-        self.ifindex = None    # Optional, for user use
-        self.default_ipv4_addr_object = IPv4Obj('127.0.0.1/32', 
-            strict=False)
 
     def __repr__(self):
         if not self.is_switchport:
@@ -503,17 +509,21 @@ class BaseJunosIntfLine(JunosCfgLine):
 ##
 
 class JunosIntfGlobal(BaseCfgLine):
+    __slots__ = ()
+    feature = 'interface global'
+
     def __init__(self, *args, **kwargs):
         super(JunosIntfGlobal, self).__init__(*args, **kwargs)
-        self.feature = 'interface global'
 
     def __repr__(self):
         return "<%s # %s '%s'>" % (self.classname, self.linenum, 
             self.text)
 
+    _OBJECT_FOR_REGEX = register_regex('^(no\s+cdp\s+run)|(logging\s+event\s+link-status\s+global)|(spanning-tree\sportfast\sdefault)|(spanning-tree\sportfast\sbpduguard\sdefault)')
+
     @classmethod
     def is_object_for(cls, line="", re=re):
-        if re.search('^(no\s+cdp\s+run)|(logging\s+event\s+link-status\s+global)|(spanning-tree\sportfast\sdefault)|(spanning-tree\sportfast\sbpduguard\sdefault)', line):
+        if cls._OBJECT_FOR_REGEX.search(line):
             return True
         return False
 
@@ -553,17 +563,21 @@ class JunosIntfGlobal(BaseCfgLine):
 ##
 
 class JunosHostnameLine(BaseCfgLine):
+    __slots__ = ()
+    feature = 'hostname'
+
     def __init__(self, *args, **kwargs):
         super(JunosHostnameLine, self).__init__(*args, **kwargs)
-        self.feature = 'hostname'
 
     def __repr__(self):
         return "<%s # %s '%s'>" % (self.classname, self.linenum, 
             self.hostname)
 
+    _OBJECT_FOR_REGEX = register_regex('^hostname')
+
     @classmethod
     def is_object_for(cls, line="", re=re):
-        if re.search('^hostname', line):
+        if cls._OBJECT_FOR_REGEX.search(line):
             return True
         return False
 
@@ -579,6 +593,8 @@ class JunosHostnameLine(BaseCfgLine):
 ##
 
 class BaseJunosRouteLine(BaseCfgLine):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super(BaseJunosRouteLine, self).__init__(*args, **kwargs)
 
@@ -631,19 +647,26 @@ class BaseJunosRouteLine(BaseCfgLine):
 ##
 
 class JunosRouteLine(BaseJunosRouteLine):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super(JunosRouteLine, self).__init__(*args, **kwargs)
-        if 'ipv6' in self.text:
-            self.feature = 'ipv6 route'
-        else:
-            self.feature = 'ip route'
+
+    _OBJECT_FOR_REGEX = register_regex('^(ip|ipv6)\s+route\s+\S')
 
     @classmethod
     def is_object_for(cls, line="", re=re):
-        if re.search('^(ip|ipv6)\s+route\s+\S', line):
+        if cls._OBJECT_FOR_REGEX.search(line):
             return True
         return False
 
+    @property
+    def feature(self):
+        if 'ipv6' in self.text:
+            return 'ipv6 route'
+        else:
+            return 'ip route'
+
     @property
     def vrf(self):
         retval = self.re_match_typed(r'^(ip|ipv6)\s+route\s+(vrf\s+)*(\S+)',
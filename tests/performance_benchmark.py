@@ -0,0 +1,633 @@
+#!/usr/bin/env python
+
+from timeit import default_timer
+import tempfile
+import shutil
+import multiprocessing
+import gc
+import sys
+import re
+import os
+THIS_DIR = os.path.dirname(__file__)
+sys.path.insert(0, os.path.join(os.path.abspath(THIS_DIR), "../ciscoconfparse/"))
+
+
+# IGNORE PyFlake's barking here
+from ciscoconfparse import CiscoConfParse, _LINE_CLASSES, parse_many, ANY
+from ccp_cache import ParseCache
+from ccp_regex import REGEX_CACHE
+
+SAMPLE_05 = os.path.join(os.path.abspath(THIS_DIR), "../configs/sample_05.ios")
+SAMPLE_06 = os.path.join(os.path.abspath(THIS_DIR), "../configs/sample_06.ios")
+SAMPLE_ASA = os.path.join(os.path.abspath(THIS_DIR), "../configs/sample_01.asa")
+
+def read_config(filename):
+    fh = open(filename)
+    retval = fh.read().splitlines()
+    fh.close()
+    return retval
+
+def best_of(func, repeat=3):
+    """Return the fastest wall-clock time of ``repeat`` calls to func()"""
+    retval = None
+    for ii in range(0, repeat):
+        start = default_timer()
+        func()
+        elapsed = default_timer() - start
+        if (retval is None) or (elapsed < retval):
+            retval = elapsed
+    return retval
+
+def bench_scaling(config, syntax='ios', factory=False, multiples=(1, 2, 4, 8)):
+    """Parse 1x, 2x, 4x... copies of config; usec/line should stay flat"""
+    print("{0:>8} {1:>10} {2:>10} {3:>10}".format('copies', 'lines',
+        'seconds', 'usec/line'))
+    for multiple in multiples:
+        text = config * multiple
+        elapsed = best_of(lambda: CiscoConfParse(text, syntax=syntax,
+            factory=factory))
+        print("{0:>8} {1:>10} {2:>10.3f} {3:>10.2f}".format(multiple,
+            len(text), elapsed, elapsed * 1000000.0 / len(text)))
+
+class DictCfgLine(object):
+    """Per-instance layout of BaseCfgLine before it used __slots__"""
+    def __init__(self, obj):
+        self.comment_delimiter = obj.comment_delimiter
+        self.text = obj.text
+        self.linenum = obj.linenum
+        self.parent = obj.parent
+        self.child_indent = obj.child_indent
+        self.is_comment = obj.is_comment
+        self.children = obj.children
+        self.oldest_ancestor = obj.oldest_ancestor
+        self.indent = obj.indent
+        self.confobj = obj.confobj
+        self.feature = obj.feature
+        self.feature_param1 = obj.feature_param1
+        self.feature_param2 = obj.feature_param2
+        for ref in gc.get_referents(obj):
+            if isinstance(ref, dict):
+                self.__dict__.update(ref)
+
+def line_bytes(obj):
+    """Bytes held by obj, its instance __dict__ (if any) and children list"""
+    retval = sys.getsizeof(obj) + sys.getsizeof(obj.children)
+    ## Don't touch obj.__dict__ directly; that would build an empty one
+    for ref in gc.get_referents(obj):
+        if isinstance(ref, dict):
+            retval += sys.getsizeof(ref)
+    return retval
+
+def bench_memory(config, syntax='ios'):
+    """Compare bytes/line of slotted line objects to the old dict layout"""
+    print("{0:>8} {1:>10} {2:>14} {3:>14}".format('factory', 'lines',
+        'dict bytes/ln', 'slot bytes/ln'))
+    for factory in (False, True):
+        objs = CiscoConfParse(config, syntax=syntax, factory=factory).ConfigObjs
+        before = sum([line_bytes(DictCfgLine(obj)) for obj in objs])
+        after = sum([line_bytes(obj) for obj in objs])
+        print("{0:>8} {1:>10} {2:>14.1f} {3:>14.1f}".format(str(factory),
+            len(objs), float(before) / len(objs), float(after) / len(objs)))
+
+def bench_columnar(config, syntax='ios'):
+    """Time a parse plus a few text queries with and without columnar=True"""
+    def parse_and_query(columnar):
+        parse = CiscoConfParse(config, syntax=syntax, columnar=columnar)
+        parse.find_lines(r'^interface')
+        parse.find_objects(r'^interface\sVlan\s10\d\b')
+        parse.find_children(r'^interface\sGigabitEthernet\s1/1\b')
+        return parse
+    print("{0:>8} {1:>10} {2:>10}".format('columnar', 'seconds', 'objects'))
+    for columnar in (False, True):
+        elapsed = best_of(lambda: parse_and_query(columnar))
+        objs = parse_and_query(columnar).ConfigObjs._list
+        built = len([obj for obj in getattr(objs, '_objs', objs) if obj])
+        print("{0:>8} {1:>10.3f} {2:>10}".format(str(columnar), elapsed,
+            built))
+
+def bench_factory(config, syntax='ios'):
+    """Compare is_object_for() calls and time per line, linear scan vs trie"""
+    dispatch = _LINE_CLASSES[syntax]
+    def linear(line):
+        for cls in dispatch.classes:
+            if cls.is_object_for(line):
+                return cls
+        return dispatch.default
+    print("{0:>8} {1:>10} {2:>10} {3:>10}".format('method', 'calls/ln',
+        'seconds', 'usec/line'))
+    calls = len(dispatch.classes) * len(config)
+    elapsed = best_of(lambda: [linear(line) for line in config])
+    print("{0:>8} {1:>10.2f} {2:>10.3f} {3:>10.2f}".format('linear',
+        float(calls) / len(config), elapsed, elapsed * 1000000.0 / len(config)))
+    calls = sum([len(dispatch.candidates(line)) for line in config])
+    elapsed = best_of(lambda: [dispatch.classify(line) for line in config])
+    print("{0:>8} {1:>10.2f} {2:>10.3f} {3:>10.2f}".format('trie',
+        float(calls) / len(config), elapsed, elapsed * 1000000.0 / len(config)))
+
+def bench_lazy_factory(config, syntax='ios'):
+    """Time a factory parse plus a query of a few interfaces, eager vs lazy"""
+    def parse_and_query(factory):
+        parse = CiscoConfParse(config, syntax=syntax, factory=factory)
+        for obj in parse.find_objects(r'^interface\sVlan\s10\d\b'):
+            obj.ipv4_addr
+        return parse
+    print("{0:>8} {1:>10} {2:>10}".format('factory', 'seconds', 'promoted'))
+    for factory in (True, 'lazy'):
+        elapsed = best_of(lambda: parse_and_query(factory))
+        objs = parse_and_query(factory).ConfigObjs
+        promoted = len([obj for obj in objs._list
+            if not type(obj).__name__.startswith('_Lazy')])
+        print("{0:>8} {1:>10.3f} {2:>10}".format(str(factory), elapsed,
+            promoted))
+
+def bench_cache(config, syntax='ios'):
+    """Time a parse without the cache, and a warm parse from the cache"""
+    cache_dir = tempfile.mkdtemp()
+    print("{0:>8} {1:>10} {2:>10}".format('factory', 'no cache', 'warm'))
+    try:
+        for factory in (False, True, 'lazy'):
+            cache = ParseCache(cache_dir)
+            cold = best_of(lambda: CiscoConfParse(config, syntax=syntax,
+                factory=factory))
+            CiscoConfParse(config, syntax=syntax, factory=factory,
+                cache_dir=cache)
+            warm = best_of(lambda: CiscoConfParse(config, syntax=syntax,
+                factory=factory, cache_dir=cache))
+            print("{0:>8} {1:>10.3f} {2:>10.3f}".format(str(factory), cold,
+                warm))
+    finally:
+        shutil.rmtree(cache_dir)
+
+def bench_parse_many(path, copies=8, factory=False):
+    """Parse copies of one file with parse_many(), serially and in parallel"""
+    print("{0:>8} {1:>10} {2:>12}".format('workers', 'seconds',
+        'worker secs'))
+    for workers in (1, multiprocessing.cpu_count()):
+        start = default_timer()
+        results = list(parse_many([path] * copies, factory=factory,
+            workers=workers))
+        elapsed = default_timer() - start
+        print("{0:>8} {1:>10.3f} {2:>12.3f}".format(workers, elapsed,
+            sum([result.elapsed for result in results])))
+
+def bench_relink(config, syntax='ios', edits=50):
+    """Change interface text and commit() after each change, relinking the
+    changed families vs reparsing the whole config"""
+    def edit_and_commit(relink):
+        parse = CiscoConfParse(config, syntax=syntax, factory=True)
+        start = default_timer()
+        for obj in parse.find_objects(r'^interface')[:edits]:
+            obj.text = obj.text + ' '
+            if relink:
+                parse.commit()
+            else:
+                parse.ConfigObjs._bootstrap_from_text()
+        return default_timer() - start
+    print("{0:>8} {1:>10} {2:>10} {3:>12}".format('method', 'edits',
+        'seconds', 'msec/commit'))
+    for relink in (False, True):
+        elapsed = edit_and_commit(relink)
+        print("{0:>8} {1:>10} {2:>10.3f} {3:>12.3f}".format(
+            relink and 'relink' or 'reparse', edits, elapsed, 
+            elapsed * 1000.0 / edits))
+
+def bench_commit(config, syntax='ios', multiples=(1, 4, 16), edits=50):
+    """Insert and delete one line and commit(), 50 times, in 1x, 4x and 16x 
+    copies of config; after the first edit indexes the lines, usec/commit 
+    should stay flat"""
+    print("{0:>8} {1:>10} {2:>10} {3:>12}".format('copies', 'lines',
+        'seconds', 'usec/commit'))
+    for multiple in multiples:
+        text = config * multiple
+        parse = CiscoConfParse(text, syntax=syntax)
+        intfs = parse.find_objects(r'^interface')
+        intfs = intfs[::max(len(intfs) // edits, 1)][:edits]
+        parse.ConfigObjs[-1].delete()
+        start = default_timer()
+        for obj in intfs:
+            obj.append_to_family(' carrier-delay msec 500')
+            obj.children[0].delete()
+            parse.commit()
+        elapsed = default_timer() - start
+        print("{0:>8} {1:>10} {2:>10.3f} {3:>12.1f}".format(multiple,
+            len(text), elapsed, elapsed * 1000000.0 / len(intfs)))
+
+def bench_batch(config, syntax='ios', multiples=(1, 2, 4)):
+    """Add a line to every interface in 1x, 2x and 4x copies of config, with
+    and without parse.batch(); usec/intf should stay flat inside a batch"""
+    def add_lines(text, batch):
+        parse = CiscoConfParse(text, syntax=syntax)
+        intfs = parse.find_objects(r'^interface')
+        start = default_timer()
+        if batch:
+            with parse.batch():
+                for obj in intfs:
+                    obj.append_to_family(' carrier-delay msec 500')
+        else:
+            for obj in intfs:
+                obj.append_to_family(' carrier-delay msec 500')
+            parse.commit()
+        return len(intfs), default_timer() - start
+    print("{0:>8} {1:>10} {2:>10} {3:>10}".format('batch', 'intfs',
+        'seconds', 'usec/intf'))
+    for multiple in multiples:
+        for batch in (False, True):
+            intfs, elapsed = add_lines(config * multiple, batch)
+            print("{0:>8} {1:>10} {2:>10.3f} {3:>10.1f}".format(str(batch),
+                intfs, elapsed, elapsed * 1000000.0 / intfs))
+
+def bench_delete(config, linespec, syntax='ios'):
+    """Delete the lines matching linespec one at a time, and with
+    delete_lines()"""
+    def delete(bulk):
+        parse = CiscoConfParse(config, syntax=syntax)
+        start = default_timer()
+        if bulk:
+            count = len(parse.delete_lines(linespec))
+        else:
+            objs = parse.find_objects(linespec)
+            for obj in objs:
+                del parse.ConfigObjs[obj.linenum]
+            count = len(objs)
+        return count, default_timer() - start
+    print("{0:>8} {1:>10} {2:>10}".format('method', 'deleted', 'seconds'))
+    for bulk in (False, True):
+        count, elapsed = delete(bulk)
+        print("{0:>8} {1:>10} {2:>10.3f}".format(bulk and 'bulk' or 'each',
+            count, elapsed))
+
+def junos_config(intfs=4000):
+    """Return a synthetic Junos config with ``intfs`` interfaces"""
+    retval = ['## Last commit: 2015-06-28 13:00:59 CST by mpenning',
+        'system {', '    host-name TEST01_EX;', '    login {',
+        '        message "Unauthorized access is prohibited";', '    }', '}',
+        'interfaces {']
+    for idx in range(0, intfs):
+        retval.extend([
+            '    ge-{0}/0/{1} {{'.format(idx // 48, idx % 48),
+            '        description "uplink {0}";'.format(idx),
+            '        unit 0 {',
+            '            family inet {',
+            '                address 10.{0}.{1}.1/24;'.format(idx // 256,
+                idx % 256),
+            '            }',
+            '        }',
+            '    }'])
+    retval.extend(['}', 'protocols {', '    lldp {', '        interface all;',
+        '    }', '}'])
+    return retval
+
+def qos_config(policies=200, classes=20):
+    """Return a synthetic IOS config with deep policy-map / class trees"""
+    retval = list()
+    for idx in range(0, policies):
+        retval.append('policy-map POLICY_{0}'.format(idx))
+        for cidx in range(0, classes):
+            retval.extend([
+                ' class CLASS_{0}'.format(cidx),
+                '  police cir {0}000'.format(cidx + 1),
+                '   conform-action transmit',
+                '   exceed-action set-dscp-transmit af11',
+                '    violate-action drop',
+                '  set dscp af{0}1'.format(cidx % 4 + 1)])
+        retval.append('!')
+    return retval
+
+def regex_braces_to_ios(input_list, comment_delimiter='#', stop_width=4):
+    """The regex conversion of a Junos config to IOS-style text, which was
+    then reparsed by indent, before Junos configs were tokenized"""
+    JUNOS_RE_STR = r"""^
+    (?:\s*
+       (?:(?P<line>[^\{{\}}{0}].*?)(?P<braces_eol>[\{{\}}])*(?P<sc>\;)*\s*)
+      |(?P<braces_alone>[\{{\}}\;])
+      |(?:\s*[{0}](?P<comment>.+))
+    )
+    $
+    """.format(re.escape(comment_delimiter))
+    LINE_RE = re.compile(JUNOS_RE_STR, re.VERBOSE)
+
+    lines = list()
+    offset = 0
+    for tmp in input_list:
+        mm = LINE_RE.search(tmp.strip())
+        if mm is None:
+            continue
+        results = mm.groupdict()
+        term_char = (results['braces_eol'] or results['braces_alone'] or
+            '').strip()
+        if not (results['comment'] is None):
+            line = '!' + results['comment']
+        else:
+            line = results['line']
+        if line:
+            lines.append(" " * stop_width * offset + line)
+        if term_char == '{':
+            offset += 1
+        elif term_char == '}':
+            offset -= 1
+    return lines
+
+def bench_junos(config):
+    """Parse a Junos config by converting it to IOS-style text with a regex 
+    and reparsing that, and by tokenizing its braces"""
+    def regex():
+        return CiscoConfParse(regex_braces_to_ios(config, '#'), 
+            syntax='ios', comment='#')
+    def braces():
+        return CiscoConfParse(config, syntax='junos', comment='#')
+    assert regex().ioscfg==braces().ioscfg
+    print("{0:>8} {1:>10} {2:>10} {3:>10}".format('method', 'lines',
+        'seconds', 'usec/line'))
+    for name, func in [('regex', regex), ('braces', braces)]:
+        elapsed = best_of(func)
+        print("{0:>8} {1:>10} {2:>10.3f} {3:>10.2f}".format(name, 
+            len(config), elapsed, elapsed * 1000000.0 / len(config)))
+
+def bench_syntaxes(configs):
+    """Parse each (syntax, config, interface regex) in configs, add a line
+    to every interface in one batch, then delete those lines; every syntax 
+    uses the same config list engine, so usec/line should be similar"""
+    print("{0:>8} {1:>10} {2:>10} {3:>10} {4:>10} {5:>10}".format('syntax',
+        'lines', 'parse', 'usec/line', 'insert', 'delete'))
+    for syntax, config, intf_rgx in configs:
+        parse_time = best_of(lambda: CiscoConfParse(config, syntax=syntax,
+            comment='!#'))
+        parse = CiscoConfParse(config, syntax=syntax, comment='!#')
+        start = default_timer()
+        with parse.batch():
+            for obj in parse.find_objects(intf_rgx):
+                obj.append_to_family('carrier-delay msec 500', 
+                    auto_indent=True)
+        insert_time = default_timer() - start
+        start = default_timer()
+        parse.delete_lines(r'carrier-delay\smsec\s500')
+        delete_time = default_timer() - start
+        print("{0:>8} {1:>10} {2:>10.3f} {3:>10.2f} {4:>10.3f} {5:>10.3f}".format(
+            syntax, len(config), parse_time, parse_time * 1000000.0 / 
+            len(config), insert_time, delete_time))
+
+def bench_regex(config, patterns=600):
+    """Call re_search() on every interface with more distinct patterns than
+    python's re module caches, with a small clearing cache (as re does) and 
+    with the default LRU cache"""
+    parse = CiscoConfParse(config)
+    intfs = parse.find_objects(r'^interface')
+    specs = [r'^interface\s+\S+\s{0}/{1}$'.format(ii // 48, ii % 48) 
+        for ii in range(patterns)]
+    def query():
+        count = 0
+        for obj in intfs:
+            for spec in specs:
+                if obj.re_search(spec):
+                    count += 1
+        return count
+    orig = (REGEX_CACHE.max_size, REGEX_CACHE.policy)
+    print("{0:>8} {1:>10} {2:>10} {3:>10} {4:>10}".format('policy', 
+        'max_size', 'seconds', 'hits', 'misses'))
+    try:
+        for policy, max_size in [('clear', 100), ('lru', 2048)]:
+            REGEX_CACHE.policy, REGEX_CACHE.max_size = policy, max_size
+            REGEX_CACHE.clear()
+            start = default_timer()
+            query()
+            elapsed = default_timer() - start
+            print("{0:>8} {1:>10} {2:>10.3f} {3:>10} {4:>10}".format(policy,
+                max_size, elapsed, REGEX_CACHE.hits, REGEX_CACHE.misses))
+    finally:
+        REGEX_CACHE.max_size, REGEX_CACHE.policy = orig
+        REGEX_CACHE.clear()
+
+def bench_index(config, rounds=20):
+    """Run anchored find_objects() queries, with every line scanned and with
+    the first-word index"""
+    specs = [r'^interface', r'^router\sbgp', r'^ip\saccess-list', 
+        r'^\s+ip\saddress', r'^(ip|ipv6)\s+route', r'^hostname']
+    def query(parse):
+        count = 0
+        for ii in range(rounds):
+            for spec in specs:
+                count += len(parse.find_objects(spec))
+        return count
+    print("{0:>8} {1:>10} {2:>10} {3:>10}".format('method', 'queries', 
+        'matches', 'seconds'))
+    for method in ('scan', 'index'):
+        parse = CiscoConfParse(config, query_cache_size=0)
+        if method=='scan':
+            parse.ConfigObjs._candidate_lines = lambda regex: None
+        start = default_timer()
+        count = query(parse)
+        elapsed = default_timer() - start
+        print("{0:>8} {1:>10} {2:>10} {3:>10.3f}".format(method, 
+            rounds * len(specs), count, elapsed))
+
+def bench_multi(config, patterns=100):
+    """Run an audit of anchored and unanchored linespecs, with one 
+    find_objects() call per linespec and with one find_objects_multi()"""
+    specs = dict()
+    for ii in range(patterns // 2):
+        specs['intf{0}'.format(ii)] = r'^interface\s+\S+\s{0}/{1}$'.format(
+            ii // 48 + 1, ii % 48 + 1)
+        specs['audit{0}'.format(ii)] = r'(storm-control|spanning-tree)\s\S+\s{0}$'.format(ii)
+    print("{0:>8} {1:>10} {2:>10} {3:>10}".format('method', 'linespecs', 
+        'matches', 'seconds'))
+    for method in ('each', 'multi'):
+        parse = CiscoConfParse(config)
+        start = default_timer()
+        if method=='each':
+            found = dict([(name, parse.find_objects(spec)) for name, spec in 
+                specs.items()])
+        else:
+            found = parse.find_objects_multi(specs)
+        elapsed = default_timer() - start
+        print("{0:>8} {1:>10} {2:>10} {3:>10.3f}".format(method, len(specs),
+            sum([len(objs) for objs in found.values()]), elapsed))
+
+def bench_planner(config, rounds=5):
+    """Run the parent / child family of queries, always starting from the
+    parents (or from the children, for find_children_w_parents()) and with
+    the side chosen by the query planner"""
+    def query(parse):
+        count = 0
+        for ii in range(rounds):
+            count += len(parse.find_objects_w_child(r'^interface', 
+                r'^\s+spanning-tree\sguard'))
+            count += len(parse.find_objects_wo_child(r'^interface', 
+                r'^\s+spanning-tree\sguard'))
+            count += len(parse.find_objects_w_all_children(r'^interface', 
+                [r'^\s+switchport\snonnegotiate', r'^\s+spanning-tree\sguard']))
+            count += len(parse.find_children_w_parents(
+                r'^interface\sGigabitEthernet\s1/1$', r'^\s+switchport'))
+        return count
+    print("{0:>8} {1:>10} {2:>10} {3:>10}".format('method', 'queries', 
+        'matches', 'seconds'))
+    for method in ('fixed', 'planner'):
+        parse = CiscoConfParse(config, query_cache_size=0)
+        if method=='fixed':
+            parse.ConfigObjs._estimate_lines = lambda regex: len(config)
+        start = default_timer()
+        count = query(parse)
+        elapsed = default_timer() - start
+        print("{0:>8} {1:>10} {2:>10} {3:>10.3f}".format(method, 
+            rounds * 4, count, elapsed))
+
+def bench_subtrees(config):
+    """Read the lineage of every line and find_all_children() of every 
+    policy-map, walking the child links and with subtree slices"""
+    def query(parse):
+        count = 0
+        for obj in parse.ConfigObjs:
+            count += len(obj.lineage)
+        count += len(parse.find_all_children(r'^policy-map'))
+        return count
+    print("{0:>8} {1:>10} {2:>10} {3:>10}".format('method', 'lines', 
+        'results', 'seconds'))
+    for method in ('links', 'slices'):
+        parse = CiscoConfParse(config)
+        if method=='links':
+            parse.ConfigObjs._hand_linked = True
+        start = default_timer()
+        count = query(parse)
+        elapsed = default_timer() - start
+        print("{0:>8} {1:>10} {2:>10} {3:>10.3f}".format(method, 
+            len(config), count, elapsed))
+
+def bench_first(config, rounds=200):
+    """Look for the first vlan, vlan name and interface, by taking the first 
+    find_objects() result and with first_object()"""
+    specs = [r'^vlan\s', r'^\s+name', r'^interface\s']
+    print("{0:>8} {1:>10} {2:>10}".format('method', 'queries', 'seconds'))
+    for method in ('find', 'first'):
+        parse = CiscoConfParse(config, query_cache_size=0)
+        start = default_timer()
+        for ii in range(rounds):
+            for spec in specs:
+                if method=='find':
+                    parse.find_objects(spec)[0]
+                else:
+                    parse.first_object(spec)
+        elapsed = default_timer() - start
+        print("{0:>8} {1:>10} {2:>10.3f}".format(method, 
+            rounds * len(specs), elapsed))
+
+def bench_blob(config, rounds=20):
+    """Run unanchored find_objects() queries, with a search of each line 
+    and with one search of the text blob"""
+    specs = [r'storm-control\s+broadcast', r'spanning-tree\s+portfast', 
+        r'description\s.*uplink', r'255\.255\.255\.25[25]', r'shutdown$',
+        r'vlan\s+\d+']
+    print("{0:>8} {1:>10} {2:>10} {3:>10}".format('method', 'queries', 
+        'matches', 'seconds'))
+    for method in ('lines', 'blob'):
+        parse = CiscoConfParse(config, query_cache_size=0)
+        if method=='lines':
+            parse.ConfigObjs._search_blob = lambda regex: None
+        start = default_timer()
+        count = 0
+        for ii in range(rounds):
+            for spec in specs:
+                count += len(parse.find_objects(spec))
+        elapsed = default_timer() - start
+        print("{0:>8} {1:>10} {2:>10} {3:>10.3f}".format(method, 
+            rounds * len(specs), count, elapsed))
+
+def bench_memo(config, rounds=40):
+    """Ask the same parent / child questions over and over, as a report 
+    generator does, without and with the query cache"""
+    questions = [('find_objects_w_child', (r'^interface', r'switchport')),
+        ('find_objects_wo_child', (r'^interface', r'shutdown')),
+        ('find_children', (r'^interface\s+\S+3/',)),
+        ('find_objects', (r'spanning-tree\s+portfast',)),
+        ('find_lines', (r'^vlan',))]
+    print("{0:>8} {1:>10} {2:>10} {3:>10}".format('method', 'queries', 
+        'hits', 'seconds'))
+    for method in ('scan', 'memo'):
+        if method=='scan':
+            parse = CiscoConfParse(config, query_cache_size=0)
+        else:
+            parse = CiscoConfParse(config, query_cache_size=128)
+        start = default_timer()
+        for ii in range(rounds):
+            for name, args in questions:
+                getattr(parse, name)(*args)
+        elapsed = default_timer() - start
+        hits = parse.query_cache and parse.query_cache.hits or 0
+        print("{0:>8} {1:>10} {2:>10} {3:>10.3f}".format(method, 
+            rounds * len(questions), hits, elapsed))
+
+def bench_tokens(config, rounds=20):
+    """Run word-positional queries as regexes on every line, as regexes 
+    with the first-word index, and as token patterns"""
+    questions = [(r'^interface\s+\S+', ('interface', ANY)),
+        (r'^\s+ip\s+address\s+\S+\s+\S+', ('ip', 'address', ANY, ANY)),
+        (r'^\s+switchport\s+access\s+vlan\s+\S+', 
+            ('switchport', 'access', 'vlan', ANY)),
+        (r'^\s*\S+\s+portfast', (ANY, 'portfast'))]
+    print("{0:>8} {1:>10} {2:>10} {3:>10}".format('method', 'queries', 
+        'matches', 'seconds'))
+    for method in ('scan', 'regex', 'tokens'):
+        parse = CiscoConfParse(config, query_cache_size=0)
+        if method=='scan':
+            parse.ConfigObjs._candidate_lines = lambda regex: None
+        start = default_timer()
+        count = 0
+        for ii in range(rounds):
+            for linespec, tokens in questions:
+                if method=='tokens':
+                    count += len(parse.find_objects_tokens(tokens))
+                else:
+                    count += len(parse.find_objects(linespec))
+        elapsed = default_timer() - start
+        print("{0:>8} {1:>10} {2:>10} {3:>10.3f}".format(method, 
+            rounds * len(questions), count, elapsed))
+
+if sys.argv[1]=="scaling":
+    bench_scaling(read_config(SAMPLE_06))
+elif sys.argv[1]=="scaling-factory":
+    bench_scaling(read_config(SAMPLE_06), factory=True)
+elif sys.argv[1]=="memory":
+    bench_memory(read_config(SAMPLE_06))
+elif sys.argv[1]=="columnar":
+    bench_columnar(read_config(SAMPLE_06))
+elif sys.argv[1]=="factory":
+    bench_factory(read_config(SAMPLE_06))
+elif sys.argv[1]=="lazy-factory":
+    bench_lazy_factory(read_config(SAMPLE_06))
+elif sys.argv[1]=="cache":
+    bench_cache(read_config(SAMPLE_06))
+elif sys.argv[1]=="parse-many":
+    bench_parse_many(SAMPLE_06)
+elif sys.argv[1]=="relink":
+    bench_relink(read_config(SAMPLE_06))
+elif sys.argv[1]=="batch":
+    bench_batch(read_config(SAMPLE_06)[12285:17285])
+elif sys.argv[1]=="junos":
+    bench_junos(junos_config())
+elif sys.argv[1]=="syntaxes":
+    bench_syntaxes([('ios', read_config(SAMPLE_06), r'^interface'),
+        ('asa', read_config(SAMPLE_ASA) * 96, r'^interface'),
+        ('junos', junos_config(), r'^\s+ge-')])
+elif sys.argv[1]=="commit":
+    bench_commit(read_config(SAMPLE_06))
+elif sys.argv[1]=="tokens":
+    bench_tokens(read_config(SAMPLE_06))
+elif sys.argv[1]=="memo":
+    bench_memo(read_config(SAMPLE_06))
+elif sys.argv[1]=="blob":
+    bench_blob(read_config(SAMPLE_06))
+elif sys.argv[1]=="subtrees":
+    bench_subtrees(qos_config())
+elif sys.argv[1]=="planner":
+    bench_planner(read_config(SAMPLE_06))
+elif sys.argv[1]=="first":
+    bench_first(read_config(SAMPLE_06))
+elif sys.argv[1]=="multi":
+    bench_multi(read_config(SAMPLE_06))
+elif sys.argv[1]=="index":
+    bench_index(read_config(SAMPLE_06))
+elif sys.argv[1]=="regex":
+    bench_regex(read_config(SAMPLE_06)[12285:13285])
+elif sys.argv[1]=="delete":
+    bench_delete(read_config(SAMPLE_05),
+        r'^\s+permit\sudp\sany\shost\s192\.0\.2\.1\d\d$')
+else:
+    raise ValueError
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+
+import sys
+import os
+THIS_DIR = os.path.dirname(__file__)
+sys.path.insert(0, os.path.join(os.path.abspath(THIS_DIR), "../ciscoconfparse/"))
+
+from ccp_cache import ParseCache, QueryCache
+from ciscoconfparse import CiscoConfParse
+import pytest
+
+
+def family(obj):
+    return (obj.__class__, obj.text, obj.linenum, obj.parent.linenum,
+        [ii.linenum for ii in obj.children], obj.indent, obj.child_indent,
+        obj.is_comment, obj.oldest_ancestor, obj.comment_delimiter,
+        obj.feature)
+
+@pytest.mark.parametrize("syntax, filename, factory", [
+    ('ios', 'sample_01.ios', False),
+    ('ios', 'sample_01.ios', True),
+    ('ios', 'sample_02.ios', 'lazy'),
+    ('asa', 'sample_01.asa', True),
+    ('junos', 'sample_01.junos', False),
+    ])
+def testParseCache_roundtrip(tmpdir, syntax, filename, factory):
+    cache = ParseCache(str(tmpdir))
+    config = os.path.join(THIS_DIR, '../configs', filename)
+    fresh = CiscoConfParse(config, syntax=syntax, factory=factory,
+        cache_dir=cache)
+    assert (cache.hits, cache.misses)==(0, 1)
+    cached = CiscoConfParse(config, syntax=syntax, factory=factory,
+        cache_dir=cache)
+    assert (cache.hits, cache.misses)==(1, 1)
+
+    assert len(cached.ConfigObjs)==len(fresh.ConfigObjs)
+    for obj_f, obj_c in zip(fresh.ConfigObjs, cached.ConfigObjs):
+        assert family(obj_c)==family(obj_f)
+        assert obj_c.confobj is cached.ConfigObjs
+
+def testParseCache_options(tmpdir):
+    # Each parse option and any config change needs its own entry
+    config = ['interface Serial1/0', ' ip address 1.1.1.1 255.255.255.252']
+    cache = ParseCache(str(tmpdir))
+    CiscoConfParse(config, cache_dir=cache)
+    CiscoConfParse(config, factory=True, cache_dir=cache)
+    CiscoConfParse(config, comment='#', cache_dir=cache)
+    CiscoConfParse(config + [' shutdown'], cache_dir=cache)
+    assert (cache.hits, cache.misses)==(0, 4)
+
+    parse = CiscoConfParse(config, factory=True, cache_dir=str(tmpdir))
+    assert parse.ConfigObjs.cache.hits==1
+    assert parse.ConfigObjs[0].name=='Serial1/0'
+
+def testParseCache_key(tmpdir):
+    # Line boundaries are part of the key
+    cache = ParseCache(str(tmpdir))
+    assert cache.key(['a\nb', 'c'])!=cache.key(['a', 'b\nc'])
+    assert cache.key(['a\nb'])!=cache.key(['a', 'b'])
+    assert cache.key(['a', 'b'])==cache.key(['a', 'b'])
+
+def testParseCache_version(tmpdir):
+    # An entry written by another version is never trusted
+    cache = ParseCache(str(tmpdir))
+    cache.store('abc', {'foo': 1})
+    assert cache.load('abc')=={'foo': 1}
+
+    import ccp_cache
+    orig_version = ccp_cache.__version__
+    ccp_cache.__version__ = '0.0.0'
+    try:
+        assert cache.load('abc') is None
+    finally:
+        ccp_cache.__version__ = orig_version
+    assert not os.path.exists(cache.path('abc'))
+
+def testParseCache_corrupt(tmpdir):
+    cache = ParseCache(str(tmpdir))
+    fh = open(cache.path('abc'), 'wb')
+    fh.write(b'garbage')
+    fh.close()
+    assert cache.load('abc') is None
+    assert not os.path.exists(cache.path('abc'))
+
+def testParseCache_lru(tmpdir):
+    cache = ParseCache(str(tmpdir), max_bytes=10000000)
+    for key, mtime in [('one', 1000), ('two', 2000), ('three', 3000)]:
+        cache.store(key, 'x' * 1000)
+        os.utime(cache.path(key), (mtime, mtime))
+    cache.load('one')    # Now the most-recently used
+
+    cache.max_bytes = 2 * os.path.getsize(cache.path('two'))
+    cache.evict()
+    assert cache.load('two') is None
+    assert cache.load('one')==('x' * 1000)
+    assert cache.load('three')==('x' * 1000)
+
+def testParseCache_running_total(tmpdir):
+    # store() only scans cache_dir when the total is unknown or too big
+    cache = ParseCache(str(tmpdir), max_bytes=10000000)
+    scans = list()
+    orig_evict = cache.evict
+    def evict():
+        scans.append(True)
+        orig_evict()
+    cache.evict = evict
+
+    for key in ['one', 'two', 'three', 'two']:
+        cache.store(key, 'x' * 1000)
+    assert len(scans)==1
+    assert cache._total==sum([os.path.getsize(cache.path(key)) 
+        for key in ['one', 'two', 'three']])
+
+    cache.max_bytes = cache._total
+    cache.store('four', 'x' * 1000)
+    assert len(scans)==2
+    assert cache.load('one') is None
+    assert cache.load('four')==('x' * 1000)
+
+def testQueryCache_lru():
+    cache = QueryCache(max_size=4)
+    for key in ['one', 'two', 'three', 'four']:
+        cache.store(key, [key])
+    assert cache.get('one')==['one']    # Now the most-recently used
+    cache.store('five', ['five'])
+    assert len(cache)==4
+    assert cache.get('two') is None
+    assert cache.get('one')==['one']
+    assert cache.stats()==dict(hits=2, misses=1, evictions=1, size=4,
+        max_size=4)
+
+def testQueryCache_generation():
+    config = ['interface Serial1/0', ' ip address 1.1.1.1 255.255.255.252',
+        'interface Serial1/1', ' shutdown']
+    parse = CiscoConfParse(config, query_cache_size=128)
+    found = parse.find_objects_w_child(r'^interface', r'shutdown')
+    found.append(None)    # Callers get their own copy
+    assert parse.find_objects_w_child(r'^interface', r'shutdown')==[
+        parse.ConfigObjs[2]]
+    assert (parse.query_cache.hits, parse.query_cache.misses)==(1, 1)
+
+    ## Each change starts a new generation, and the query runs again
+    generation = parse.generation
+    parse.ConfigObjs[0].append_to_family(' shutdown')
+    parse.commit()
+    assert parse.generation > generation
+    assert [obj.linenum for obj in parse.find_objects_w_child(r'^interface',
+        r'shutdown')]==[0, 3]
+    assert parse.query_cache.misses==2
+
+    parse = CiscoConfParse(config, query_cache_size=0)
+    assert parse.query_cache is None
+    assert parse.find_lines(r'^interface')==['interface Serial1/0',
+        'interface Serial1/1']
+
+def testQueryCache_links_edited():
+    # The query cache is off by default, so moving a child by editing 
+    #     parent and children is seen by the next query
+    parse = CiscoConfParse(['interface A', ' shutdown', 'interface B'])
+    assert parse.query_cache is None
+    assert parse.find_parents_w_child('^interface', 'shutdown')==[
+        'interface A']
+    intf_a, shutdown, intf_b = parse.ConfigObjs
+    intf_a.children.remove(shutdown)
+    intf_b.children.append(shutdown)
+    shutdown.parent = intf_b
+    assert parse.find_parents_w_child('^interface', 'shutdown')==[
+        'interface B']
+
+    ## With the query cache on, commit() starts a new generation
+    parse = CiscoConfParse(['interface A', ' shutdown', 'interface B'],
+        query_cache_size=128)
+    assert parse.find_parents_w_child('^interface', 'shutdown')==[
+        'interface A']
+    intf_a, shutdown, intf_b = parse.ConfigObjs
+    intf_a.children.remove(shutdown)
+    intf_b.children.append(shutdown)
+    shutdown.parent = intf_b
+    parse.commit()
+    assert parse.find_parents_w_child('^interface', 'shutdown')==[
+        'interface B']
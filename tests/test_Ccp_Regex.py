@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+
+import sys
+import re
+import os
+THIS_DIR = os.path.dirname(__file__)
+sys.path.insert(0, os.path.join(os.path.abspath(THIS_DIR), "../ciscoconfparse/"))
+
+from ccp_regex import RegexCache, REGEX_CACHE, literal_prefixes
+from ccp_regex import multiline_regex
+from ciscoconfparse import CiscoConfParse, _CONFIG_SYNTAXES
+from models_cisco import IOSIntfLine
+import pytest
+
+
+def testRegexCache_hits():
+    cache = RegexCache()
+    regex = cache.compile(r'^interface\s+(\S+)')
+    assert regex.search('interface Vlan10').group(1)=='Vlan10'
+    assert cache.compile(r'^interface\s+(\S+)') is regex
+    assert (cache.hits, cache.misses)==(1, 1)
+
+    ## Flags and already-compiled patterns
+    assert cache.compile(r'^interface\s+(\S+)', re.I) is not regex
+    assert cache.compile(regex) is regex
+    with pytest.raises(ValueError):
+        cache.compile(regex, re.I)
+    assert cache.stats()['size']==2
+
+@pytest.mark.parametrize("policy, survivors", [
+    ('lru', ['a0', 'a2', 'a3', 'a4']),
+    ('fifo', ['a1', 'a2', 'a3', 'a4']),
+    ('clear', ['a4']),
+    ])
+def testRegexCache_policy(policy, survivors):
+    cache = RegexCache(max_size=4, policy=policy)
+    for pattern in ['a0', 'a1', 'a2', 'a3']:
+        cache.compile(pattern)
+    cache.compile('a0')        # Now the most-recently used
+    cache.compile('a4')
+    assert sorted([key[0] for key in cache._regexes.keys()])==survivors
+    assert cache.evictions==(5 - len(survivors))
+
+def testRegexCache_register():
+    cache = RegexCache(max_size=4, policy='clear')
+    pinned = cache.register(r'^hostname\s+(\S+)')
+    compiled = cache.register(re.compile(r'^line\s+(\S+)'))
+    for ii in range(20):
+        cache.compile('a{0}'.format(ii))
+    assert cache.compile(r'^hostname\s+(\S+)') is pinned
+    assert cache.compile(r'^line\s+(\S+)') is compiled
+    assert cache.compile(compiled) is compiled
+    assert cache.stats()['pinned']==3
+    assert r'^hostname\s+(\S+)' in cache
+
+    cache.clear()
+    assert cache.compile(r'^hostname\s+(\S+)') is pinned
+    with pytest.raises(ValueError):
+        RegexCache(policy='random')
+
+@pytest.mark.parametrize("pattern, result_correct", [
+    (r'^interface', [('interface', False)]),
+    (r'^interface\s+Serial', [('interface', True)]),
+    (r'^ip access-list', [('ip', True)]),
+    (r'^\s+ip\saddress', [('ip', True)]),
+    (r'^hostname$', [('hostname', True)]),
+    (r'^(ip|ipv6)\s+route', [('ip', True), ('ipv6', True)]),
+    (r'^interface|^router', [('interface', False), ('router', False)]),
+    (r'^interfaces?', [('interface', False)]),
+    (r'interface', None),
+    (r'^interface|router', None),
+    (r'^\S+', None),
+    (r'(?i)^interface', None),
+    ])
+def testRegexCache_literal_prefixes(pattern, result_correct):
+    assert literal_prefixes(re.compile(pattern))==result_correct
+
+@pytest.mark.parametrize("pattern, result_correct", [
+    (r'^interface\s+Serial', True),
+    (r'shutdown$', True),
+    (r'(?i)description\s.*uplink', True),
+    (r'shutdown(?!\s)', False),
+    (r'(?<=ip )address', False),
+    (r'\Ahostname', False),
+    (r'(ip|ipv6)\s+route\Z', False),
+    ])
+def testRegexCache_multiline_regex(pattern, result_correct):
+    regex = multiline_regex(re.compile(pattern))
+    assert (regex is not None)==result_correct
+    if result_correct:
+        assert regex.flags & re.MULTILINE
+
+def testRegexCache_shared():
+    ## The models register their regexes when they are imported, and every
+    ## linespec and re_*() call goes through the same cache
+    assert IOSIntfLine._OBJECT_FOR_REGEX.pattern in REGEX_CACHE
+    for regex in _CONFIG_SYNTAXES['asa'].symbols.values():
+        assert regex.pattern in REGEX_CACHE
+        assert REGEX_CACHE.compile(regex.pattern) is regex
+    config = ['interface Serial1/0', ' ip address 1.1.1.1 255.255.255.252']
+    parse = CiscoConfParse(config)
+    spec = r'^interface\s+Serial(\d+)/0$'
+    start = REGEX_CACHE.stats()
+    obj = parse.find_objects(spec)[0]
+    assert obj.re_match_typed(spec, result_type=int)==1
+    assert obj.re_search(spec)==obj.text
+    assert REGEX_CACHE.misses - start['misses'] <= 1
+    assert REGEX_CACHE.hits - start['hits'] >= 2
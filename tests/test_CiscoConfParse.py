@@ -1,9 +1,12 @@
 from operator import attrgetter
 from itertools import repeat
 from copy import deepcopy
+from StringIO import StringIO
+import cPickle as pickle
 from mock import patch
 import platform
 import sys
+import gc
 import re
 import os
 THIS_DIR = os.path.dirname(__file__)
@@ -11,6 +14,10 @@ sys.path.insert(0, os.path.join(os.path.abspath(THIS_DIR), "../ciscoconfparse/")
 
 from ciscoconfparse import CiscoConfParse, IOSCfgLine, IOSIntfLine
 from ciscoconfparse import CiscoPassword
+from ciscoconfparse import register_line_class, _LINE_CLASSES, _LineClassTrie
+from ciscoconfparse import _reinit_line
+from ciscoconfparse import parse_many, ParseResult
+from ciscoconfparse import _ChunkedLines, ANY
 from ccp_util import IPv4Obj
 from passlib.hash import cisco_type7
 import pytest
@@ -142,6 +149,35 @@ def testValues_banner_child_parsing_01(parse_c01):
         test_result = child.parent.linenum
         assert result_correct[child.linenum]==test_result
 
+@pytest.mark.parametrize("columnar", [False, True])
+def testValues_banner_child_parsing_02(columnar):
+    """Banner text is only ever a child of the banner"""
+    CONFIG = ['!', 'banner exec ^C', 'Authorized', ' access', '  only',
+        '^C', ' stray', 'interface Serial1/0', ' shutdown']
+    parse = CiscoConfParse(CONFIG, columnar=columnar)
+    banner_obj = parse.find_objects('^banner')[0]
+    assert banner_obj.oldest_ancestor
+    assert [obj.linenum for obj in banner_obj.children]==[2, 3, 4, 5]
+    assert banner_obj.child_indent==0
+    for obj in banner_obj.children:
+        assert obj.parent is banner_obj
+        assert obj.children==[]
+    # Lines after the closing delimiter are not part of the banner
+    assert parse.ConfigObjs[6].parent is parse.ConfigObjs[6]
+    intf_obj = parse.find_objects('^interface')[0]
+    assert [obj.linenum for obj in intf_obj.children]==[8]
+
+def testValues_banner_child_parsing_03():
+    """CatOS-style banners, and banners ended by a comment"""
+    CONFIG = ['set banner motd ^C', 'Authorized access only', '^C',
+        'set prompt switch', 'banner login ^', 'no delimiter', '!', 'end']
+    parse = CiscoConfParse(CONFIG)
+    set_obj, banner_obj = parse.find_objects('banner')
+    assert set_obj.oldest_ancestor and banner_obj.oldest_ancestor
+    assert [obj.linenum for obj in set_obj.children]==[1, 2]
+    assert [obj.linenum for obj in banner_obj.children]==[5]
+    assert parse.find_objects('^end')[0].parent.linenum==7
+
 def testValues_parent_child_parsing_01(parse_c01):
     parent_intf = {
         # Line 13's parent should be 11, etc...
@@ -220,6 +256,22 @@ def testValues_parent_child_parsing_02(parse_c01):
             assert result_correct==test_result
 
 
+def testValues_parent_child_parsing_03():
+    # Dedents, skipped indent levels and indented comments
+    CONFIG = ['a', ' b', '  c', ' !', '  d', '!', ' e', 'f', '   g', 
+        '  h', ' i', '!', '  j']
+    # Child line number: parent line number; comments after a deeper line 
+    #     are never children (legacy ciscoconfparse behavior)
+    parent_map = {1: 0, 2: 1, 4: 1, 6: 0, 8: 7, 9: 7, 10: 7, 12: 10}
+    parse = CiscoConfParse(CONFIG)
+    for obj in parse.ConfigObjs:
+        if obj.linenum in parent_map:
+            assert obj.parent.linenum==parent_map[obj.linenum]
+        else:
+            assert obj.parent is obj
+    assert [obj.linenum for obj in parse.ConfigObjs[7].children]==[8, 9, 10]
+    assert parse.ConfigObjs[7].child_indent==1
+
 def testValues_find_lines(parse_c01):
     c01_intf = ['interface Serial 1/0']
     c01_find_gige_no_exactmatch = [
@@ -890,7 +942,75 @@ def testValues_find_objects(parse_c01):
     ## test whether find_objects returns correct IOSCfgLine objects
     result_correct = c01_find_objects
     test_result = parse_c01.find_objects('^interface')
-    assert result_correct==test_result
+    ## Line objects are only == to themselves; same_line() compares text
+    assert len(result_correct)==len(test_result)
+    for obj_correct, obj_test in zip(result_correct, test_result):
+        assert obj_correct.same_line(obj_test)
+        assert not (obj_correct==obj_test)
+
+def testValues_line_identity_01(parse_c01):
+    # Sets and dicts of lines key on the objects themselves
+    twin = CiscoConfParse(parse_c01.ioscfg)
+    objs = parse_c01.find_objects(r'^interface')
+    twin_objs = twin.find_objects(r'^interface')
+    assert len(set(objs + twin_objs + objs))==2 * len(objs)
+    assert dict([(obj, obj.text) for obj in objs])[objs[2]]==objs[2].text
+    assert [obj.same_line(twin_obj) for obj, twin_obj in
+        zip(objs, twin_objs)]==[True] * len(objs)
+    assert not objs[0].same_line(objs[1])
+    assert not objs[0].same_line('interface Serial 1/0')
+
+    ## Text changes don't move a line to another hash bucket
+    objs[0].text = 'interface Serial 1/1'
+    assert objs[0] in set(objs)
+    assert parse_c01.ConfigObjs.index(objs[0])==objs[0].linenum
+
+@pytest.mark.parametrize("columnar", [False, True])
+def testValues_text_blob_01(parse_c01, columnar):
+    # Unanchored linespecs search all the text at once, and match the same
+    # lines as a search of each line
+    parse = CiscoConfParse(parse_c01.ioscfg, columnar=columnar)
+    specs = [r'Serial', r'\s+ip\s', r'shutdown$', r'^!', r'\S\s*$', r'0\s+$',
+        r'(?s)address.*255', r'shutdown(?!\s)', r'']
+    for spec in specs:
+        result_correct = [obj.linenum for obj in parse.ConfigObjs
+            if re.search(spec, obj.text)]
+        assert [obj.linenum for obj in parse.find_objects(spec)]==result_correct
+        assert parse.count_objects(spec)==len(result_correct)
+    assert not (parse.ConfigObjs._text_blob is None)
+
+    ## Edits rebuild the blob
+    intf = parse.find_objects(r'Serial')[0]
+    intf.text = 'interface Loopback 0'
+    parse.ConfigObjs.insert(1, ' no ip address')
+    assert parse.ConfigObjs._text_blob is None
+    assert [obj.text for obj in parse.find_objects(r'no ip')]==[
+        ' no ip address']
+    assert parse.find_objects(r'Loopback')==[intf]
+
+@pytest.mark.parametrize("columnar", [False, True])
+def testValues_find_objects_tokens_01(parse_c01, columnar):
+    # Token patterns find the same lines as the equivalent regex
+    parse = CiscoConfParse(parse_c01.ioscfg, columnar=columnar)
+    for tokens, exactmatch, linespec in [
+        (('interface', ANY), False, r'^interface\s+\S+'),
+        (('ip', 'address', ANY, ANY), True, r'^\s*ip\saddress\s\S+\s\S+$'),
+        ((ANY, 'percent'), False, r'^\s*\S+\s+percent\b'),
+        (('shutdown',), True, r'^\s*shutdown$'),
+        ((ANY, ANY, ANY, ANY, ANY, ANY), False, r'(\S+\s+){5}\S'),
+        (('no-such-word', ANY), False, r'^no-such-word'),
+        ]:
+        result_correct = parse.find_objects(linespec)
+        assert parse.find_objects_tokens(tokens, exactmatch)==result_correct
+        assert [obj for obj in parse.ConfigObjs 
+            if obj.match_tokens(tokens, exactmatch)]==result_correct
+
+    ## Tokens follow text changes
+    obj = parse.find_objects_tokens(('interface', 'Serial', ANY))[0]
+    assert obj.tokens==('interface', 'Serial', '1/0')
+    obj.re_sub(r'Serial\s+1', 'Serial 2')
+    assert obj.tokens==('interface', 'Serial', '2/0')
+    assert parse.find_objects_tokens(('interface', ANY, '2/0'))==[obj]
 
 def testValues_find_objects_replace_01():
     """test whether find_objects we can correctly replace object values using native IOSCfgLine object methods"""
@@ -1377,6 +1497,37 @@ def testValues_IOSConfigList_insert02(parse_c02):
 
     assert test_result==result_correct
 
+@pytest.mark.parametrize("syntax, config, dna, line_dna", [
+    ('ios', ['interface Serial1/0', ' shutdown'], 'IOSConfigList',
+        'IOSCfgLine'),
+    ('asa', ['interface Serial1/0', ' shutdown'], 'ASAConfigList',
+        'ASACfgLine'),
+    ('junos', ['interfaces {', '    Serial1/0 {', '        disable;', '    }',
+        '}'], 'IOSConfigList', 'JunosCfgLine'),
+    ])
+def testValues_ConfigList_syntax_01(syntax, config, dna, line_dna):
+    # Every syntax shares the same config list engine
+    parse = CiscoConfParse(config, syntax=syntax)
+    configlist = parse.ConfigObjs
+    assert configlist.dna==dna
+    assert repr(configlist).startswith("<{0}, comment='!'".format(dna))
+
+    parent = configlist[0]
+    obj = configlist.append(' description foo', atomic=True)
+    assert obj.dna==line_dna
+    assert obj.parent is parent
+    configlist.insert_after(parent, ' mtu 1500', atomic=True)
+    assert configlist[1].parent is parent
+    assert [ii.dna for ii in configlist]==[line_dna] * len(configlist)
+    with pytest.raises(ValueError):
+        configlist.insert_before(parent, parent)
+
+def testValues_ConfigList_syntax_02():
+    with pytest.raises(ValueError):
+        CiscoConfParse(['hostname X'], syntax='nxos')
+    with pytest.raises(ValueError):
+        CiscoConfParse(['system {', '}'], syntax='junos', factory=True)
+
 def testValues_IOSConfigLine_ioscfg01(parse_c02):
     result_correct = [
         'interface GigabitEthernet4/1', 
@@ -1389,6 +1540,764 @@ def testValues_IOSConfigLine_ioscfg01(parse_c02):
         exactmatch=True)[0].ioscfg
     assert test_result==result_correct
 
+def testValues_iterparse_01(parse_c01):
+    # Each top-level family is yielded as its own CiscoConfParse instance
+    config = StringIO("\n".join(parse_c01.ioscfg))
+    sections = list(CiscoConfParse.iterparse(config, chunk_size=16))
+    test_result = list()
+    for section in sections:
+        assert isinstance(section, CiscoConfParse)
+        assert len(section.find_objects(r'^\S')) >= 1
+        test_result.extend(section.ioscfg)
+    assert test_result==parse_c01.ioscfg
+
+    intf = [section.find_objects(r'^interface\sGigabitEthernet4/1')
+        for section in sections]
+    intf = [objs[0] for objs in intf if objs]
+    assert len(intf)==1
+    assert [obj.text for obj in intf[0].children]==[' switchport',
+        ' switchport access vlan 100', ' switchport voice vlan 150',
+        ' power inline static max 7000']
+
+def testValues_iterparse_02():
+    # Multi-line banners are never split across families
+    CONFIG = "!\r\nbanner motd ^\r\nfoo\r\n bar\r\n^\r\nhostname X\r\n"
+    sections = list(CiscoConfParse.iterparse(StringIO(CONFIG), chunk_size=5))
+    assert [section.ioscfg for section in sections]==[
+        ['!'], ['banner motd ^', 'foo', ' bar', '^'], ['hostname X']]
+
+def testValues_iterparse_03():
+    # Junos families start at each top-level statement
+    filename = os.path.join(os.path.abspath(THIS_DIR),
+        "../configs/sample_01.junos")
+    parse = CiscoConfParse(filename, syntax='junos', comment='#')
+    test_result = list()
+    for section in CiscoConfParse.iterparse(filename, syntax='junos',
+        comment='#', chunk_size=64):
+        test_result.extend(section.ioscfg)
+    assert test_result==parse.ioscfg
+
+def testValues_iterparse_04():
+    # Inline blocks, quoted braces and /* */ comments never start a family, 
+    #     and blank lines are never a family of their own
+    CONFIG = """# comment
+system { host-name r1; login { message "a } b"; } }
+protocols {
+    lldp { interface all; } /* } */
+    rstp;
+} snmp { location "{"; }
+routing-options {
+    /* static {
+    } */
+    static { route 0/0 next-hop 1.1.1.1; }
+}
+
+
+"""
+    parse = CiscoConfParse(CONFIG.splitlines(), syntax='junos', 
+        comment='#')
+    families = [[obj.text] + [child.text for child in obj.all_children]
+        for obj in parse.find_objects(r'^[^\s!]')]
+    families[0].insert(0, '! comment')
+    assert [family[0] for family in families]==['! comment', 'protocols ',
+        'snmp ', 'routing-options ']
+    assert families[0][1:]==['system ', '    host-name r1', '    login ',
+        '        message "a } b"']
+
+    sections = list(CiscoConfParse.iterparse(StringIO(CONFIG), 
+        syntax='junos', comment='#', chunk_size=7))
+    assert [section.ioscfg for section in sections]==families
+
+def testValues_IOSCfgLine_slots():
+    # Parsed lines keep no per-instance __dict__, and read the comment 
+    #     delimiter from the IOSConfigList which owns them
+    parse = CiscoConfParse(['# comment', 'hostname X'], comment='#')
+    obj = parse.ConfigObjs[0]
+    assert obj.is_comment
+    assert obj.comment_delimiter=='#'
+    assert obj.feature==''
+    assert [ref for ref in gc.get_referents(obj) if isinstance(ref, dict)]==[]
+
+    assert IOSCfgLine('!').comment_delimiter=='!'
+    obj = IOSCfgLine('# comment', comment_delimiter='#')
+    assert obj.is_comment
+    assert obj.comment_delimiter=='#'
+
+def testValues_columnar_01(parse_c01):
+    # The columnar store answers queries exactly like the object list
+    parse = CiscoConfParse(parse_c01.ioscfg, columnar=True)
+    assert parse.ioscfg==parse_c01.ioscfg
+    assert parse.find_lines(r'^interface')==parse_c01.find_lines(r'^interface')
+    assert parse.find_children(r'^interface')==parse_c01.find_children(
+        r'^interface')
+    assert parse.find_all_children(r'^policy')==parse_c01.find_all_children(
+        r'^policy')
+    for obj, ref in zip(parse.ConfigObjs, parse_c01.ConfigObjs):
+        assert obj.text==ref.text
+        assert obj.linenum==ref.linenum
+        assert obj.parent.linenum==ref.parent.linenum
+        assert [cobj.linenum for cobj in obj.children]==[cobj.linenum 
+            for cobj in ref.children]
+        assert obj.child_indent==ref.child_indent
+
+def testValues_columnar_02(parse_c01):
+    # Objects are only built for the families which are used, and editing 
+    #    the list builds the rest
+    parse = CiscoConfParse(parse_c01.ioscfg, columnar=True)
+    objs = parse.find_objects(r'^interface\sSerial\s1/0')
+    assert [obj.linenum for obj in objs]==[11]
+    assert [obj.text for obj in objs[0].children]==[' encapsulation ppp',
+        ' ip address 1.1.1.1 255.255.255.252']
+    assert len([obj for obj in parse.ConfigObjs._list._objs if obj])==3
+    assert parse.ConfigObjs[11] is objs[0]
+
+    objs[0].append_to_family(' shutdown')
+    parse.commit()
+    assert parse.find_children(r'^interface\sSerial\s1/0')==[
+        'interface Serial 1/0', ' encapsulation ppp', 
+        ' ip address 1.1.1.1 255.255.255.252', ' shutdown']
+
+def testValues_factory_dispatch_01():
+    # The trie must pick the same class as trying every is_object_for()
+    for syntax, filename in [('ios', 'sample_01.ios'), 
+        ('ios', 'sample_02.ios'), ('ios', 'sample_06.ios'), 
+        ('asa', 'sample_01.asa')]:
+        dispatch = _LINE_CLASSES[syntax]
+        fh = open(os.path.join(THIS_DIR, '../configs', filename))
+        for line in fh.read().splitlines():
+            linear = [cls for cls in dispatch.classes 
+                if cls.is_object_for(line)]
+            linear.append(dispatch.default)
+            assert dispatch.classify(line) is linear[0]
+        fh.close()
+
+def testValues_factory_dispatch_02():
+    class NtpServerLine(IOSCfgLine):
+        __slots__ = ()
+        factory_prefixes = ('ntp server',)
+        @classmethod
+        def is_object_for(cls, line="", re=re):
+            return bool(re.search(r'^ntp\sserver', line))
+
+    dispatch = _LINE_CLASSES['ios']
+    fresh = _LineClassTrie(dispatch.classes, default=dispatch.default)
+    with patch.dict(_LINE_CLASSES, {'ios': fresh}):
+        register_line_class(NtpServerLine, syntax='ios')
+        parse = CiscoConfParse(['ntp server 192.0.2.1', 'ntp master', 
+            'interface Loopback0'], factory=True)
+        assert [obj.__class__ for obj in parse.ConfigObjs]==[NtpServerLine,
+            IOSCfgLine, IOSIntfLine]
+    assert not (NtpServerLine in _LINE_CLASSES['ios'].classes)
+
+    with pytest.raises(ValueError):
+        register_line_class(NtpServerLine, syntax='junos')
+
+class PlainNtpServerLine(IOSCfgLine):
+    ## No __slots__ = (), so this class adds a __dict__ to the line layout
+    factory_prefixes = ('ntp server',)
+
+    def __init__(self, *args, **kwargs):
+        super(PlainNtpServerLine, self).__init__(*args, **kwargs)
+        self.server = self.text.split()[-1]
+
+    @classmethod
+    def is_object_for(cls, line="", re=re):
+        return bool(re.search(r'^ntp\sserver', line))
+
+def plain_ntp_line_classes():
+    ## Register PlainNtpServerLine in a copy of the ios line classes
+    dispatch = _LINE_CLASSES['ios']
+    fresh = _LineClassTrie(dispatch.classes, default=dispatch.default)
+    fresh.register(PlainNtpServerLine)
+    return patch.dict(_LINE_CLASSES, {'ios': fresh})
+
+def testValues_factory_dispatch_03():
+    # Lines can't swap __class__ to or from a class with its own layout
+    with plain_ntp_line_classes():
+        assert _LINE_CLASSES['ios'].own_layout==frozenset([
+            PlainNtpServerLine])
+        parse = CiscoConfParse(['ntp server 192.0.2.1', 'hostname Foo'],
+            factory=True)
+        ntp, host = parse.ConfigObjs
+        assert ntp.server=='192.0.2.1'
+
+        new = _reinit_line(ntp, IOSCfgLine)
+        assert type(new) is IOSCfgLine
+        assert (new.text, new.linenum)==('ntp server 192.0.2.1', 0)
+        assert type(ntp) is PlainNtpServerLine
+
+        host.text = 'ntp server 192.0.2.2'
+        new = _reinit_line(host, PlainNtpServerLine)
+        assert new.server=='192.0.2.2'
+        assert new.linenum==1
+
+        ## Other classes are still reinitialized in place
+        obj = IOSCfgLine('interface Loopback0')
+        assert _reinit_line(obj, IOSIntfLine) is obj
+        assert type(obj) is IOSIntfLine
+
+def testValues_lazy_factory_01():
+    # factory='lazy' must give the same objects as factory=True
+    for syntax, filename in [('ios', 'sample_01.ios'), 
+        ('ios', 'sample_02.ios'), ('ios', 'sample_04.ios'),
+        ('asa', 'sample_01.asa')]:
+        config = os.path.join(THIS_DIR, '../configs', filename)
+        eager = CiscoConfParse(config, syntax=syntax, factory=True)
+        lazy = CiscoConfParse(config, syntax=syntax, factory='lazy')
+        for obj_e, obj_l in zip(eager.ConfigObjs, lazy.ConfigObjs):
+            assert obj_l.__class__ is obj_e.__class__
+            assert obj_l.feature==obj_e.feature
+            assert repr(obj_l)==repr(obj_e)
+            assert obj_l.parent.linenum==obj_e.parent.linenum
+            assert [ii.linenum for ii in obj_l.children]==[ii.linenum 
+                for ii in obj_e.children]
+
+def testValues_lazy_factory_02(parse_c01):
+    parse = CiscoConfParse(parse_c01.ioscfg, factory='lazy')
+    ## Text queries don't classify lines
+    objs = parse.find_objects(r'^interface\s')
+    assert [type(obj).__name__ for obj in objs]==['_LazyIOSCfgLine']*9
+
+    ## Model attributes promote the line in place
+    serial = objs[0]
+    assert serial.name=='Serial 1/0'
+    assert type(serial) is IOSIntfLine
+    assert serial.children[0].parent is serial
+    assert parse.find_objects_dna(r'^IOSIntfLine$')[0] is serial
+
+    ## Lines are classified by their parsed text, even after it changes
+    obj = parse.find_objects(r'^interface\sGigabitEthernet4/2')[0]
+    obj.text = 'hostname Foo'
+    assert type(obj) is IOSIntfLine
+    assert obj.text=='hostname Foo'
+
+def testValues_lazy_factory_03():
+    ## Lines are slotted; model attributes don't need a per-line __dict__
+    parse = CiscoConfParse(['interface Serial1/0',
+        ' ip address 1.1.1.1 255.255.255.0',
+        'ip route 0.0.0.0 0.0.0.0 1.1.1.2'], factory='lazy')
+    intf, addr, route = parse.ConfigObjs
+    intf.ifindex = 5
+    assert type(intf) is IOSIntfLine
+    assert intf.ifindex==5
+    assert route.feature=='ip route'
+    for obj in parse.ConfigObjs:
+        assert not hasattr(obj, '__dict__')
+    with pytest.raises(AttributeError):
+        intf.bogus = True
+
+    obj = IOSCfgLine('# foo', comment_delimiter='#')
+    assert obj.is_comment
+    assert not hasattr(obj, '__dict__')
+
+@pytest.mark.parametrize("columnar", [False, True])
+def testValues_lazy_factory_04(columnar):
+    ## Placeholders can't be promoted to a class with its own layout, so 
+    ##    those lines are built when the config is parsed
+    config = ['ntp server 192.0.2.1', 'interface Loopback0',
+        ' ip address 192.0.2.5 255.255.255.255']
+    with plain_ntp_line_classes():
+        parse = CiscoConfParse(config, factory='lazy', columnar=columnar)
+        ntp, intf, addr = parse.ConfigObjs
+        assert type(ntp) is PlainNtpServerLine
+        assert ntp.server=='192.0.2.1'
+        assert type(intf).__name__=='_LazyIOSCfgLine'
+        assert intf.name=='Loopback0'
+        assert type(intf) is IOSIntfLine
+        assert addr.parent is intf
+
+    ## Classes registered after a parse don't change its lines
+    parse = CiscoConfParse(config, factory='lazy', columnar=columnar)
+    with plain_ntp_line_classes():
+        assert parse.ConfigObjs[0].__class__ is IOSCfgLine
+
+@pytest.mark.parametrize("syntax, filename, factory", [
+    ('ios', 'sample_01.ios', False),
+    ('ios', 'sample_01.ios', True),
+    ('ios', 'sample_02.ios', 'lazy'),
+    ('asa', 'sample_01.asa', True),
+    ])
+def testValues_relink_01(syntax, filename, factory):
+    # commit() must relink the same families as reparsing the text
+    config = os.path.join(THIS_DIR, '../configs', filename)
+    parse = CiscoConfParse(config, syntax=syntax, factory=factory)
+    objs = parse.ConfigObjs
+    before = set([id(obj) for obj in objs])
+
+    objs[1].text = 'interface Loopback99'
+    objs.insert(2, ' description relinked')
+    objs.insert(len(objs), 'banner motd ^')
+    objs.insert(len(objs), 'no more banner ^')
+    del objs[len(objs) // 2]
+    for obj in parse.find_objects(r'^interface')[1:4]:
+        obj.text = ' shutdown'
+    parse.find_objects(r'^\s+\S')[-1].delete()
+    parse.commit()
+
+    reparsed = CiscoConfParse([obj.text for obj in objs], syntax=syntax,
+        factory=factory)
+    assert len(objs)==len(reparsed.ConfigObjs)
+    for obj, obj_r in zip(objs, reparsed.ConfigObjs):
+        assert obj.__class__ is obj_r.__class__
+        assert (obj.text, obj.feature)==(obj_r.text, obj_r.feature)
+        assert (obj.linenum, obj.parent.linenum, obj.indent, obj.child_indent,
+            obj.is_comment, obj.oldest_ancestor)==(obj_r.linenum, 
+            obj_r.parent.linenum, obj_r.indent, obj_r.child_indent, 
+            obj_r.is_comment, obj_r.oldest_ancestor)
+        assert [ii.linenum for ii in obj.children]==[ii.linenum 
+            for ii in obj_r.children]
+    ## Only the inserted lines are new objects
+    assert len([obj for obj in objs if not (id(obj) in before)])==3
+
+def testValues_relink_02():
+    config = [
+        '!',
+        'interface Serial1/0',
+        ' ip address 1.1.1.1 255.255.255.252',
+        '!',
+        'banner motd ^',
+        'interface Serial1/1',
+        ' ip address 1.1.1.5 255.255.255.252',
+        '^',
+        'hostname Foo',
+        ]
+    parse = CiscoConfParse(config, factory=True)
+    objs = list(parse.ConfigObjs)
+    assert objs[5].parent is objs[4]
+
+    ## Closing the banner early frees the interface from it
+    objs[4].text = 'banner motd ^ Foo ^'
+    objs[0].text = 'interface Serial1/2'
+    parse.commit()
+    assert list(parse.ConfigObjs)==objs
+    assert isinstance(objs[0], IOSIntfLine)
+    assert objs[0].name=='Serial1/2'
+    assert objs[5].parent is objs[5]
+    assert objs[5].children==[objs[6]]
+    assert parse.find_objects_dna(r'^IOSIntfLine$')==[objs[0], objs[1], 
+        objs[5]]
+
+    ## Deleting a child relinks its parent
+    objs[1].children[0].delete()
+    parse.commit()
+    assert objs[1].children==list()
+    assert objs[1].ipv4_addr==''
+
+@pytest.mark.parametrize("factory", [True, 'lazy'])
+def testValues_relink_03(factory):
+    # commit() replaces lines which move to or from a class with its own 
+    #    layout, and relinks the new objects
+    config = ['ntp server 192.0.2.1', 'hostname Foo', 'interface Loopback0',
+        ' ip address 192.0.2.5 255.255.255.255', ' ntp server 192.0.2.3']
+    with plain_ntp_line_classes():
+        parse = CiscoConfParse(config, factory=factory)
+        objs = parse.ConfigObjs
+        loopback = objs[2]
+        objs[0].text = 'hostname Bar'
+        objs[1].text = 'ntp server 192.0.2.9'
+        objs[4].text = ' shutdown'
+        objs[2].text = 'ntp server 192.0.2.5'
+        parse.commit()
+
+        assert [obj.__class__.__name__ for obj in objs]==['IOSHostnameLine',
+            'PlainNtpServerLine', 'PlainNtpServerLine', 'IOSCfgLine', 
+            'IOSCfgLine']
+        assert (objs[1].server, objs[2].server)==('192.0.2.9', '192.0.2.5')
+        assert [obj.linenum for obj in objs]==[0, 1, 2, 3, 4]
+        assert objs[2].children==[objs[3], objs[4]]
+        assert objs[4].parent is objs[2]
+        assert not (objs[2] is loopback)
+        assert parse.find_objects(r'^ntp')==[objs[1], objs[2]]
+
+        objs[2].text = 'interface Loopback0'
+        parse.commit()
+        assert isinstance(objs[2], IOSIntfLine)
+        assert objs[2].name=='Loopback0'
+        assert objs[3].parent is objs[2]
+
+def testValues_batch_01(parse_c01):
+    # Edits inside batch() must give the same config as edits outside it
+    parse = CiscoConfParse(parse_c01.ioscfg, factory=True)
+    for obj in parse.find_objects(r'^interface'):
+        obj.append_to_family(' carrier-delay msec 500')
+        obj.insert_before('!')
+    parse.find_objects(r'^\s+priority')[0].delete()
+    parse.commit()
+
+    batched = CiscoConfParse(parse_c01.ioscfg, factory=True)
+    before = list(batched.ConfigObjs)
+    with batched.batch():
+        for obj in batched.find_objects(r'^interface'):
+            obj.append_to_family(' carrier-delay msec 500')
+            obj.insert_before('!')
+        batched.find_objects(r'^\s+priority')[0].delete()
+        ## Nothing changes until the with block exits
+        assert list(batched.ConfigObjs)==before
+    assert batched.ioscfg==parse.ioscfg
+    ## Only the deleted line is gone; the others are the same objects
+    ids = set([id(obj) for obj in batched.ConfigObjs])
+    assert len([obj for obj in before if id(obj) in ids])==len(before) - 1
+    for obj, obj_p in zip(batched.ConfigObjs, parse.ConfigObjs):
+        assert obj.linenum==obj_p.linenum
+        assert obj.parent.linenum==obj_p.parent.linenum
+        assert [ii.linenum for ii in obj.children]==[ii.linenum 
+            for ii in obj_p.children]
+
+def testValues_batch_02():
+    config = [
+        'interface Serial1/0',
+        ' ip address 1.1.1.1 255.255.255.252',
+        'interface Serial1/1',
+        ' ip address 1.1.1.5 255.255.255.252',
+        ]
+    parse = CiscoConfParse(config)
+    with parse.batch():
+        first = parse.prepend_line('hostname Foo')
+        with parse.batch():
+            last = parse.append_line('end')
+            parse.ConfigObjs.insert(2, ' shutdown')
+            del parse.ConfigObjs[2]
+        ## Inner blocks don't apply anything
+        assert len(parse.ConfigObjs)==4
+        parse.ConfigObjs.insert_after(last, '!')
+    assert parse.ioscfg==['hostname Foo', 'interface Serial1/0',
+        ' ip address 1.1.1.1 255.255.255.252', ' shutdown', 
+        ' ip address 1.1.1.5 255.255.255.252', 'end', '!']
+    assert (first.linenum, last.linenum)==(0, 5)
+    assert parse.ConfigObjs[1].children==parse.ConfigObjs[2:5]
+
+    ## Queued edits are applied even if the block raises
+    with pytest.raises(ValueError):
+        with parse.batch():
+            parse.append_line('hostname Bar')
+            raise ValueError
+    assert parse.ioscfg[-1]=='hostname Bar'
+    assert parse.ConfigObjs._batch is None
+
+def testValues_chunked_lines_01():
+    # _ChunkedLines must behave like a list, across many chunks
+    objs = [IOSCfgLine('line {0}'.format(ii)) for ii in range(20)]
+    with patch.object(_ChunkedLines, 'CHUNK_SIZE', 2):
+        chunked = _ChunkedLines(objs)
+        for ii, text in [(0, 'first'), (7, 'seven'), (-1, 'penultimate'), 
+            (100, 'last')]:
+            obj = IOSCfgLine(text)
+            objs.insert(ii, obj)
+            chunked.insert(ii, obj)
+        del objs[3], objs[5:9], objs[-2]
+        del chunked[3], chunked[5:9], chunked[-2]
+        assert len(chunked._chunks) > 5
+
+        assert len(chunked)==len(objs)
+        assert [obj.text for obj in chunked]==[obj.text for obj in objs]
+        assert chunked[4:9]==objs[4:9]
+        assert chunked[::-1]==objs[::-1]
+        for idx, obj in enumerate(objs):
+            assert chunked[idx] is obj
+            assert chunked.index(obj)==idx
+            assert obj.linenum==idx
+
+        chunked[:] = objs[::2]
+        assert list(chunked)==objs[::2]
+        assert objs[1].linenum==1    # Removed lines keep their last linenum
+        with pytest.raises(ValueError):
+            chunked.index(objs[1])
+
+def testValues_chunked_lines_02():
+    # Edits renumber lines without touching the rest of the config
+    config = ['interface Serial1/{0}'.format(ii) for ii in range(2000)]
+    parse = CiscoConfParse(config)
+    objs = list(parse.ConfigObjs)
+
+    objs[1500].insert_before(' shutdown')
+    objs[10].delete()
+    parse.commit()
+    assert isinstance(parse.ConfigObjs._list, _ChunkedLines)
+    assert parse.ConfigObjs._list.index(objs[1500])==1500
+    assert (objs[11].linenum, objs[1499].linenum)==(10, 1498)
+    assert objs[1499].children[0].text==' shutdown'
+    assert parse.ConfigObjs[1500] is objs[1500]
+    assert [obj.linenum for obj in parse.ConfigObjs]==list(range(2000))
+
+def testValues_chunked_lines_03():
+    # Deletes and commits relink the changed families in place, without 
+    #     copying or renumbering the whole list
+    config = list()
+    for ii in range(200):
+        config.extend(['interface Serial1/{0}'.format(ii), ' shutdown'])
+    parse = CiscoConfParse(config)
+    objs = list(parse.ConfigObjs)
+
+    def whole_list(*args):
+        raise AssertionError('The whole list was copied')
+    with patch.object(_ChunkedLines, 'CHUNK_SIZE', 4):
+        parse.ConfigObjs._index_lines()
+        with patch.object(_ChunkedLines, '__iter__', whole_list), \
+            patch.object(_ChunkedLines, '_assign', whole_list):
+            objs[301].insert_after(' description new')
+            objs[11].text = ''
+            for obj in objs[20:28:2]:
+                obj.delete()
+            parse.commit()
+            objs[398].text = ' ip address 192.0.2.1 255.255.255.0'
+            parse.commit()
+
+    assert parse.ioscfg==CiscoConfParse(parse.ioscfg).ioscfg
+    assert objs[10].children==[]
+    assert [obj.text for obj in objs[300].children]==[' shutdown',
+        ' description new']
+    assert objs[396].children==objs[397:400]
+    assert [obj.linenum for obj in parse.ConfigObjs]==list(
+        range(len(parse.ConfigObjs)))
+    assert [obj.text for obj in parse.ConfigObjs]==parse.ioscfg
+
+def testValues_delete_lines_01():
+    config = [
+        'ip access-list extended ACL_01',
+        ' permit tcp any host 192.0.2.1',
+        ' permit udp any host 192.0.2.2',
+        ' permit tcp any host 192.0.2.3',
+        ' permit udp any host 192.0.2.4',
+        'ip access-list extended ACL_02',
+        ' permit udp any host 192.0.2.5',
+        ' permit ip any any',
+        ]
+    parse = CiscoConfParse(config)
+    acl_02 = parse.ConfigObjs[5]
+    deleted = parse.delete_lines(r'permit\sudp')
+    assert [obj.text for obj in deleted]==[' permit udp any host 192.0.2.2',
+        ' permit udp any host 192.0.2.4', ' permit udp any host 192.0.2.5']
+    assert parse.ioscfg==['ip access-list extended ACL_01',
+        ' permit tcp any host 192.0.2.1', ' permit tcp any host 192.0.2.3',
+        'ip access-list extended ACL_02', ' permit ip any any']
+    ## Parents are relinked without another commit()
+    assert acl_02.linenum==3
+    assert acl_02.children==[parse.ConfigObjs[4]]
+
+def testValues_delete_02(parse_c01):
+    # delete() and delete_children_matching() return what they deleted
+    parse = CiscoConfParse(parse_c01.ioscfg)
+    before = list(parse.ConfigObjs)
+    policy_map = parse.find_objects(r'^policy-map')[0]
+    family = [policy_map] + policy_map.all_children
+    deleted = policy_map.delete()
+    assert deleted==family
+    assert policy_map.delete()==[]    # Already deleted
+    assert list(parse.ConfigObjs)==[obj for obj in before 
+        if not (obj in family)]
+
+    intf = parse.find_objects(r'^interface\sSerial')[0]
+    children = list(intf.children)
+    assert intf.delete_children_matching(r'ip\saddress')==[
+        ' ip address 1.1.1.1 255.255.255.252']
+    parse.commit()
+    assert intf.children==[obj for obj in children 
+        if not ('ip address' in obj.text)]
+
+@pytest.mark.parametrize("columnar", [False, True])
+def testValues_token_index_01(parse_c01, columnar):
+    # Anchored queries only search lines which start with the same word, 
+    #    and the index follows every change to the config
+    parse = CiscoConfParse(parse_c01.ioscfg, columnar=columnar)
+    specs = [r'^interface\sSerial', r'^(ip|ipv6)\s', r'^\s+ip\s+address',
+        r'^inter', r'^\s*no\s', r'^policy-map|^class-map']
+    def check():
+        for spec in specs:
+            regex = re.compile(spec)
+            assert parse.find_objects(spec)==[obj for obj in 
+                parse.ConfigObjs if regex.search(obj.text)]
+    check()
+    check()
+    index = parse.ConfigObjs._token_index
+    assert sorted(index['interface'])==index['interface']
+    assert parse.ConfigObjs._candidate_lines(
+        re.compile(r'^\s+ip\saddress'))==index['ip']
+
+    intf = parse.find_objects(r'^interface\sSerial\s1/0')[0]
+    intf.append_to_family(' ip address 2.2.2.2 255.255.255.0')
+    parse.ConfigObjs[0].text = 'ip domain-name example.com'
+    check()
+    parse.delete_lines(r'^\s+ip\saddress\s1\.')
+    check()
+    with parse.batch():
+        intf.insert_after(' no shutdown')
+    check()
+    assert parse.ConfigObjs._token_index
+
+@pytest.mark.parametrize("columnar", [False, True])
+def testValues_find_objects_multi_01(parse_c01, columnar):
+    # One pass gives the same objects as one find_objects() per linespec
+    parse = CiscoConfParse(parse_c01.ioscfg, columnar=columnar)
+    linespecs = {
+        'intfs': r'^interface',
+        'serial': r'^interface\sSerial',
+        'addrs': r'ip\saddress',
+        'exact': {'linespec': r' shutdown', 'exactmatch': True},
+        'ws': {'linespec': r'^interface Serial 1/0', 'ignore_ws': True},
+        'backref': r'(\d)\.\1\.\1',
+        'nocase': r'(?i)^INTERFACE',
+        'none': r'^does\snot\sexist',
+        }
+    for ii in range(40):
+        linespecs['vlan{0}'.format(ii)] = r'vlan\s{0}$'.format(ii)
+    result = parse.find_objects_multi(linespecs)
+    assert sorted(result.keys())==sorted(linespecs.keys())
+    for name, linespec in linespecs.items():
+        if isinstance(linespec, dict):
+            result_correct = parse.find_objects(**linespec)
+        else:
+            result_correct = parse.find_objects(linespec)
+        assert result[name]==result_correct
+    assert len(result['backref'])==1
+    assert result['nocase']==result['intfs']
+    assert result['none']==[]
+
+    ## The kwargs apply to linespecs without their own
+    result = parse.find_objects_multi({'a': r' shutdown', 
+        'b': {'linespec': r' shutdown', 'exactmatch': False}}, 
+        exactmatch=True)
+    assert result['a']==parse.find_objects(r' shutdown', exactmatch=True)
+    assert result['b']==parse.find_objects(r' shutdown')
+
+@pytest.mark.parametrize("columnar", [False, True])
+def testValues_iter_objects_01(parse_c01, columnar):
+    # The lazy variants agree with find_objects() and find_children()
+    parse = CiscoConfParse(parse_c01.ioscfg, columnar=columnar)
+    for linespec, kwargs in [(r'^interface', {}), (r'ip\saddress', {}),
+        (r' shutdown', {'exactmatch': True}), 
+        (r'^interface Serial 1/0', {'ignore_ws': True}),
+        (r'^does\snot\sexist', {})]:
+        result_correct = parse.find_objects(linespec, **kwargs)
+        assert list(parse.iter_objects(linespec, **kwargs))==result_correct
+        assert parse.count_objects(linespec, **kwargs)==len(result_correct)
+        assert parse.exists(linespec, **kwargs) is bool(result_correct)
+        if result_correct:
+            assert parse.first_object(linespec, **kwargs) is result_correct[0]
+        else:
+            assert parse.first_object(linespec, **kwargs) is None
+            assert parse.first_object(linespec, default=False, **kwargs) is False
+    assert parse.has_line_with(r'^interface') is True
+    assert parse.has_line_with(r'^does\snot\sexist') is False
+
+    ## Parents and their children come back once each, in config order
+    parse = CiscoConfParse(['policy-map QOS', ' class GOLD', '  priority',
+        ' class SILVER', '  bandwidth 10', 'interface Serial1/0'], 
+        columnar=columnar)
+    result = [obj.linenum for obj in parse.iter_children(r'(policy|class)')]
+    assert result==[0, 1, 2, 3, 4]
+    assert parse.find_children(r'class')==[' class GOLD', '  priority', 
+        ' class SILVER', '  bandwidth 10']
+
+@pytest.mark.parametrize("columnar", [False, True])
+def testValues_query_plans_01(columnar):
+    # Rare and common children give the same results as a parent-first scan
+    config = list()
+    for ii in range(1, 41):
+        config.extend(['interface FastEthernet0/{0}'.format(ii),
+            ' switchport access vlan {0}'.format(100 + ii % 2),
+            ' spanning-tree portfast', '!'])
+    config.extend(['interface FastEthernet0/41', ' switchport port-security',
+        ' switchport port-security maximum 2', '!', 'policy-map QOS',
+        ' class GOLD', '  police 8000', '  switchport port-security'])
+    parse = CiscoConfParse(config, columnar=columnar)
+    for ii in range(2):
+        # The second pass uses the first-word index for its estimates
+        result = parse.find_objects_w_child(r'^interface', r'port-security')
+        assert [obj.text for obj in result]==['interface FastEthernet0/41']
+        result = parse.find_objects_wo_child(r'^interface', r'^\s+spanning')
+        assert [obj.text for obj in result]==['interface FastEthernet0/41']
+        result = parse.find_objects_w_all_children(r'^interface', 
+            [r'spanning-tree', r'vlan\s101'])
+        assert len(result)==20
+        result = parse.find_objects_w_missing_children(r'^interface', 
+            [r'spanning-tree', r'vlan\s101'])
+        assert len(result)==21
+        assert parse.find_children_w_parents(r'^interface', 
+            r'port-security')==[' switchport port-security', 
+            ' switchport port-security maximum 2']
+        assert parse.find_children_w_parents(r'^policy-map', 
+            r'port-security')==['  switchport port-security']
+        result = parse.find_objects_w_parents(r'^interface\sFastEthernet0/41',
+            r'^\s+switchport')
+        assert [obj.linenum for obj in result]==[161, 162]
+
+@pytest.mark.parametrize("columnar", [False, True])
+def testValues_subtrees_01(columnar):
+    # Descendants come from the slice after each line, even with comments 
+    #     between them, and stay right after edits
+    config = ['policy-map QOS', ' class GOLD', '  police 8000', 
+        '   conform-action transmit', '!', '   exceed-action drop', 
+        ' class SILVER', '  bandwidth 10', 'interface Serial1/0']
+    parse = CiscoConfParse(config, columnar=columnar)
+    policy, gold, police, conform = parse.ConfigObjs[0:4]
+    assert [obj.linenum for obj in policy.all_children]==[1, 2, 3, 5, 6, 7]
+    assert [obj.linenum for obj in gold.all_children]==[2, 3, 5]
+    assert parse.ConfigObjs[5].all_parents==[policy, gold, police]
+    assert conform.lineage==[policy, gold, police, conform]
+    assert parse.ConfigObjs[8].all_children==[]
+
+    police.insert_after('   violate-action drop')
+    parse.commit()
+    assert [obj.linenum for obj in gold.all_children]==[2, 3, 4, 6]
+    parse.ConfigObjs[6].delete()
+    parse.commit()
+    assert [obj.text for obj in policy.all_children]==[' class GOLD', 
+        '  police 8000', '   violate-action drop', 
+        '   conform-action transmit', ' class SILVER', '  bandwidth 10']
+
+    ## Links set by hand are followed, wherever the lines are
+    parse.ConfigObjs[-1].add_child(police)
+    assert parse.ConfigObjs[-1].all_children==[police] + police.all_children
+
+def testValues_iter_objects_02():
+    # Only the lines before the first match are searched
+    parse = CiscoConfParse(['hostname A', 'interface Serial1/0', 
+        'interface Serial1/1'])
+    objs = parse.iter_objects(r'^interface')
+    assert next(objs).text=='interface Serial1/0'
+    parse.ConfigObjs[2].text = 'interface Serial1/2'
+    assert next(objs).text=='interface Serial1/2'
+
+@pytest.mark.parametrize("workers", [1, 2])
+def testValues_parse_many_01(workers):
+    paths = [os.path.join(THIS_DIR, '../configs', filename) for filename in 
+        ('sample_01.ios', 'sample_02.ios', 'does_not_exist.ios', 
+        'sample_04.ios')]
+    results = dict([(result.path, result) for result in 
+        parse_many(paths, syntax='ios', factory=True, workers=workers)])
+    assert sorted(results.keys())==sorted(paths)
+
+    ## One bad file doesn't stop the others
+    result = results[paths[2]]
+    assert result.parse is None
+    assert result.error.startswith('IOError')
+    assert 'No such file or directory' in result.error
+    assert paths[2] in result.error
+
+    for path in (paths[0], paths[1], paths[3]):
+        result = pickle.loads(pickle.dumps(results[path], 2))
+        assert result.error is None
+        assert result.elapsed > 0.0
+        expected = CiscoConfParse(path, factory=True)
+        assert result.lines==len(expected.ConfigObjs)
+        assert result.parse.ioscfg==expected.ioscfg
+        assert [obj.__class__ for obj in result.parse.ConfigObjs]==[
+            obj.__class__ for obj in expected.ConfigObjs]
+        assert [[ii.linenum for ii in obj.children] for obj in 
+            result.parse.ConfigObjs]==[[ii.linenum for ii in obj.children] 
+            for obj in expected.ConfigObjs]
+
+def testValues_parse_many_02():
+    # A path which can't be read reports the path and the OS error
+    path = os.path.join(THIS_DIR, '../configs')
+    result = list(parse_many([path], workers=1))[0]
+    assert result.path==path
+    assert result.parse is None
+    assert result.error.startswith('IOError')
+    assert 'Is a directory' in result.error
+    assert path in result.error
+    assert result.traceback is not None
+
 def testValues_CiscoPassword():
     ep = "04480E051A33490E"
     test_result_01 = CiscoPassword(ep).decrypt()
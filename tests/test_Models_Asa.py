@@ -276,3 +276,15 @@ def testVal_ASAAclLine_DNA_negative(line):
     with pytest.raises(ValueError):
         cfg = CiscoConfParse([line], factory=True, syntax='asa')
         #cfg.objs[0].dna=='ASACfgLine'
+
+def testVal_ASAAclLine_parsed_once():
+    # The ACL is parsed once, and again after the text changes
+    cfg = CiscoConfParse([
+        'access-list TESTME_01 extended permit tcp host 10.0.0.1 any eq 80'],
+        factory=True, syntax='asa')
+    obj = cfg.objs[0]
+    assert obj._mm_results is obj._mm_results
+    assert (obj.src_addr_method, obj.dst_addr_method)==('network', 'network')
+    obj.text = 'access-list TESTME_01 extended permit tcp object-group SRC any'
+    assert (obj.src_addr_method, obj.dst_addr_method)==('object-group', 
+        'network')
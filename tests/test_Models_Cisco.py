@@ -1425,6 +1425,18 @@ def testVal_IOSRouteLine_12():
     assert 1==obj.admin_distance
     assert ''==obj.tag
 
+def testVal_IOSRouteLine_13():
+    # The route is parsed once, and again after the text changes
+    cfg = CiscoConfParse(['ip route 0.0.0.0 0.0.0.0 172.16.1.254'], 
+        factory=True)
+    obj = cfg.ConfigObjs[0]
+    assert obj.route_info is obj.route_info
+    assert '172.16.1.254'==obj.next_hop_addr
+    obj.text = 'ip route 10.0.0.0 255.0.0.0 172.16.1.1 tag 5'
+    assert '10.0.0.0'==obj.network
+    assert '172.16.1.1'==obj.next_hop_addr
+    assert '5'==obj.tag
+
 ###
 ### ------ AAA Tests --------
 ###
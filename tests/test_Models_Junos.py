@@ -15,8 +15,6 @@ def testVal_JunosIntfLine_dna(parse_j01_factory):
     obj = cfg.find_objects_w_child('interfaces', 'ge-0/0/1')[0]
     assert obj.dna == 'JunosIntfLine'
 
-@pytest.mark.xfail(True,
-                   reason="Junos configs currently use IOSCfgLine objects")
 def testVal_JunosCfgLine_dna(parse_j01):
     cfg = parse_j01
     obj = cfg.find_objects_w_child('interfaces', 'ge-0/0/1')[0]
@@ -28,8 +26,6 @@ def testVal_find_objects_w_parents(parse_j01):
     assert not ('{' in set(obj.text))  # Ensure there are no braces on this line
     assert len(obj.all_children)==6
 
-@pytest.mark.xfail(True,
-                   reason="Github issue #49")
 def testVal_parse_F5():
     """Test for Github issue #49"""
     config = [
@@ -47,3 +43,92 @@ def testVal_parse_F5():
     parse = CiscoConfParse(config, syntax='junos')
     retval = parse.find_children_w_parents('ltm virtual virtual2', 'profiles2')[0]
     assert retval=='    profiles2 '
+
+def testVal_parse_braces_01():
+    # Junos lines are linked by their brace depth, not reparsed as IOS text
+    config = [
+        '# comment {',
+        'system {',
+        '    login {',
+        '        message "Authorized {access} only";',
+        '        announcement "two',
+        '  lines }";',
+        '    }',
+        '}',
+        'protocols {',
+        '    lldp { interface all; }',
+        '    rstp;',
+        '}',
+        ]
+    parse = CiscoConfParse(config, syntax='junos', comment='#')
+    assert parse.ioscfg==[
+        '! comment {',
+        'system ',
+        '    login ',
+        '        message "Authorized {access} only"',
+        '        announcement "two',
+        '        lines }"',
+        'protocols ',
+        '    lldp ',
+        '        interface all',
+        '    rstp',
+        ]
+    assert [obj.dna for obj in parse.ConfigObjs]==['JunosCfgLine'] * 10
+    assert parse.find_children('^system')==['system ', '    login ']
+    assert parse.find_children('^protocols')==['protocols ', '    lldp ',
+        '    rstp']
+    assert parse.find_all_children('^protocols')==['protocols ',
+        '    lldp ', '        interface all', '    rstp']
+    obj = parse.find_objects('message')[0]
+    assert obj.parent.text=='    login '
+    assert parse.convert_braces_to_ios(config)==parse.ioscfg
+
+def testVal_parse_braces_02():
+    with pytest.raises(ValueError):
+        CiscoConfParse(['system {', '} foo', '}'], syntax='junos')
+
+def testVal_parse_braces_03():
+    # Statements end at unquoted semicolons; /* */ comments are comment lines
+    config = [
+        'system { host-name r1; /* set { by } ops; */ domain-name "a;b"; }',
+        'snmp {',
+        '    /* community',
+        '       "public" { */',
+        '    community c1 { authorization read-only; }',
+        '    location "rack } 4"; ## SECRET-DATA',
+        '}',
+        ]
+    parse = CiscoConfParse(config, syntax='junos', comment='#')
+    assert parse.ioscfg==[
+        'system ',
+        '    host-name r1',
+        '    !/* set { by } ops; */',
+        '    domain-name "a;b"',
+        'snmp ',
+        '    !/* community',
+        '    !"public" { */',
+        '    community c1 ',
+        '        authorization read-only',
+        '    location "rack } 4"; ## SECRET-DATA',
+        ]
+    assert parse.find_children('^snmp')==['snmp ', '    !/* community',
+        '    !"public" { */', '    community c1 ', 
+        '    location "rack } 4"; ## SECRET-DATA']
+    assert parse.find_objects(r'ops')[0].linenum==2
+
+def testVal_parse_braces_04():
+    # A backslash outside a quoted string is part of the statement
+    config = [
+        'system {',
+        '    host-name a\\b;',
+        '    message foo\\nbar;',
+        '    announcement "say \\"hi\\" {";',
+        '}',
+        ]
+    parse = CiscoConfParse(config, syntax='junos')
+    assert parse.ioscfg==[
+        'system ',
+        '    host-name a\\b',
+        '    message foo\\nbar',
+        '    announcement "say \\"hi\\" {"',
+        ]